@@ -0,0 +1,66 @@
+"""
+Compare the domain index in CompanyMatcher with a per-pattern regex scan
+
+Usage:
+    python -m benchmarks.bench_company_matcher --companies 5000 --emails 100000
+"""
+import argparse
+import csv
+import os
+import random
+import re
+import tempfile
+
+from benchmarks.common import timed
+from src.utils.company_matcher import CompanyMatcher
+
+
+def build_regex_scan(mappings):
+    """Reproduce the original matcher: one regex per company domain, tried in order"""
+    compiled = {
+        company: [re.compile(rf"@{re.escape(domain)}$", re.IGNORECASE) for domain in domains]
+        for company, domains in mappings.items()
+    }
+
+    def identify(email):
+        email = email.lower().strip()
+        for company, patterns in compiled.items():
+            if any(pattern.search(email) for pattern in patterns):
+                return company
+        return 'unknown'
+    return identify
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--companies', type=int, default=2000)
+    parser.add_argument('--emails', type=int, default=20_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    mappings = {f"company{i}": [f"company{i}.com", f"corp{i}.io"] for i in range(args.companies)}
+    domains = [domain for values in mappings.values() for domain in values] + ['unknown.org']
+    emails = [f"user{i}@{rng.choice(domains)}" for i in range(args.emails)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'company_domains.csv')
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['company', 'domain'])
+            for company, values in mappings.items():
+                writer.writerows([company, domain] for domain in values)
+        matcher = CompanyMatcher(domains_file=path)
+
+    regex_identify = build_regex_scan(mappings)
+    regex = timed(lambda: [regex_identify(email) for email in emails])
+    indexed = timed(lambda: [matcher.identify_company(email) for email in emails])
+
+    print(f"companies:    {args.companies}")
+    print(f"emails:       {args.emails}")
+    print(f"regex scan:   {regex['best']:.3f}s")
+    print(f"domain index: {indexed['best']:.3f}s")
+    print(f"speedup:      {regex['best'] / indexed['best']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
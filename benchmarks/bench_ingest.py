@@ -0,0 +1,32 @@
+"""
+Compare row-wise and vectorized contact processing
+
+Usage:
+    python -m benchmarks.bench_ingest --rows 1000000
+"""
+import argparse
+
+from benchmarks.common import synthetic_contacts, timed
+from src.email_automation import EmailAutomation
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=1)
+    args = parser.parse_args()
+
+    df = synthetic_contacts(args.rows)
+    automation = EmailAutomation(excel_path='', sender_email='', sender_password='')
+
+    rowwise = timed(lambda: automation._extract_contacts_rowwise(df), args.repeat)
+    vectorized = timed(lambda: automation._extract_contacts(df), args.repeat)
+
+    print(f"rows:       {args.rows}")
+    print(f"row-wise:   {rowwise['best']:.3f}s")
+    print(f"vectorized: {vectorized['best']:.3f}s")
+    print(f"speedup:    {rowwise['best'] / vectorized['best']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Compare the memory the schedule takes as dicts and as EmailAutomation keeps it
+
+The baseline is the original list of six-key dicts. The measured layout is
+what scheduling actually builds: ``_schedule_batch`` filling the
+``scheduled_emails`` index and the ``scheduler`` heap of a real
+``EmailAutomation``.
+
+Usage:
+    python -m benchmarks.bench_schedule_memory --entries 200000 1000000
+"""
+import argparse
+import gc
+import logging
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+from src.email_automation import EmailAutomation
+
+COMPANIES = ['amazon', 'meta', 'google', 'apple']
+
+
+def measure(build) -> int:
+    """Bytes still allocated by ``build()``'s result"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def make_batches(entries: int, batch_size: int) -> List[Dict[str, List[Tuple[str, str, str]]]]:
+    """Company -> (name, email, role) batches, as ``create_batches`` yields them"""
+    batches = []
+    for start in range(0, entries, batch_size):
+        batch = {}
+        for i in range(start, min(start + batch_size, entries)):
+            company = COMPANIES[i % len(COMPANIES)]
+            batch.setdefault(company, []).append((f"Contact {i}", f"user{i}@{company}.com", "Engineer"))
+        batches.append(batch)
+    return batches
+
+
+def run(entries: int, batch_size: int) -> Dict:
+    """
+    Measure both layouts for ``entries`` scheduled emails
+
+    Returns:
+        dict: Bytes per entry for each layout and the reduction
+    """
+    # Contacts exist before scheduling in both layouts, so keep them out of the measurement
+    batches = make_batches(entries, batch_size)
+    start = datetime.now()
+
+    def dicts():
+        # The baseline _schedule_batch: one dict per email, one send time per batch
+        scheduled = []
+        for batch_num, batch in enumerate(batches, 1):
+            send_time = start + timedelta(days=batch_num - 1)
+            for company, contacts in batch.items():
+                for name, email, role in contacts:
+                    scheduled.append({
+                        'recipient_email': email,
+                        'recipient_name': name,
+                        'company': company,
+                        'is_reminder': False,
+                        'batch_num': batch_num,
+                        'send_time': send_time,
+                    })
+        return scheduled
+
+    automation = EmailAutomation(excel_path='', sender_email='bench@example.com', sender_password='',
+                                 transport_settings={'type': 'memory'})
+    try:
+        def schedule():
+            for batch_num, batch in enumerate(batches, 1):
+                automation._schedule_batch(batch, days_delay=batch_num - 1, is_reminder=False, batch_num=batch_num)
+            return automation.scheduled_emails, automation.scheduler
+
+        dict_bytes = measure(dicts)
+        schedule_bytes = measure(schedule)
+        assert len(automation.scheduled_emails) == len(automation.scheduler) == entries
+    finally:
+        automation.close()
+
+    return {
+        'entries': entries,
+        'dict_bytes_per_entry': dict_bytes / entries,
+        'schedule_bytes_per_entry': schedule_bytes / entries,
+        'reduction': dict_bytes / schedule_bytes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--entries', type=int, nargs='+', default=[200_000, 1_000_000])
+    parser.add_argument('--batch-size', type=int, default=40)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    for entries in args.entries:
+        result = run(entries, args.batch_size)
+        print(f"entries:                 {result['entries']}")
+        print(f"dict:                    {result['dict_bytes_per_entry']:.0f} B/entry")
+        print(f"index + scheduler heap:  {result['schedule_bytes_per_entry']:.0f} B/entry")
+        print(f"reduction:               {result['reduction']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Measure CLI startup cost with ``python -X importtime`` and save the results as JSON
+
+For each subcommand, imports the modules it loads before doing any work and
+records the total import time, the slowest top-level imports and whether
+pandas was pulled in. Also times ``main.py status`` end to end.
+
+Usage:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --repeat 10 --output benchmarks/results/startup.json
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List
+
+from benchmarks.common import RESULTS_DIR, git_commit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# What each subcommand has imported by the time it starts working
+TARGETS = {
+    'cli': ['src.cli'],
+    'status': ['src.cli', 'src.schedule_store'],
+    'check': ['src.cli', 'dotenv', 'src.dispatcher'],
+    'ingest/schedule/send': ['src.cli', 'dotenv', 'src.dispatcher', 'src.email_automation'],
+}
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$')
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """Parse ``-X importtime`` output into (module, self_us, cumulative_us, depth) records"""
+    records = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            records.append({'module': module, 'self_us': int(self_us), 'cumulative_us': int(cumulative_us),
+                            'depth': len(indent) // 2})
+    return records
+
+
+def measure_imports(modules: List[str], repeat: int) -> Dict:
+    """Import ``modules`` in fresh interpreters and keep the fastest run"""
+    code = '; '.join(f"import {module}" for module in modules)
+    code += "; import sys; print('pandas' in sys.modules)"
+    best = None
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT,
+                              capture_output=True, text=True, check=True)
+        records = parse_importtime(proc.stderr)
+        total = sum(r['cumulative_us'] for r in records if r['depth'] == 0)
+        if best is None or total < best['total_us']:
+            top = sorted((r for r in records if r['depth'] == 0), key=lambda r: -r['cumulative_us'])[:10]
+            best = {
+                'total_us': total,
+                'modules_imported': len(records),
+                'imports_pandas': proc.stdout.strip() == 'True',
+                'slowest': [{'module': r['module'], 'cumulative_us': r['cumulative_us']} for r in top],
+            }
+    return best
+
+
+def time_command(argv: List[str], repeat: int) -> float:
+    """Best wall-clock seconds for ``python main.py <argv>`` in a scratch directory"""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    best = float('inf')
+    with tempfile.TemporaryDirectory() as workdir:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            subprocess.run([sys.executable, os.path.join(ROOT, 'main.py')] + argv, cwd=workdir, env=env,
+                           capture_output=True, check=True)
+            best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement (the fastest is kept)')
+    parser.add_argument('--output', help='JSON results file (default: benchmarks/results/startup-<timestamp>.json)')
+    args = parser.parse_args()
+
+    started = datetime.now()
+    report = {
+        'started': started.isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'imports': {},
+        'commands': {},
+    }
+
+    for name, modules in TARGETS.items():
+        result = measure_imports(modules, args.repeat)
+        report['imports'][name] = result
+        print(f"{name:<22} {result['total_us'] / 1000:>8.1f} ms  {result['modules_imported']:>5} modules"
+              f"  pandas={'yes' if result['imports_pandas'] else 'no'}")
+
+    for argv in (['--help'], ['status']):
+        seconds = time_command(argv, args.repeat)
+        report['commands'][' '.join(argv)] = round(seconds, 4)
+        print(f"main.py {' '.join(argv):<14} {seconds * 1000:>8.1f} ms wall")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"startup-{started.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""
+Compare per-message str.format rendering with compiled bulk rendering
+
+Usage:
+    python -m benchmarks.bench_templates --contacts 100000
+"""
+import argparse
+import random
+
+from benchmarks.common import timed
+from src.templates import EmailTemplateManager
+
+COMPANIES = ['amazon', 'meta', 'google', 'apple']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--contacts', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    contacts = [(rng.choice(COMPANIES), f"Contact {i}") for i in range(args.contacts)]
+    manager = EmailTemplateManager()
+
+    def format_each():
+        for company, name in contacts:
+            body = manager.format_template(manager.get_template(company, 'initial'), name=name)
+            subject = f"Data Science Opportunities at {company.title()}"
+
+    format_time = timed(format_each, args.repeat)
+    compiled_time = timed(lambda: manager.render_many(contacts), args.repeat)
+
+    print(f"contacts:    {args.contacts}")
+    print(f"str.format:  {format_time['best']:.3f}s ({args.contacts / format_time['best']:,.0f}/s)")
+    print(f"render_many: {compiled_time['best']:.3f}s ({args.contacts / compiled_time['best']:,.0f}/s)")
+    print(f"speedup:     {format_time['best'] / compiled_time['best']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Measure end-to-end send throughput without a mail server
+
+Schedules a synthetic contact list, then sends the whole schedule through
+the in-memory or spool transport with rate limits off, so the result is
+the cost of building, serializing and handing over each message.
+
+Usage:
+    python -m benchmarks.bench_transport --rows 10000
+    python -m benchmarks.bench_transport --rows 100000 --transport spool --build-workers 4
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import synthetic_contacts
+from src.email_automation import EmailAutomation
+
+
+def run(rows: int, transport: str, workdir: str, max_in_flight: int, build_workers: int) -> dict:
+    """
+    Schedule ``rows`` contacts and send every scheduled email
+
+    Args:
+        rows: Contact rows to generate
+        transport: 'memory' or 'spool'
+        workdir: Directory for the contact file, resume and spool
+        max_in_flight: Concurrent sends
+        build_workers: Processes building messages (0 builds inline)
+
+    Returns:
+        dict: Counts, timings and messages per second
+    """
+    path = os.path.join(workdir, f"contacts_{rows}.csv")
+    synthetic_contacts(rows).to_csv(path, index=False)
+    resume_path = os.path.join(workdir, 'resume.pdf')
+    with open(resume_path, 'wb') as f:
+        f.write(b"%PDF-1.4 benchmark resume" + b"\0" * 50_000)
+
+    settings = {'type': transport, 'spool_dir': os.path.join(workdir, 'spool'),
+                'memory_max_messages': 100, 'rate_limited': False}
+    automation = EmailAutomation(excel_path=path, sender_email='bench@example.com', sender_password='',
+                                 transport_settings=settings)
+    automation.resume_path = resume_path
+    try:
+        start = time.perf_counter()
+        automation.schedule_emails()
+        scheduled = len(automation.scheduled_emails)
+        schedule_s = time.perf_counter() - start
+
+        # Every send time, reminders included, is due "now"
+        start = time.perf_counter()
+        sent = asyncio.run(automation.send_scheduled_async(max_in_flight, now=datetime.now() + timedelta(days=36500),
+                                                           build_workers=build_workers))
+        send_s = time.perf_counter() - start
+        sink = automation.dispatcher.accounts[0].transport
+    finally:
+        automation.close()
+
+    return {
+        'rows': rows,
+        'transport': transport,
+        'build_workers': build_workers,
+        'max_in_flight': max_in_flight,
+        'scheduled': scheduled,
+        'sent': sent,
+        'bytes_sent': getattr(sink, 'bytes_sent', None),
+        'schedule_s': round(schedule_s, 3),
+        'send_s': round(send_s, 3),
+        'msgs_per_s': round(sent / send_s, 1) if send_s else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--transport', choices=['memory', 'spool'], default='memory')
+    parser.add_argument('--max-in-flight', type=int, default=8)
+    parser.add_argument('--build-workers', type=int, default=0)
+    parser.add_argument('--output', help="Write the result as JSON to this file")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        result = run(args.rows, args.transport, workdir, args.max_in_flight, args.build_workers)
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""
+Shared helpers for the benchmark scripts
+"""
+import os
+import subprocess
+import time
+from typing import Callable, Dict
+
+from tests.contacts import synthetic_contacts  # noqa: F401 (shared with the tests)
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+
+def git_commit() -> str:
+    """Short hash of the checked-out commit, or 'unknown' outside a git checkout"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def timed(func: Callable, repeat: int = 1) -> Dict[str, float]:
+    """
+    Time a callable
+
+    Args:
+        func: Zero-argument callable to time
+        repeat: Number of runs
+
+    Returns:
+        Dict[str, float]: Best and mean wall-clock seconds
+    """
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - started)
+    return {'best': min(runs), 'mean': sum(runs) / len(runs)}
@@ -0,0 +1,179 @@
+"""
+Time the main pipeline stages on synthetic contact lists and save the results as JSON
+
+Covers process_excel_file, create_batches, _schedule_batch,
+EmailTemplateManager.format_template, CompanyMatcher.identify_company and
+_send_email. Sends go to an in-process SMTP sink, so the suite runs offline.
+
+Usage:
+    python -m benchmarks.suite --sizes 1000 10000 100000 1000000
+    python -m benchmarks.suite --sizes 1000 --output benchmarks/results/baseline.json
+    python -m benchmarks.suite --sizes 1000 --compare benchmarks/results/baseline.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import tempfile
+from datetime import datetime
+from typing import Dict, List
+
+from benchmarks.common import RESULTS_DIR, git_commit, synthetic_contacts, timed
+from src.email_automation import EmailAutomation
+from src.rate_limiter import RateLimiter
+from tests.smtp_server import LocalSMTPServer
+
+
+def _result(rows: int, name: str, timing: Dict[str, float], ops: int) -> Dict:
+    return {
+        'rows': rows,
+        'benchmark': name,
+        'ops': ops,
+        'best_s': round(timing['best'], 6),
+        'mean_s': round(timing['mean'], 6),
+        'ops_per_s': round(ops / timing['best'], 1) if timing['best'] else None,
+    }
+
+
+def run_size(rows: int, workdir: str, file_format: str, repeat: int, send_limit: int,
+             server: LocalSMTPServer) -> List[Dict]:
+    """
+    Run every benchmark on one synthetic contact list
+
+    Args:
+        rows: Contact rows to generate
+        workdir: Directory for the generated contact file
+        file_format: 'csv' or 'xlsx'
+        repeat: Runs per benchmark (best and mean are reported)
+        send_limit: Maximum emails sent through the SMTP sink
+        server: Running SMTP sink
+
+    Returns:
+        List[Dict]: One result per benchmark
+    """
+    path = os.path.join(workdir, f"contacts_{rows}.{file_format}")
+    df = synthetic_contacts(rows)
+    if file_format == 'xlsx':
+        df.to_excel(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+
+    resume_path = os.path.join(workdir, 'resume.pdf')
+    automation = EmailAutomation(excel_path=path, sender_email='bench@example.com', sender_password='')
+    automation.resume_path = resume_path
+    account = automation.dispatcher.accounts[0]
+    account.provider = server.provider(pool_size=1)
+    account.rate_limiter = RateLimiter({})
+    results = []
+
+    try:
+        company_contacts = automation.process_excel_file()
+        contact_count = sum(len(c) for c in company_contacts.values())
+        results.append(_result(rows, 'process_excel_file',
+                               timed(automation.process_excel_file, repeat), rows))
+
+        batches = list(automation.create_batches(company_contacts))
+        results.append(_result(rows, 'create_batches',
+                               timed(lambda: list(automation.create_batches(company_contacts)), repeat),
+                               contact_count))
+
+        scheduled = sum(len(c) for batch in batches for c in batch.values())
+
+        def schedule_all():
+            automation.scheduled_emails.clear()
+            automation.scheduler = type(automation.scheduler)()
+            for batch_idx, batch in enumerate(batches, 1):
+                automation._schedule_batch(batch, days_delay=batch_idx - 1, is_reminder=False, batch_num=batch_idx)
+
+        results.append(_result(rows, '_schedule_batch', timed(schedule_all, repeat), scheduled))
+
+        manager = automation.template_manager
+        contacts = [(company, name) for company, items in company_contacts.items() for name, _, _ in items]
+
+        def format_all():
+            for company, name in contacts:
+                manager.format_template(manager.get_template(company, 'initial'), name=name)
+
+        results.append(_result(rows, 'format_template', timed(format_all, repeat), len(contacts)))
+
+        emails = df['Email'].dropna().astype(str).tolist()
+        matcher = automation.company_matcher
+
+        def identify_all():
+            matcher._lookup.cache_clear()
+            for email in emails:
+                matcher.identify_company(email)
+
+        results.append(_result(rows, 'identify_company', timed(identify_all, repeat), len(emails)))
+
+        recipients = [(company, name, email) for company, items in company_contacts.items()
+                      for name, email, _ in items][:send_limit]
+
+        def send_all():
+            # Fresh index each run so repeats are not skipped as duplicates
+            automation.sent_index.close()
+            automation.sent_index = type(automation.sent_index)()
+            server.messages.clear()
+            for company, name, email in recipients:
+                automation._send_email(email, name, company, is_reminder=False, batch_num=1)
+
+        results.append(_result(rows, '_send_email', timed(send_all, repeat), len(recipients)))
+    finally:
+        automation.close()
+        os.remove(path)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--format', choices=['csv', 'xlsx'], default='csv', dest='file_format')
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--send-limit', type=int, default=1_000,
+                        help='Maximum emails sent through the local SMTP sink per size')
+    parser.add_argument('--output', help='JSON results file (default: benchmarks/results/<timestamp>.json)')
+    parser.add_argument('--compare', help='Earlier results file to compare against')
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = {(r['rows'], r['benchmark']): r for r in json.load(f)['results']}
+
+    # Per-email info logging would dominate the timings
+    logging.basicConfig(level=logging.WARNING)
+
+    started = datetime.now()
+    report = {
+        'started': started.isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'format': args.file_format,
+        'repeat': args.repeat,
+        'results': [],
+    }
+
+    with tempfile.TemporaryDirectory() as workdir, LocalSMTPServer() as server:
+        with open(os.path.join(workdir, 'resume.pdf'), 'wb') as f:
+            f.write(b"%PDF-1.4 benchmark resume" + b"\0" * 50_000)
+        for rows in args.sizes:
+            for result in run_size(rows, workdir, args.file_format, args.repeat, args.send_limit, server):
+                report['results'].append(result)
+                line = (f"{rows:>9} {result['benchmark']:<20} {result['best_s']:>10.4f}s "
+                        f"{result['ops_per_s'] or 0:>14,.0f}/s")
+                previous = baseline.get((rows, result['benchmark']))
+                if previous and previous['ops_per_s'] and result['ops_per_s']:
+                    line += f"  {result['ops_per_s'] / previous['ops_per_s']:>6.2f}x vs baseline"
+                print(line)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{started.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,13 +5,25 @@ Configuration management for email automation system.
 from .settings import (
     EMAIL_SETTINGS,
     EMAIL_PROVIDERS,
+    SENDER_ACCOUNTS,
+    TRANSPORT_SETTINGS,
+    DOMAIN_CHECK_SETTINGS,
+    ATTACHMENT_SETTINGS,
+    RETRY_SETTINGS,
     LOGGING,
+    LOGGING_SETTINGS,
     PATH_SETTINGS
 )
 
 __all__ = [
     'EMAIL_SETTINGS',
     'EMAIL_PROVIDERS',
+    'SENDER_ACCOUNTS',
+    'TRANSPORT_SETTINGS',
+    'DOMAIN_CHECK_SETTINGS',
+    'ATTACHMENT_SETTINGS',
+    'RETRY_SETTINGS',
     'LOGGING',
+    'LOGGING_SETTINGS',
     'PATH_SETTINGS'
 ]
\ No newline at end of file
@@ -81,13 +81,31 @@ from datetime import timedelta
 Configuration settings for email automation
 """
 import os
+from datetime import timedelta
 
 # Email batch settings
 EMAIL_SETTINGS = {
     'batch_size': 4,         # Reduced from 40 for testing
     'company_quota': 1,      # Reduced from 10 for testing
     'reminder_delay': 2,     # Days before sending reminder
-    'cooling_period': 0.1    # Reduced cooling period for testing
+    'cooling_period': 0.1,   # Hours per batch_limit window (reduced for testing)
+    'max_in_flight': 4,      # Concurrent sends in the async engine
+    'ingest_chunksize': 10000,  # Contact rows validated per chunk
+    'campaign': 'data-science-outreach',  # Dedupe scope for the sent-email index
+    'sent_index_bloom_capacity': 1000000,  # Expected sent emails; sizes the in-memory Bloom filter
+    'rate_limit_max_wait': 60,  # Seconds a sender will block waiting for a rate limit token
+    'claim_page_size': 500,  # Due rows a sender claims from the schedule store at a time
+    'claim_lease': 3600,     # Seconds before another run may recover rows a sender claimed (renewed while sending)
+    'build_workers': 0       # Processes building MIME messages ahead of the senders (0 builds inline)
+}
+
+# Retry settings for failed emails
+RETRY_SETTINGS = {
+    'max_attempts': 3,       # Sends attempted before giving up
+    'delay_between_attempts': timedelta(minutes=30),  # Delay before the first retry
+    'exponential_backoff': True,  # Double the delay after each failure
+    'max_delay': timedelta(hours=6),  # Cap on any single retry delay
+    'jitter': 0.2            # Randomly spread delays by +/-20%
 }
 
 # Email provider configurations
@@ -96,10 +114,73 @@ EMAIL_PROVIDERS = {
         'smtp_server': 'smtp.gmail.com',
         'smtp_port': 587,
         'daily_limit': 500,
-        'batch_limit': 100
+        'batch_limit': 100,                   # Emails per cooling_period window
+        'per_second_limit': 2,
+        'use_tls': True,
+        'pool_size': 4,                       # Concurrent SMTP sessions kept open
+        'max_messages_per_connection': 100,   # Recycle a session after this many sends
+        'idle_timeout': 300                   # Seconds before an unused session is recycled
+    },
+    'outlook': {
+        'smtp_server': 'smtp.office365.com',
+        'smtp_port': 587,
+        'daily_limit': 300,
+        'batch_limit': 75,
+        'per_second_limit': 1,
+        'use_tls': True,
+        'pool_size': 2,
+        'max_messages_per_connection': 100,
+        'idle_timeout': 300
     }
 }
 
+# Sender accounts the send load is spread over. Credentials come from the
+# named environment variables; accounts without credentials are skipped.
+# Any provider setting (e.g. daily_limit) can be overridden per account.
+SENDER_ACCOUNTS = [
+    {'provider': 'gmail', 'email_env': 'SENDER_EMAIL', 'password_env': 'SENDER_PASSWORD'},
+    # {'provider': 'outlook', 'email_env': 'OUTLOOK_EMAIL', 'password_env': 'OUTLOOK_PASSWORD'},
+    # {'provider': 'gmail', 'email_env': 'SENDER_EMAIL_2', 'password_env': 'SENDER_PASSWORD_2', 'daily_limit': 200},
+]
+
+# How messages leave the process: 'smtp' sends for real, 'spool' writes
+# each message into a maildir per sender, 'memory' keeps them in a
+# bounded in-memory sink. Spool and memory runs skip the provider rate
+# limits (and leave their saved state alone) unless rate_limited is set.
+TRANSPORT_SETTINGS = {
+    'type': 'smtp',
+    'spool_dir': os.path.join('data', 'spool'),
+    'memory_max_messages': 1000,  # Messages the in-memory sink keeps for inspection
+    'rate_limited': False         # Apply provider rate limits to spool/memory runs
+}
+
+# Recipient domain deliverability check at ingest. Each distinct domain
+# is looked up once (MX records, or an address when there is no MX) and
+# contacts on domains that cannot receive mail are dropped.
+DOMAIN_CHECK_SETTINGS = {
+    'enabled': False,
+    'ttl': timedelta(days=7),      # How long a deliverable answer is cached
+    'dead_ttl': timedelta(days=1), # How long an undeliverable answer is cached
+    'timeout': 5.0,                # Seconds per MX lookup
+    'max_workers': 16              # Concurrent lookups
+}
+
+# Attachment settings
+ATTACHMENT_SETTINGS = {
+    'filename': 'Sai_Harsha_Mummaneni_Resume.pdf',
+    'subtype': 'pdf',
+    # Per-company resume variants, e.g.
+    # 'amazon': {'path': 'data/resume_amazon.pdf', 'filename': 'Resume_Amazon.pdf'}
+    'company_variants': {}
+}
+
+# Logging behaviour on the send path
+LOGGING_SETTINGS = {
+    'use_queue': True,          # Write log records from a background thread (QueueHandler/QueueListener)
+    'summary_interval': 10.0,   # Seconds between per-recipient summary lines
+    'debug_sample_rate': 100,   # Keep 1 in N debug lines from the company matcher and validators
+}
+
 # Logging configuration
 LOGGING = {
     'version': 1,
@@ -109,6 +190,12 @@ LOGGING = {
             'format': '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
         }
     },
+    'filters': {
+        'debug_sample': {
+            '()': 'src.logging_setup.DebugSampler',
+            'rate': LOGGING_SETTINGS['debug_sample_rate']
+        }
+    },
     'handlers': {
         'console': {
             'class': 'logging.StreamHandler',
@@ -126,6 +213,12 @@ LOGGING = {
         '': {
             'handlers': ['console', 'file'],
             'level': 'DEBUG',
+        },
+        'src.utils.company_matcher': {
+            'filters': ['debug_sample']
+        },
+        'src.utils.validators': {
+            'filters': ['debug_sample']
         }
     }
 }
@@ -134,5 +227,15 @@ LOGGING = {
 PATH_SETTINGS = {
     'data_dir': 'data',
     'logs_dir': 'logs',
-    'templates_dir': os.path.join('src', 'templates')
+    'templates_dir': os.path.join('src', 'templates'),
+    'schedule_db': os.path.join('data', 'schedule.db'),
+    'sent_index': os.path.join('data', 'sent_index.db'),
+    'rate_limit_dir': os.path.join('data', 'rate_limits'),  # Per-account rate limit state
+    'company_domains': os.path.join('data', 'company_domains.csv'),  # Optional company,domain mapping
+    'contact_fingerprints': os.path.join('data', 'contact_fingerprints.db'),  # Rows seen by earlier runs
+    'contact_cache_dir': os.path.join('data', 'cache'),  # Parsed contact tables keyed by source mtime/size
+    'domain_cache': os.path.join('data', 'domain_cache.db'),  # Recipient domain lookups with their check time
+    'dry_run_dir': os.path.join('data', 'dry_run'),  # Schedule and sent-email state of spool/memory runs
+    'metrics_prom': os.path.join('logs', 'metrics.prom'),  # Prometheus textfile export
+    'metrics_json': os.path.join('logs', 'metrics.json')   # JSON snapshot of the same metrics
 }
\ No newline at end of file
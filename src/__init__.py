@@ -6,8 +6,22 @@ A system for automating personalized email campaigns to data science managers.
 __version__ = '1.0.0'
 __author__ = 'Sai Harsha Mummaneni'
 
-from .email_automation import EmailAutomation
-from .templates import EmailTemplateManager
+import importlib
 
 __all__ = ['EmailAutomation', 'EmailTemplateManager']
 
+# Exports are imported on first use, so importing a light submodule such as
+# src.schedule_store does not pull in pandas through EmailAutomation
+_EXPORTS = {
+    'EmailAutomation': '.email_automation',
+    'EmailTemplateManager': '.templates',
+}
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
@@ -0,0 +1,66 @@
+"""
+Encode-once cache for email attachments
+"""
+import base64
+import logging
+import os
+import threading
+from email.mime.base import MIMEBase
+from typing import Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class AttachmentCache:
+    """
+    Reads and base64-encodes each attachment file once
+
+    Entries are keyed by path and validated against the file's mtime and
+    size on every lookup, so an edited file is re-encoded automatically.
+    Each call returns a fresh MIME part that reuses the cached payload.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[Tuple[int, int], str]] = {}
+        self._lock = threading.Lock()
+
+    def _encoded_payload(self, path: str) -> str:
+        """Return the base64 payload for ``path``, encoding it only when it changed"""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+
+        with open(path, 'rb') as f:
+            # Same line-wrapped encoding email.encoders.encode_base64 produces
+            payload = base64.encodebytes(f.read()).decode('ascii')
+        with self._lock:
+            self._entries[path] = (signature, payload)
+        logger.debug(f"Encoded attachment {path} ({stat.st_size} bytes)")
+        return payload
+
+    def get(self, path: str, filename: str, subtype: str = 'pdf') -> MIMEBase:
+        """
+        Build an attachment part from the cached encoding
+
+        Args:
+            path: File to attach
+            filename: Filename shown to the recipient
+            subtype: MIME subtype under application/
+
+        Returns:
+            MIMEBase: Attachment part ready to add to a message
+        """
+        part = MIMEBase('application', subtype)
+        part.set_payload(self._encoded_payload(path))
+        part['Content-Transfer-Encoding'] = 'base64'
+        part.add_header('Content-Disposition', 'attachment', filename=filename)
+        return part
+
+    def clear(self):
+        """Drop every cached encoding"""
+        with self._lock:
+            self._entries.clear()
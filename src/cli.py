@@ -0,0 +1,319 @@
+"""
+Command line interface for the email automation system
+
+Each subcommand imports what it needs when it runs: ``status`` only opens
+the schedule database and ``check`` only loads the SMTP stack, so neither
+pays for pandas or the MIME builders.
+
+Usage:
+    python main.py                      # schedule, then send everything due
+    python main.py ingest               # parse and validate the contact file
+    python main.py schedule             # schedule new contacts
+    python main.py send [--max-in-flight N] [--build-workers N]
+    python main.py status [--json]      # schedule counts and the next send time
+    python main.py check                # log in to every sender account
+    python main.py --transport memory   # dry run: schedule and send everything in-process
+
+With a spool or memory transport, the schedule, sent-email index and
+fingerprints live under PATH_SETTINGS['dry_run_dir'], so rehearsals never
+mark real recipients as sent.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+from datetime import datetime
+from typing import List, Optional
+
+from config.settings import (DOMAIN_CHECK_SETTINGS, EMAIL_PROVIDERS, EMAIL_SETTINGS, LOGGING, LOGGING_SETTINGS,
+                             PATH_SETTINGS, SENDER_ACCOUNTS, TRANSPORT_SETTINGS)
+from src.logging_setup import configure_logging, stop_logging
+
+logger = logging.getLogger('email_automation')
+
+STATUSES = ('pending', 'claimed', 'sent', 'failed', 'skipped')
+
+
+def setup_logging():
+    """Configure logging"""
+    # Create logs directory if it doesn't exist
+    os.makedirs(PATH_SETTINGS['logs_dir'], exist_ok=True)
+
+    # Configure logging; records are written by a background listener
+    configure_logging(LOGGING, use_queue=LOGGING_SETTINGS['use_queue'])
+    logger.info(f"Starting email automation at {datetime.now()}")
+
+
+def _load_env():
+    """Load sender credentials from .env"""
+    from dotenv import load_dotenv
+    load_dotenv()
+
+
+def _transport_settings(args) -> dict:
+    """TRANSPORT_SETTINGS with the --transport override applied"""
+    settings = dict(TRANSPORT_SETTINGS)
+    if args.transport:
+        settings['type'] = args.transport
+    return settings
+
+
+def _is_dry_run(args) -> bool:
+    return _transport_settings(args)['type'] != 'smtp'
+
+
+def _state_path(args, key: str, filename: str) -> str:
+    """Where a store lives: PATH_SETTINGS for live runs, the dry-run directory otherwise"""
+    if _is_dry_run(args):
+        os.makedirs(PATH_SETTINGS['dry_run_dir'], exist_ok=True)
+        return os.path.join(PATH_SETTINGS['dry_run_dir'], filename)
+    return PATH_SETTINGS[key]
+
+
+def _configured_accounts(args):
+    """Every SENDER_ACCOUNTS entry whose credentials are set"""
+    from src.dispatcher import load_sender_accounts
+
+    return load_sender_accounts(
+        SENDER_ACCOUNTS, EMAIL_PROVIDERS,
+        cooling_period=EMAIL_SETTINGS['cooling_period'],
+        state_dir=PATH_SETTINGS['rate_limit_dir'],
+        transport_settings=_transport_settings(args)
+    )
+
+
+def _domain_checker(args):
+    """A DomainChecker when --check-domains (or DOMAIN_CHECK_SETTINGS['enabled']) asks for one"""
+    enabled = DOMAIN_CHECK_SETTINGS['enabled'] if args.check_domains is None else args.check_domains
+    if not enabled:
+        return None
+    from src.utils.domain_checker import DomainChecker
+
+    os.makedirs(os.path.dirname(PATH_SETTINGS['domain_cache']) or '.', exist_ok=True)
+    return DomainChecker.from_settings(DOMAIN_CHECK_SETTINGS, PATH_SETTINGS['domain_cache'])
+
+
+def _automation(args):
+    """Build an EmailAutomation wired to the configured stores"""
+    from src.email_automation import EmailAutomation
+
+    return EmailAutomation(
+        excel_path=args.contacts,
+        sender_email=os.getenv('SENDER_EMAIL'),
+        sender_password=os.getenv('SENDER_PASSWORD'),
+        schedule_db=_state_path(args, 'schedule_db', 'schedule.db'),
+        sent_index_db=_state_path(args, 'sent_index', 'sent_index.db'),
+        fingerprint_db=_state_path(args, 'contact_fingerprints', 'contact_fingerprints.db'),
+        contact_cache_dir=PATH_SETTINGS['contact_cache_dir'],
+        accounts=_configured_accounts(args) or None,
+        transport_settings=_transport_settings(args),
+        domain_checker=_domain_checker(args)
+    )
+
+
+def _send_due(automation, args) -> int:
+    """Send what is due; dry runs with --all send the whole schedule at once"""
+    import asyncio
+    from datetime import timedelta
+
+    now = datetime.now() + timedelta(days=36500) if getattr(args, 'all', False) else None
+    return asyncio.run(automation.send_scheduled_async(getattr(args, 'max_in_flight', None), now=now,
+                                                       build_workers=getattr(args, 'build_workers', None)))
+
+
+def _write_metrics():
+    from src.metrics import REGISTRY
+
+    REGISTRY.write_prometheus(PATH_SETTINGS['metrics_prom'])
+    REGISTRY.write_json(PATH_SETTINGS['metrics_json'])
+
+
+def _run_automation(args, action) -> int:
+    """Run ``action(automation)``, exporting metrics and closing the automation afterwards"""
+    _load_env()
+    automation = None
+    try:
+        automation = _automation(args)
+        return action(automation)
+    except Exception as e:
+        logger.error(f"Error in email automation: {e}")
+        raise
+    finally:
+        if automation is not None:
+            # Export before closing so the schedule gauges can still read the store
+            _write_metrics()
+            automation.close()
+
+
+def cmd_ingest(args) -> int:
+    """Parse and validate the contact file, warming the parsed-contact cache"""
+    def ingest(automation):
+        company_contacts = automation.process_excel_file()
+        for company, contacts in sorted(company_contacts.items()):
+            print(f"{company}: {len(contacts)}")
+        print(f"total: {sum(len(contacts) for contacts in company_contacts.values())}")
+        if automation.fingerprints is not None:
+            # Not committed: these contacts are still new to the next schedule run
+            print(f"changes since the last schedule: {automation.fingerprints.summary()}")
+        return 0
+    return _run_automation(args, ingest)
+
+
+def cmd_schedule(args) -> int:
+    """Schedule new contacts (resuming any stored schedule)"""
+    def schedule(automation):
+        automation.schedule_emails()
+        print(f"{len(automation.scheduled_emails)} emails scheduled")
+        return 0
+    return _run_automation(args, schedule)
+
+
+def cmd_send(args) -> int:
+    """Send every stored email that is due"""
+    if args.all and not _is_dry_run(args):
+        print("--all is only available with the spool or memory transport", file=sys.stderr)
+        return 2
+
+    def send(automation):
+        automation.resume_schedule()
+        sent = _send_due(automation, args)
+        print(f"{sent} emails sent")
+        return 0
+    return _run_automation(args, send)
+
+
+def cmd_run(args) -> int:
+    """Schedule, then send everything due (the default command)"""
+    args.all = _is_dry_run(args)  # A rehearsal covers the whole campaign
+
+    def run(automation):
+        automation.schedule_emails()
+        sent = _send_due(automation, args)
+        logger.info(f"Email automation completed successfully ({sent} emails sent)")
+        return 0
+    return _run_automation(args, run)
+
+
+def cmd_status(args) -> int:
+    """Report schedule counts without loading the contact pipeline"""
+    db_path = _state_path(args, 'schedule_db', 'schedule.db')
+    if not os.path.exists(db_path):
+        print(f"No schedule at {db_path}")
+        return 0
+
+    from src.schedule_store import ScheduleStore
+    from src.scheduler import EXPORT_FORMATS, write_rows
+
+    fmt = os.path.splitext(args.export)[1].lstrip('.').lower() if args.export else None
+    if fmt is not None and fmt not in EXPORT_FORMATS:
+        print(f"Cannot export to {args.export}: use a .csv or .jsonl file", file=sys.stderr)
+        return 2
+
+    # Breakdowns and pages are computed by SQLite; nothing loads the whole schedule
+    store = ScheduleStore(db_path)
+    try:
+        counts = {status: store.count(status) for status in STATUSES}
+        next_send = store.next_send_time()
+        report = {'counts': counts, 'next_send_time': next_send.isoformat() if next_send else None}
+        if args.by:
+            report[f"pending_by_{args.by}"] = store.pending_counts(args.by)
+        if args.rows:
+            report['rows'] = list(store.iter_pending_rows(offset=args.offset, limit=args.rows))
+        if args.export:
+            with open(args.export, 'w', newline='') as f:
+                written = write_rows(f, store.iter_pending_rows(), fmt)
+            print(f"Exported {written} pending emails to {args.export}", file=sys.stderr)
+    finally:
+        store.close()
+
+    if args.json:
+        print(json.dumps(report))
+        return 0
+
+    for status, count in counts.items():
+        print(f"{status:>8}: {count}")
+    print(f"next send: {next_send.strftime('%Y-%m-%d %H:%M:%S') if next_send else '-'}")
+    if args.by:
+        print(f"\npending by {args.by}:")
+        for value, count in report[f"pending_by_{args.by}"].items():
+            print(f"  {value}: {count}")
+    if args.rows:
+        print()
+        for row in report['rows']:
+            print(f"  {row['date']} {row['time']}  batch {row['batch']:>3}  {row['type']:<8}  "
+                  f"{row['company']:<10}  {row['recipient']}")
+    return 0
+
+
+def cmd_check(args) -> int:
+    """Open an authenticated SMTP session for every sender account"""
+    _load_env()
+    accounts = _configured_accounts(args)
+    if not accounts and os.getenv('SENDER_EMAIL'):
+        # EmailAutomation's default: the .env sender on Gmail
+        from src.dispatcher import SenderAccount
+        accounts = [SenderAccount(os.getenv('SENDER_EMAIL'), os.getenv('SENDER_PASSWORD'), EMAIL_PROVIDERS['gmail'],
+                                  transport_settings=_transport_settings(args))]
+    if not accounts:
+        print("No sender accounts configured")
+        return 1
+
+    failures = 0
+    for account in accounts:
+        try:
+            account.transport.check()
+            print(f"ok      {account.email} ({account.provider_name}, {account.transport.name})")
+        except Exception as e:
+            failures += 1
+            print(f"FAILED  {account.email} ({account.provider_name}): {e}")
+        finally:
+            account.close()
+    return 1 if failures else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Argument parser for every subcommand"""
+    parser = argparse.ArgumentParser(prog='massemailer', description="Personalized email campaign automation")
+    parser.add_argument('--contacts', default=os.path.join(PATH_SETTINGS['data_dir'], 'contacts.xlsx'),
+                        help="Contact list (.xlsx, .csv or .parquet)")
+    parser.add_argument('--transport', choices=['smtp', 'spool', 'memory'],
+                        help="Override TRANSPORT_SETTINGS['type']; spool and memory are dry runs")
+    parser.add_argument('--check-domains', action=argparse.BooleanOptionalAction, default=None,
+                        help="Drop contacts whose domain cannot receive mail (default: DOMAIN_CHECK_SETTINGS)")
+    parser.set_defaults(func=cmd_run)
+    commands = parser.add_subparsers(title='commands')
+
+    commands.add_parser('ingest', help="Parse and validate the contact file").set_defaults(func=cmd_ingest)
+    commands.add_parser('schedule', help="Schedule new contacts").set_defaults(func=cmd_schedule)
+
+    send = commands.add_parser('send', help="Send every scheduled email that is due")
+    send.add_argument('--max-in-flight', type=int, default=None, help="Concurrent sends")
+    send.add_argument('--build-workers', type=int, default=None, help="Processes building messages")
+    send.add_argument('--all', action='store_true', help="Dry runs only: send the whole schedule now")
+    send.set_defaults(func=cmd_send)
+
+    status = commands.add_parser('status', help="Show schedule counts")
+    status.add_argument('--json', action='store_true', help="Print machine-readable JSON")
+    status.add_argument('--by', choices=['date', 'company', 'batch', 'type'], help="Break pending emails down")
+    status.add_argument('--rows', type=int, default=0, help="List this many pending emails in send order")
+    status.add_argument('--offset', type=int, default=0, help="Pending emails to skip before listing")
+    status.add_argument('--export', help="Write every pending email to a .csv or .jsonl file")
+    status.set_defaults(func=cmd_status)
+
+    commands.add_parser('check', help="Test SMTP login for every sender account").set_defaults(func=cmd_check)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Parse ``argv`` and run the chosen subcommand"""
+    args = build_parser().parse_args(argv)
+    setup_logging()
+    try:
+        return args.func(args)
+    finally:
+        stop_logging()  # Drain queued records before exiting
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,211 @@
+"""
+Spreads outgoing email across several sender accounts and providers
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from .metrics import MetricsRegistry
+from .rate_limiter import RateLimiter
+from .transports import Transport, create_transport
+
+logger = logging.getLogger(__name__)
+
+
+class SenderAccount:
+    """One mailbox: its credentials, provider limits, transport and rate limiter"""
+
+    def __init__(self, email: str, password: str, provider: Dict, provider_name: str = 'gmail',
+                 cooling_period: Optional[float] = None, state_path: Optional[str] = None,
+                 metrics: Optional[MetricsRegistry] = None, transport_settings: Optional[Dict] = None):
+        """
+        Initialize a sender account
+
+        Args:
+            email: Sender's email address
+            password: Sender's email password
+            provider: ``EMAIL_PROVIDERS`` entry, with any per-account overrides applied
+            provider_name: Provider key, used in log messages
+            cooling_period: Hours per ``batch_limit`` window
+            state_path: Optional JSON file persisting this account's rate limits
+            metrics: Registry for SMTP latencies (defaults to the global one)
+            transport_settings: ``TRANSPORT_SETTINGS`` (defaults to live SMTP)
+        """
+        self.email = email
+        self.password = password
+        self.provider = provider
+        self.provider_name = provider_name
+        self.transport_settings = transport_settings or {'type': 'smtp'}
+        if self.transport_settings['type'] != 'smtp' and not self.transport_settings.get('rate_limited', False):
+            # Dry runs go at full speed and must not use up the real quotas saved in state_path
+            self.rate_limiter = RateLimiter({})
+        else:
+            self.rate_limiter = RateLimiter.from_provider(provider, cooling_period, state_path)
+        self.metrics = metrics
+        self.disabled = None  # Why the account stopped sending for this run, if it did
+        self._transport = None
+        self._transport_lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, account: Dict, providers: Dict[str, Dict], cooling_period: Optional[float] = None,
+                      state_dir: Optional[str] = None,
+                      transport_settings: Optional[Dict] = None) -> Optional['SenderAccount']:
+        """
+        Build an account from a ``SENDER_ACCOUNTS`` entry
+
+        Credentials are read from the environment variables the entry names.
+
+        Args:
+            account: Account settings (provider, email_env, password_env, optional limit overrides)
+            providers: ``EMAIL_PROVIDERS`` settings
+            cooling_period: Hours per ``batch_limit`` window
+            state_dir: Optional directory for per-account rate limit state
+            transport_settings: ``TRANSPORT_SETTINGS`` (defaults to live SMTP)
+
+        Returns:
+            Optional[SenderAccount]: The account, or None if its credentials are not set
+        """
+        email = os.getenv(account['email_env'])
+        password = os.getenv(account['password_env'])
+        if not email or not password:
+            logger.warning(f"Skipping {account['provider']} account: {account['email_env']} or "
+                           f"{account['password_env']} is not set")
+            return None
+
+        provider = dict(providers[account['provider']])
+        provider.update({k: v for k, v in account.items() if k not in ('provider', 'email_env', 'password_env')})
+        state_path = None
+        if state_dir:
+            os.makedirs(state_dir, exist_ok=True)
+            state_path = os.path.join(state_dir, f"{email}.json")
+        return cls(email, password, provider, account['provider'], cooling_period, state_path,
+                   transport_settings=transport_settings)
+
+    @property
+    def transport(self) -> Transport:
+        """Lazily created transport for this account (a pool of SMTP sessions unless configured otherwise)"""
+        with self._transport_lock:
+            if self._transport is None:
+                self._transport = create_transport(self.transport_settings, self.provider, self.email,
+                                                   self.password, self.metrics)
+            return self._transport
+
+    def disable(self, reason: str):
+        """Stop using this account for the rest of the run (e.g. after its login is rejected)"""
+        if self.disabled is None:
+            logger.error(f"Disabling sender account {self.email}: {reason}")
+            self.disabled = reason
+
+    def close(self):
+        """Close the transport (and any open SMTP sessions) and save the rate limit state"""
+        self.rate_limiter.close()
+        with self._transport_lock:
+            if self._transport is not None:
+                self._transport.close()
+                self._transport = None
+
+
+def load_sender_accounts(account_settings: List[Dict], providers: Dict[str, Dict],
+                         cooling_period: Optional[float] = None, state_dir: Optional[str] = None,
+                         transport_settings: Optional[Dict] = None) -> List[SenderAccount]:
+    """
+    Build every configured sender account whose credentials are available
+
+    Args:
+        account_settings: ``SENDER_ACCOUNTS`` entries
+        providers: ``EMAIL_PROVIDERS`` settings
+        cooling_period: Hours per ``batch_limit`` window
+        state_dir: Optional directory for per-account rate limit state
+        transport_settings: ``TRANSPORT_SETTINGS`` (defaults to live SMTP)
+
+    Returns:
+        List[SenderAccount]: Usable accounts
+    """
+    accounts = []
+    for settings in account_settings:
+        account = SenderAccount.from_settings(settings, providers, cooling_period, state_dir, transport_settings)
+        if account is not None:
+            accounts.append(account)
+    logger.info(f"Loaded {len(accounts)} sender accounts")
+    return accounts
+
+
+class AccountDispatcher:
+    """
+    Picks the sender account for each email by remaining capacity
+
+    Accounts are tried in order of tokens left in their longest rate
+    window (usually the daily limit); the first one whose every window
+    has a token wins. Total throughput therefore grows with the number of
+    accounts instead of being capped at one mailbox.
+    """
+
+    def __init__(self, accounts: List[SenderAccount]):
+        if not accounts:
+            raise ValueError("At least one sender account is required")
+        self.accounts = accounts
+
+    def active_accounts(self) -> List[SenderAccount]:
+        """Accounts that have not been disabled"""
+        return [account for account in self.accounts if account.disabled is None]
+
+    def total_capacity(self) -> int:
+        """Sends left across all accounts in their longest windows"""
+        return sum(account.rate_limiter.capacity_left() for account in self.active_accounts())
+
+    def try_acquire(self) -> Optional[SenderAccount]:
+        """
+        Reserve a send on the account with the most remaining capacity
+
+        Returns:
+            Optional[SenderAccount]: Account to send from, or None if all are rate limited
+        """
+        ranked = sorted(self.active_accounts(), key=lambda a: a.rate_limiter.capacity_left(), reverse=True)
+        for account in ranked:
+            if account.rate_limiter.try_acquire():
+                return account
+        return None
+
+    def wait_time(self) -> float:
+        """Seconds until some account can send (infinite once every account is disabled)"""
+        return min((account.rate_limiter.wait_time() for account in self.active_accounts()), default=float('inf'))
+
+    def acquire(self, timeout: Optional[float] = None) -> Optional[SenderAccount]:
+        """
+        Block until an account can send
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            Optional[SenderAccount]: Account to send from, or None on timeout or when every account is disabled
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            account = self.try_acquire()
+            if account is not None:
+                return account
+            wait = self.wait_time()
+            if wait == float('inf') or (deadline is not None and wait > deadline - time.monotonic()):
+                return None
+            time.sleep(wait)
+
+    async def acquire_async(self, timeout: Optional[float] = None) -> Optional[SenderAccount]:
+        """Async counterpart of ``acquire`` that yields to the event loop while waiting"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            account = self.try_acquire()
+            if account is not None:
+                return account
+            wait = self.wait_time()
+            if wait == float('inf') or (deadline is not None and wait > deadline - time.monotonic()):
+                return None
+            await asyncio.sleep(wait)
+
+    def close(self):
+        """Close every account's SMTP sessions"""
+        for account in self.accounts:
+            account.close()
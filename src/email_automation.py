@@ -1,34 +1,48 @@
 """
 Main email automation class handling the core functionality
 """
-import pandas as pd
+import asyncio
+import json
 import logging
-from datetime import datetime, timedelta
+import os
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 import time
-from typing import Dict, List, Tuple
-from collections import defaultdict
-import pandas as pd
-import logging
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-import smtplib
-from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from email.mime.application import MIMEApplication  # Added for PDF attachment
-import time
-from typing import Dict, List, Tuple
-from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
 from .utils.validators import EmailValidator, DataValidator
 from .utils.company_matcher import CompanyMatcher
+from .utils.contact_reader import iter_contact_frames
+from .utils.contact_cache import ContactCache
+from .utils.fingerprints import ContactFingerprints
+from .utils.domain_checker import DomainChecker
 from .templates import EmailTemplateManager
-from config.settings import EMAIL_SETTINGS, EMAIL_PROVIDERS
+from .scheduler import EmailScheduler, ScheduledEmail, ScheduleIndex
+from .attachments import AttachmentCache
+from .message_builder import MessageBuilder, build_in_worker, init_build_worker
+from .logging_setup import LogSummary
+from .metrics import REGISTRY, MetricsRegistry
+from .retry import ACCOUNT, LOCAL, RetryPolicy, classify_smtp_error
+from .sent_index import SentIndex
+from .dispatcher import AccountDispatcher, SenderAccount
+from .schedule_store import PendingSchedule, ScheduleStore
+from config.settings import (EMAIL_SETTINGS, EMAIL_PROVIDERS, PATH_SETTINGS, ATTACHMENT_SETTINGS, RETRY_SETTINGS,
+                             LOGGING_SETTINGS, TRANSPORT_SETTINGS)
 
 logger = logging.getLogger(__name__)
 
 class EmailAutomation:
-    def __init__(self, excel_path: str, sender_email: str, sender_password: str):
+    def __init__(self, excel_path: str, sender_email: str, sender_password: str,
+                 schedule_db: Optional[str] = None, sent_index_db: Optional[str] = None,
+                 campaign: Optional[str] = None, rate_limit_dir: Optional[str] = None,
+                 accounts: Optional[List[SenderAccount]] = None, metrics: Optional[MetricsRegistry] = None,
+                 fingerprint_db: Optional[str] = None, contact_cache_dir: Optional[str] = None,
+                 transport_settings: Optional[Dict] = None, domain_checker: Optional[DomainChecker] = None):
         """
         Initialize email automation system
         
@@ -36,6 +50,16 @@ class EmailAutomation:
             excel_path: Path to Excel file with contacts
             sender_email: Sender's email address
             sender_password: Sender's email password
+            schedule_db: Optional SQLite path used to persist the schedule across restarts
+            sent_index_db: Optional SQLite path used to remember sent emails across restarts
+            campaign: Campaign name used in the dedupe key (defaults to EMAIL_SETTINGS['campaign'])
+            rate_limit_dir: Optional directory used to persist rate limit state across restarts
+            accounts: Sender accounts to spread the load over (defaults to the sender above on Gmail)
+            metrics: Registry for send-path metrics (defaults to the global one)
+            fingerprint_db: Optional SQLite path of contact fingerprints; enables incremental ingestion
+            contact_cache_dir: Optional directory for parsed-contact caches (requires pyarrow)
+            transport_settings: Transport for the default sender account (defaults to TRANSPORT_SETTINGS)
+            domain_checker: Optional recipient domain check; contacts on dead domains are dropped at ingest
         """
         self.excel_path = excel_path
         self.sender_email = sender_email
@@ -44,129 +68,444 @@ class EmailAutomation:
         # Initialize components
         self.validator = EmailValidator()
         self.data_validator = DataValidator()
-        self.company_matcher = CompanyMatcher()
+        domains_file = PATH_SETTINGS['company_domains']
+        self.company_matcher = CompanyMatcher(domains_file if os.path.exists(domains_file) else None)
+        self._cache_dependencies = [domains_file]  # Editing the domain list changes company matches
         self.template_manager = EmailTemplateManager()
+        self.batch_size = EMAIL_SETTINGS['batch_size']
+        self.company_quota = EMAIL_SETTINGS['company_quota']
+        self.metrics = metrics or REGISTRY
+        self._init_metrics()
+        # Per-recipient outcomes are logged at DEBUG and rolled up into periodic INFO lines
+        self._send_log = LogSummary(logger, "Send progress", LOGGING_SETTINGS['summary_interval'])
+        self._schedule_log = LogSummary(logger, "Schedule progress", LOGGING_SETTINGS['summary_interval'])
         
         # Track email sending
-        self.sent_emails = set()
+        self.campaign = campaign or EMAIL_SETTINGS['campaign']
+        self.sent_index = SentIndex(
+            sent_index_db or ':memory:',
+            bloom_capacity=EMAIL_SETTINGS['sent_index_bloom_capacity']
+        )
         self.failed_emails = defaultdict(list)
-        self.daily_count = 0
+        self.retry_policy = RetryPolicy.from_settings(RETRY_SETTINGS)
+        self.daily_count = 0  # Emails sent by this process
+        self._halt_reason = None  # Set when a local error means nothing more can be sent
+        if accounts is None:
+            accounts = [SenderAccount(
+                sender_email, sender_password, EMAIL_PROVIDERS['gmail'],
+                cooling_period=EMAIL_SETTINGS['cooling_period'],
+                state_path=os.path.join(rate_limit_dir, f"{sender_email}.json") if rate_limit_dir else None,
+                metrics=self.metrics,
+                transport_settings=transport_settings or TRANSPORT_SETTINGS
+            )]
+        self.dispatcher = AccountDispatcher(accounts)
         self.last_send_time = None
-        self.scheduled_emails = []  # Add this line
+        self.scheduler = EmailScheduler()
+        self.schedule_store = (ScheduleStore(schedule_db, lease=EMAIL_SETTINGS['claim_lease'])
+                               if schedule_db else None)
+        self._claims_renewed_at = 0.0  # time.monotonic() of the last claim or lease renewal
+        # Every email not yet sent, with date/company/batch counts. With a store the rows stay
+        # in SQLite and are claimed as they fall due; otherwise they are held here and in the scheduler
+        self.scheduled_emails = (PendingSchedule(self.schedule_store) if self.schedule_store is not None
+                                 else ScheduleIndex())
+        self.fingerprints = ContactFingerprints(fingerprint_db) if fingerprint_db else None
+        self._edited_contacts = []  # email key and name of contacts changed in the current pass
+        self.domain_checker = domain_checker
+        self.contact_cache = None
+        if contact_cache_dir:
+            try:
+                self.contact_cache = ContactCache(contact_cache_dir)
+            except ImportError as e:
+                logger.warning(f"Parsed-contact cache disabled: {e}")
+        self.attachment_cache = AttachmentCache()
+        self.message_builder = MessageBuilder(
+            os.path.join(PATH_SETTINGS['data_dir'], 'resume.pdf'), ATTACHMENT_SETTINGS,
+            self.template_manager, self.attachment_cache
+        )
+        self._build_pool = None  # Process pool for the MIME build stage, created on first use
 
+    def _init_metrics(self):
+        """Register the send-path counters, latencies and schedule gauges"""
+        metrics = self.metrics
+        self._sent_counter = metrics.counter('emails_sent_total', 'Emails delivered')
+        self._failed_counter = metrics.counter('emails_failed_total', 'Emails whose delivery raised an error')
+        self._retried_counter = metrics.counter('emails_retried_total', 'Failed emails queued for another attempt')
+        self._gave_up_counter = metrics.counter('emails_failed_permanent_total',
+                                                'Emails dropped after a permanent failure or too many attempts')
+        self._duplicate_counter = metrics.counter('emails_skipped_duplicate_total', 'Emails skipped as already sent')
+        self._rate_limited_counter = metrics.counter('emails_rate_limited_total',
+                                                     'Sends deferred because every account was rate limited')
+        self._build_seconds = metrics.histogram('message_build_seconds', 'Time to render and attach one message')
+        self._in_flight_gauge = metrics.gauge('emails_in_flight', 'Sends currently in progress')
+        # Released in close(), so a shared registry does not keep this instance alive
+        self._gauge_functions = [
+            (metrics.gauge('schedule_queued', 'Emails waiting in the in-memory scheduler'),
+             lambda: len(self.scheduler)),
+            (metrics.gauge('schedule_pending', 'Scheduled emails not yet sent'),
+             lambda: len(self.scheduled_emails)),
+            (metrics.gauge('schedule_next_due_seconds', 'Seconds until the next queued email is due'),
+             self._seconds_until_next_due),
+        ]
+        for gauge, function in self._gauge_functions:
+            gauge.set_function(function)
+
+    def _seconds_until_next_due(self) -> float:
+        if self.schedule_store is not None:
+            next_due = self.schedule_store.next_send_time()
+        else:
+            next_due = self.scheduler.next_due_time()
+        return (next_due - datetime.now()).total_seconds() if next_due else 0.0
+
+    @property
+    def resume_path(self) -> str:
+        """Default resume attached to every email"""
+        return self.message_builder.resume_path
+
+    @resume_path.setter
+    def resume_path(self, path: str):
+        self.message_builder.resume_path = path
+        # Build workers captured the old path when they started
+        self._shutdown_build_pool()
+
+    def _get_build_pool(self, workers: int) -> ProcessPoolExecutor:
+        """Start (once) the worker processes that build messages off the event loop"""
+        if self._build_pool is None:
+            self._build_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=init_build_worker,
+                initargs=(self.resume_path, ATTACHMENT_SETTINGS)
+            )
+        return self._build_pool
+
+    def _shutdown_build_pool(self):
+        if self._build_pool is not None:
+            self._build_pool.shutdown()
+            self._build_pool = None
+
+    def close(self):
+        """Close any open SMTP sessions, build workers and the schedule and sent-email stores"""
+        self._send_log.flush()
+        for gauge, function in self._gauge_functions:
+            gauge.clear_function(function)
+        self._shutdown_build_pool()
+        self.dispatcher.close()
+        if self.schedule_store is not None:
+            self.schedule_store.close()
+            self.schedule_store = None
+        if self.fingerprints is not None:
+            self.fingerprints.close()
+            self.fingerprints = None
+        if self.domain_checker is not None:
+            self.domain_checker.close()
+            self.domain_checker = None
+        self.sent_index.close()
 
     def process_excel_file(self) -> Dict[str, List[Tuple[str, str]]]:
         """Process Excel file and organize contacts by company"""
         logger.info(f"Processing Excel file: {self.excel_path}")
         
         try:
-            df = pd.read_excel(self.excel_path)
-            if not self.data_validator.validate_excel_structure(df):
-                raise ValueError("Invalid Excel structure")
-                
             company_contacts = defaultdict(list)
-            for _, row in df.iterrows():
-                email = str(row['Email'])
-                name = str(row['Name'])
-                role = str(row['Role'])
-                
-                if self.validator.is_valid_email(email):
-                    company = self.company_matcher.identify_company(email)
-                    if company != 'unknown':
-                        name = self.validator.normalize_name(name)
-                        company_contacts[company].append((name, email,role))
+            for chunk_contacts in self.iter_company_contacts():
+                for company, contacts in chunk_contacts.items():
+                    company_contacts[company].extend(contacts)
             
             logger.info(f"Processed {sum(len(contacts) for contacts in company_contacts.values())} valid contacts")
+            if self.fingerprints is not None:
+                logger.info(f"Contact changes since the last run: {self.fingerprints.summary()}")
+            if self.domain_checker is not None:
+                logger.info(f"Recipient domain checks: {self.domain_checker.summary()}")
             return company_contacts
             
         except Exception as e:
             logger.error(f"Error processing Excel file: {e}")
             raise
+    
+    def iter_company_contacts(self, chunksize: Optional[int] = None) -> Iterator[Dict[str, List[Tuple[str, str, str]]]]:
+        """
+        Stream validated contacts from the contact file one chunk at a time
+        
+        Supports .xlsx (openpyxl read-only mode), .csv and .parquet files, so
+        memory use stays flat regardless of list size. When contact
+        fingerprints are enabled, only contacts added since the last
+        committed run are returned; edited ones are kept for
+        ``_apply_contact_changes``. The whole file is still read on every
+        pass. With a domain checker, contacts on
+        domains that cannot receive mail are left out; the check runs on
+        the validated table, so cached tables stay valid as answers expire.
+        
+        Args:
+            chunksize: Rows per chunk (defaults to EMAIL_SETTINGS['ingest_chunksize'])
+            
+        Returns:
+            Iterator: Company -> contacts mapping for each chunk
+        """
+        chunksize = chunksize or EMAIL_SETTINGS['ingest_chunksize']
+        if self.fingerprints is not None:
+            self.fingerprints.reset_pass()
+            self._edited_contacts = []
+        for contacts in self._iter_contact_table(chunksize):
+            if self.domain_checker is not None and not contacts.empty:
+                contacts = contacts[self.domain_checker.deliverable_mask(contacts['email']).to_numpy()]
+            if self.fingerprints is not None and not contacts.empty:
+                new, changed = self.fingerprints.diff(contacts['key'].to_numpy(), contacts['hash'].to_numpy())
+                if changed.any():
+                    self._edited_contacts.append(contacts.loc[changed, ['key', 'name']])
+                contacts = contacts[new]
+            if contacts.empty:
+                continue
+            yield self._group_contacts(contacts)
+    
+    def _iter_contact_table(self, chunksize: int) -> Iterator[pd.DataFrame]:
+        """
+        Stream the validated contact table, from the contact cache when it is current
+        
+        On a cache miss the contact file is parsed and validated, and the
+        result is written to the cache as it streams past.
+        """
+        writer = None
+        if self.contact_cache is not None:
+            cached = self.contact_cache.load(self.excel_path, self._cache_dependencies, chunksize)
+            if cached is not None:
+                yield from cached
+                return
+            writer = self.contact_cache.writer(self.excel_path, self._cache_dependencies)
+        
+        fingerprint = writer is not None or self.fingerprints is not None
+        total_rows = 0
+        try:
+            for chunk_idx, df in enumerate(iter_contact_frames(self.excel_path, chunksize)):
+                if chunk_idx == 0 and not self.data_validator.validate_columns(df):
+                    raise ValueError("Invalid Excel structure")
+                total_rows += len(df)
+                contacts = self._validate_contacts(df, fingerprint=fingerprint)
+                if writer is not None:
+                    writer.write(contacts)
+                yield contacts
+            
+            if total_rows == 0:
+                logger.error("Excel file is empty")
+                raise ValueError("Invalid Excel structure")
+            if writer is not None:
+                writer.commit()
+        finally:
+            if writer is not None:
+                writer.discard()
+    
+    @staticmethod
+    def _as_str(column: pd.Series) -> pd.Series:
+        """Convert a column to strings the way ``str(value)`` would"""
+        if pd.api.types.is_string_dtype(column):
+            return column.fillna('nan')
+        return column.map(str)
+    
+    def _validate_contacts(self, df: pd.DataFrame, fingerprint: bool = False) -> pd.DataFrame:
+        """
+        Validate and company-match contact rows using column-wise string operations
+        
+        Args:
+            df: Raw rows with Role, Name and Email columns
+            fingerprint: Also add the rows' ``key`` and ``hash`` fingerprint columns
+            
+        Returns:
+            pd.DataFrame: company, name, email and role of the usable contacts
+        """
+        emails = self._as_str(df['Email'])
+        names = self._as_str(df['Name'])
+        roles = self._as_str(df['Role'])
+        valid = self.validator.valid_email_mask(emails)
+        
+        companies = self.company_matcher.identify_companies(emails[valid])
+        known = companies != 'unknown'
+        
+        contacts = pd.DataFrame({
+            'company': companies[known],
+            'name': self.validator.normalize_names(names[valid][known]),
+            'email': emails[valid][known],
+            'role': roles[valid][known],
+        })
+        if fingerprint:
+            # Fingerprint the rows as read, so the keys match whichever way they were loaded
+            keys, hashes = ContactFingerprints.fingerprint(emails, names, roles)
+            usable = valid.to_numpy().copy()
+            usable[usable] = known.to_numpy()
+            contacts['key'] = keys[usable]
+            contacts['hash'] = hashes[usable]
+        return contacts
+    
+    @staticmethod
+    def _group_contacts(contacts: pd.DataFrame) -> Dict[str, List[Tuple[str, str, str]]]:
+        """Group a validated contact table by company"""
+        company_contacts = defaultdict(list)
+        for company, group in contacts.groupby('company', sort=False):
+            company_contacts[company] = list(zip(group['name'], group['email'], group['role']))
+        return company_contacts
+    
+    def _extract_contacts(self, df: pd.DataFrame) -> Dict[str, List[Tuple[str, str, str]]]:
+        """Validate, match and group contacts using column-wise string operations"""
+        return self._group_contacts(self._validate_contacts(df))
+    
+    def _extract_contacts_rowwise(self, df: pd.DataFrame) -> Dict[str, List[Tuple[str, str, str]]]:
+        """Reference row-by-row implementation of ``_extract_contacts``"""
+        company_contacts = defaultdict(list)
+        for _, row in df.iterrows():
+            email = str(row['Email'])
+            name = str(row['Name'])
+            role = str(row['Role'])
             
-    def create_batches(self, company_contacts: Dict[str, List[Tuple[str, str]]]) -> List[Dict[str, List[Tuple[str, str]]]]:
-        """Create balanced batches of contacts"""
-        batches = []
-        company_indices = {company: 0 for company in company_contacts}
-        batch_size = EMAIL_SETTINGS['batch_size']
-        company_quota = EMAIL_SETTINGS['company_quota']
-        
-        while True:
-            current_batch = defaultdict(list)
-            batch_complete = True
+            if self.validator.is_valid_email(email):
+                company = self.company_matcher.identify_company(email)
+                if company != 'unknown':
+                    name = self.validator.normalize_name(name)
+                    company_contacts[company].append((name, email,role))
+        return company_contacts
+            
+    def create_batches(self, company_contacts: Dict[str, List[Tuple[str, str, str]]]) -> Iterator[Dict[str, List[Tuple[str, str, str]]]]:
+        """
+        Lazily split contacts into balanced batches
+        
+        Companies take turns contributing one contact at a time, so every
+        batch mixes as many companies as possible. A company stops
+        contributing to a batch once it reaches its quota
+        (``CompanyMatcher.get_company_quota``, with ``company_quota`` as the
+        default), and no batch exceeds ``batch_size``. Batches continue until
+        every contact is assigned; the total work is linear in the number of
+        contacts.
+        
+        Args:
+            company_contacts: Company -> contacts mapping from ``process_excel_file``
             
-            for company in company_contacts:
+        Yields:
+            Dict: Company -> contacts for one batch
+        """
+        batch_size = self.data_validator.validate_batch_size(self.batch_size)
+        quotas = {
+            company: max(1, self.company_matcher.get_company_quota(company, self.company_quota))
+            for company in company_contacts
+        }
+        positions = {company: 0 for company in company_contacts}
+        rotation = deque(company for company, contacts in company_contacts.items() if contacts)
+        batch_count = 0
+        
+        while rotation:
+            batch = {}
+            taken = 0
+            capped = []  # Companies that filled their quota sit out the rest of this batch
+            while rotation and taken < batch_size:
+                company = rotation.popleft()
                 contacts = company_contacts[company]
-                start_idx = company_indices[company]
-                end_idx = min(start_idx + company_quota, len(contacts))
+                batch.setdefault(company, []).append(contacts[positions[company]])
+                positions[company] += 1
+                taken += 1
                 
-                if start_idx < len(contacts):
-                    current_batch[company] = contacts[start_idx:end_idx]
-                    company_indices[company] = end_idx
-                    batch_complete = batch_complete and (end_idx - start_idx) == company_quota
+                if positions[company] == len(contacts):
+                    continue  # Exhausted: leaves the rotation for good
+                if len(batch[company]) >= quotas[company]:
+                    capped.append(company)
+                else:
+                    rotation.append(company)
+            rotation.extend(capped)
             
-            if not any(current_batch.values()):
-                break
-                
-            batches.append(dict(current_batch))
-            if not batch_complete:
-                break
-                
-        logger.info(f"Created {len(batches)} batches")
-        return batches
+            batch_count += 1
+            yield batch
+        
+        logger.info(f"Created {batch_count} batches")
         
     def schedule_emails(self):
         """Schedule emails in batches with reminders"""
         try:
+            if self.schedule_store is not None and self.schedule_store.count('pending'):
+                # A stored campaign is still in progress; pick it up instead of rebuilding it
+                self.resume_schedule()
+                if self.fingerprints is None:
+                    return
+            
+            # With fingerprints enabled this only returns contacts added since the last run
             company_contacts = self.process_excel_file()
-            batches = self.create_batches(company_contacts)
+            first_batch = max(self.scheduled_emails.counts('batch'), default=0)
             
-            for batch_idx, batch in enumerate(batches, 1):
+            # Batches stream straight into scheduling; reminders trail two
+            # batches behind so the last 2 batches never get one
+            awaiting_reminder = deque()
+            for batch_idx, batch in enumerate(self.create_batches(company_contacts), 1):
                 # Schedule initial emails
                 self._schedule_batch(
                     batch=batch,
                     days_delay=batch_idx - 1,  # Start from day 0
                     is_reminder=False,
-                    batch_num=batch_idx
+                    batch_num=first_batch + batch_idx
                 )
                 
-                # Schedule reminder emails
-                if batch_idx <= len(batches) - 2:  # Don't send reminders for last 2 batches
+                awaiting_reminder.append((batch_idx, batch))
+                if len(awaiting_reminder) > 2:
+                    # Schedule reminder emails
+                    reminder_idx, reminder_batch = awaiting_reminder.popleft()
                     self._schedule_batch(
-                        batch=batch,
-                        days_delay=batch_idx + 1,  # Reminder 2 days after initial
+                        batch=reminder_batch,
+                        days_delay=reminder_idx + 1,  # Reminder 2 days after initial
                         is_reminder=True,
-                        batch_num=batch_idx
+                        batch_num=first_batch + reminder_idx
                     )
+            
+            if self.fingerprints is not None:
+                self._apply_contact_changes()
+                # Only now are the new contacts safely scheduled
+                self.fingerprints.commit()
                     
         except Exception as e:
             logger.error(f"Error in email scheduling: {e}")
             raise
+        finally:
+            self._schedule_log.flush()
+            
+    def _apply_contact_changes(self):
+        """
+        Bring stored pending emails in line with edits to the contact file
+        
+        Pending rows of contacts removed from the file are skipped, and those
+        of edited contacts take the new name. Without a store nothing from a
+        previous run is pending, so there is nothing to update.
+        """
+        removed = self.fingerprints.removed_keys()
+        edited = (pd.concat(self._edited_contacts).drop_duplicates('key', keep='last')
+                  if self._edited_contacts else pd.DataFrame(columns=['key', 'name']))
+        self._edited_contacts = []
+        if self.schedule_store is None or (not len(removed) and edited.empty):
+            return
+        
+        pending = list(self.schedule_store.iter_pending())
+        if not pending:
+            return
+        keys = ContactFingerprints.email_keys(pd.Series([email.recipient_email for email in pending], dtype=object))
+        ids = pd.Series([email.id for email in pending])
+        
+        skipped = ids[pd.Series(keys).isin(removed).to_numpy()].tolist()
+        names = pd.Series(keys).map(edited.set_index('key')['name'])
+        renamed = dict(zip(ids[names.notna()].tolist(), names.dropna().tolist()))
+        if skipped:
+            self.schedule_store.mark_skipped(skipped)
+        if renamed:
+            self.schedule_store.rename_pending(renamed)
+        logger.info(f"Contact file edits: skipped {len(skipped)} pending emails of removed contacts, "
+                    f"renamed {len(renamed)} of edited contacts")
             
     def _schedule_batch(self, batch: Dict[str, List[Tuple[str, str, str]]], 
                     days_delay: int, is_reminder: bool, batch_num: int):
         """Schedule a batch of emails"""
         send_time = datetime.now() + timedelta(days=days_delay)
+        send_at = send_time.timestamp()  # Shared by every entry of the batch
         action = "Reminder" if is_reminder else "Initial"
         
         logger.info(f"Scheduling {action} Emails for Batch {batch_num}")
         logger.info(f"Scheduled for: {send_time.strftime('%Y-%m-%d %H:%M:%S')}")
         
+        scheduled = []
         for company, contacts in batch.items():
             for name, email, role in contacts:
                 try:
                     # Instead of sending immediately, store the scheduled email
-                    scheduled_email = {
-                        'recipient_email': email,
-                        'recipient_name': name,
-                        'company': company,
-                        'is_reminder': is_reminder,
-                        'batch_num': batch_num,
-                        'send_time': send_time
-                    }
-                    
-                    # Store this in a schedule queue
-                    logger.info(f"Scheduled email to {email} for {send_time}")
-                    self.scheduled_emails.append(scheduled_email)
+                    scheduled_email = ScheduledEmail(email, name, company, is_reminder, batch_num, send_at)
+                    scheduled.append(scheduled_email)
                     
                 except Exception as e:
                     logger.error(f"Failed to schedule email to {email}: {e}")
@@ -174,69 +513,470 @@ class EmailAutomation:
                         'time': datetime.now(),
                         'error': str(e),
                         'batch': batch_num
-                    })      
+                    })
+        
+        # Store the whole batch in the schedule queue at once
+        self._enqueue_emails(scheduled)
+        self._schedule_log.add(f"{action.lower()} scheduled", len(scheduled))
+
+    def _enqueue_emails(self, scheduled: List[ScheduledEmail]):
+        """Persist scheduled emails if a store is configured, otherwise queue them in memory by send time"""
+        scheduled = [ScheduledEmail.coerce(email) for email in scheduled]
+        if self.schedule_store is not None:
+            # The store is the schedule: senders claim the rows once they fall due
+            self.schedule_store.add_many(scheduled)
+            self.scheduler.notify()
+            return
+        self.scheduled_emails.add_many(scheduled)
+        self.scheduler.add_many(scheduled)
+
+    def _enqueue_email(self, scheduled_email: ScheduledEmail):
+        """Record a single scheduled email and queue it by send time"""
+        self._enqueue_emails([scheduled_email])
+
+    def resume_schedule(self) -> int:
+        """
+        Pick up the stored schedule after a restart
+        
+        Rows claimed by an interrupted run go back to pending. Nothing is
+        loaded into memory: senders claim due rows a page at a time.
+        
+        Returns:
+            int: Number of scheduled emails still to send
+        """
+        if self.schedule_store is None:
+            return 0
+        
+        recovered = self.schedule_store.recover_claims()
+        if recovered:
+            logger.warning(f"Recovered {recovered} emails claimed by an interrupted run")
+        
+        pending = len(self.scheduled_emails)
+        logger.info(f"Resumed {pending} scheduled emails from {self.schedule_store.db_path}")
+        return pending
+
     def get_schedule_summary(self):
-        """Get summary of scheduled emails"""
+        """Get summary of scheduled emails, grouped by date in send-time order"""
         schedule_summary = defaultdict(list)
-        for email in self.scheduled_emails:
-            date = email['send_time'].strftime('%Y-%m-%d')
-            schedule_summary[date].append({
-                'recipient': email['recipient_email'],
-                'type': 'reminder' if email['is_reminder'] else 'initial',
-                'batch': email['batch_num'],
-                'time': email['send_time'].strftime('%H:%M:%S')
+        for row in self.scheduled_emails.iter_rows():
+            schedule_summary[row['date']].append({
+                'recipient': row['recipient'],
+                'type': row['type'],
+                'batch': row['batch'],
+                'time': row['time']
             })
-        return schedule_summary    
-    def _send_email(self, recipient_email: str, recipient_name: str, company: str, is_reminder: bool, batch_num: int):
-        """Send individual email"""
-        if recipient_email in self.sent_emails:
-            logger.warning(f"Email already sent to {recipient_email}")
+        return schedule_summary
+
+    def export_schedule(self, path: str, fmt: Optional[str] = None, **filters) -> int:
+        """
+        Write the scheduled emails to a machine-readable file
+        
+        Args:
+            path: Destination file
+            fmt: 'csv', 'jsonl' or 'json' (defaults to the file extension)
+            **filters: Filters and paging passed to ``ScheduleIndex.iter_rows``
+            
+        Returns:
+            int: Rows written
+        """
+        fmt = fmt or os.path.splitext(path)[1].lstrip('.').lower()
+        with open(path, 'w', newline='') as f:
+            if fmt == 'json':
+                rows = list(self.scheduled_emails.iter_rows(**filters))
+                json.dump({'summary': self.scheduled_emails.summary(), 'rows': rows}, f, indent=2)
+                written = len(rows)
+            else:
+                written = self.scheduled_emails.write_rows(f, fmt, **filters)
+        logger.info(f"Exported {written} scheduled emails to {path}")
+        return written
+    
+    def _build_message(self, recipient_email: str, recipient_name: str, company: str, is_reminder: bool,
+                       sender_email: Optional[str] = None) -> MIMEMultipart:
+        """Build the MIME message for one recipient"""
+        return self.message_builder.build(sender_email or self.sender_email, recipient_email,
+                                          recipient_name, company, is_reminder)
+
+    def _deliver(self, account: SenderAccount, recipient_email: str, recipient_name: str, company: str,
+                 is_reminder: bool, batch_num: int):
+        """Build and send one message from ``account`` without touching the send bookkeeping"""
+        with self._build_seconds.time():
+            msg = self._build_message(recipient_email, recipient_name, company, is_reminder, account.email)
+        account.transport.send_message(msg)
+
+    def _sent_key(self, recipient_email: str, is_reminder: bool) -> int:
+        """Dedupe key for one message of this campaign"""
+        return SentIndex.make_key(recipient_email, self.campaign, 'reminder' if is_reminder else 'initial')
+
+    def _record_sent(self, recipient_email: str, recipient_name: str, is_reminder: bool, batch_num: int):
+        """Update the send bookkeeping after a successful delivery (the caller records it in the sent index)"""
+        template_type = 'reminder' if is_reminder else 'initial'
+        logger.debug(f"[Batch {batch_num}] Successfully sent {template_type} email to: {recipient_name} ({recipient_email})")
+        self._send_log.add(f"{template_type} sent")
+        
+        self._sent_counter.inc()
+        self.daily_count += 1
+        self.last_send_time = datetime.now()
+
+    def _send_email(self, recipient_email: str, recipient_name: str, company: str, is_reminder: bool, batch_num: int,
+                    scheduled: Optional[ScheduledEmail] = None):
+        """
+        Send individual email
+        
+        Args:
+            recipient_email: Recipient address
+            recipient_name: Recipient name
+            company: Recipient company
+            is_reminder: Send the reminder template
+            batch_num: Batch the email belongs to
+            scheduled: The scheduled record being sent (already taken off the
+                scheduler), so failures count against its attempts and its
+                stored row is settled; ad hoc sends get a new record on failure
+        """
+        if self.sent_index.contains_key(self._sent_key(recipient_email, is_reminder)):
+            logger.debug(f"Email already sent to {recipient_email}")
+            self._send_log.add("skipped as duplicate")
+            self._duplicate_counter.inc()
+            if scheduled is not None:
+                self._settle(scheduled, 'skipped')
             return
             
-        if self.daily_count >= EMAIL_PROVIDERS['gmail']['daily_limit']:
-            logger.warning("Daily email limit reached")
+        account = self.dispatcher.acquire(timeout=EMAIL_SETTINGS['rate_limit_max_wait'])
+        if account is None:
+            logger.warning("Email rate limit reached on every sender account")
+            self._rate_limited_counter.inc()
+            if scheduled is not None:
+                self._requeue([scheduled])
+                if self.schedule_store is not None and scheduled.id is not None:
+                    self.schedule_store.release([scheduled.id])
             return
             
         try:
-            msg = MIMEMultipart()
-            msg['From'] = self.sender_email
-            msg['To'] = recipient_email
+            self._deliver(account, recipient_email, recipient_name, company, is_reminder, batch_num)
+            self._record_sent(recipient_email, recipient_name, is_reminder, batch_num)
+            self.sent_index.add(recipient_email, self.campaign, 'reminder' if is_reminder else 'initial')
+            if scheduled is not None:
+                self._settle(scheduled, 'sent')
             
-            template_type = 'reminder' if is_reminder else 'initial'
-            template = self.template_manager.get_template(company, template_type)
+        except Exception as e:
+            email = scheduled or ScheduledEmail(recipient_email, recipient_name, company, is_reminder, batch_num,
+                                                time.time())
+            held = self._hold_for_sender(email, e, account)
+            retry = held or self._handle_send_failure(email, e)
+            if email.id is not None and self.schedule_store is not None:
+                # Retried and failed rows were updated by _handle_send_failure
+                if held:
+                    self.schedule_store.release([email.id])
+            elif not retry:
+                self._forget([email])
+            elif self.schedule_store is None and email in self.scheduled_emails:
+                self.scheduler.add(email)
+            else:
+                self._enqueue_email(email)
+    
+    def _settle(self, email: ScheduledEmail, status: str):
+        """Drop a sent or skipped email from the schedule and record the outcome in the store"""
+        self._forget([email])
+        if self.schedule_store is not None and email.id is not None:
+            if status == 'sent':
+                self.schedule_store.mark_sent([email.id])
+            else:
+                self.schedule_store.mark_skipped([email.id])
+    
+    def _renew_claims(self):
+        """Keep this run's claimed rows leased while a slow page is still being sent"""
+        if self.schedule_store is None:
+            return
+        if time.monotonic() - self._claims_renewed_at >= self.schedule_store.lease / 4:
+            self.schedule_store.renew_claims()
+            self._claims_renewed_at = time.monotonic()
+    
+    def _requeue(self, emails: List[ScheduledEmail]):
+        """
+        Queue emails again after a deferred or failed send
+        
+        With a store their rows are back to pending (released or
+        rescheduled) and are claimed again when due, so only the in-memory
+        scheduler needs them.
+        """
+        if self.schedule_store is None:
+            self.scheduler.add_many(emails)
+    
+    def _forget(self, emails: List[ScheduledEmail]):
+        """Drop settled emails from the in-memory schedule (the store tracks them by status)"""
+        if self.schedule_store is None:
+            self.scheduled_emails.discard_many(emails)
+
+    def _hold_for_sender(self, email: ScheduledEmail, error: Exception, account: SenderAccount) -> bool:
+        """
+        Handle a failure that is not the recipient's fault
+        
+        Rejected credentials disable the account for the rest of the run and
+        local I/O errors (e.g. a missing resume) stop sending altogether. The
+        email keeps its attempts and send time, and the caller queues it again.
+        
+        Args:
+            email: The email that failed
+            error: Exception raised by the send
+            account: Account the email was sent from
             
-            msg['Subject'] = f"{'Following up: ' if is_reminder else ''}Data Science Opportunities at {company.title()}"
+        Returns:
+            bool: True if the failure was held against the sender, not the email
+        """
+        classification = classify_smtp_error(error)
+        if classification == ACCOUNT:
+            account.disable(str(error))
+        elif classification == LOCAL:
+            if self._halt_reason is None:
+                logger.error(f"Stopping sends after a local error: {error}")
+                self._halt_reason = str(error)
+        else:
+            return False
+        logger.debug(f"Send to {email.recipient_email} deferred ({classification}): {error}")
+        self._failed_counter.inc()
+        return True
+
+    def _can_send(self) -> bool:
+        """False once a local error stopped sending or every sender account is disabled"""
+        return self._halt_reason is None and bool(self.dispatcher.active_accounts())
+
+    def _handle_send_failure(self, email: ScheduledEmail, error: Exception) -> bool:
+        """
+        Record a failed send and decide whether to try again
+        
+        Transient failures (4xx replies, disconnects) get a new send time
+        from the retry policy's backoff; the caller re-queues the email so
+        other sends are never held up waiting. Permanent failures (5xx) and
+        emails out of attempts are marked failed and never retried.
+        
+        Args:
+            email: The email that failed; its ``attempts`` and ``send_at`` are updated
+            error: Exception raised by the send
             
-            body = self.template_manager.format_template(
-                template,
-                name=recipient_name
-            )
-            msg.attach(MIMEText(body, 'plain'))
+        Returns:
+            bool: True if the email should be queued again
+        """
+        self._failed_counter.inc()
+        email.attempts += 1
+        classification = classify_smtp_error(error)
+        retry = self.retry_policy.should_retry(email.attempts, classification)
+        self.failed_emails[email.recipient_email].append({
+            'time': datetime.now(),
+            'error': str(error),
+            'batch': email.batch_num,
+            'attempt': email.attempts,
+            'permanent': not retry
+        })
+        
+        if retry:
+            delay = self.retry_policy.delay(email.attempts)
+            email.send_at = time.time() + delay
+            if self.schedule_store is None:
+                self.scheduled_emails.refresh(email)
+            logger.warning(f"Error sending email to {email.recipient_email} ({classification}): {error}; "
+                           f"retry {email.attempts}/{self.retry_policy.max_attempts - 1} in {delay:.0f}s")
+            if self.schedule_store is not None and email.id is not None:
+                self.schedule_store.reschedule(email.id, email.send_at, str(error))
+            self._retried_counter.inc()
+        else:
+            logger.error(f"Giving up on email to {email.recipient_email} after {email.attempts} "
+                         f"attempt(s) ({classification}): {error}")
+            if self.schedule_store is not None and email.id is not None:
+                self.schedule_store.mark_failed(email.id, str(error))
+            self._gave_up_counter.inc()
+        return retry
 
-            # Attach resume
-            resume_path = 'data/resume.pdf'  # Make sure your resume is in this location
-            with open(resume_path, 'rb') as f:
-                resume = MIMEApplication(f.read(), _subtype='pdf')
-                resume.add_header('Content-Disposition', 'attachment', 
-                                filename='Sai_Harsha_Mummaneni_Resume.pdf')
-                msg.attach(resume)
+    async def send_scheduled_async(self, max_in_flight: Optional[int] = None, now: Optional[datetime] = None,
+                                   build_workers: Optional[int] = None) -> int:
+        """
+        Send every due scheduled email, keeping several sends in flight at once
+        
+        With a schedule store, due rows are claimed and sent a page of
+        EMAIL_SETTINGS['claim_page_size'] at a time until none are left or
+        sending has to stop (rate limits, a disabled account).
+        
+        Args:
+            max_in_flight: Maximum concurrent sends (defaults to EMAIL_SETTINGS['max_in_flight'])
+            now: Reference time for deciding which emails are due
+            build_workers: Processes building messages (defaults to EMAIL_SETTINGS['build_workers'])
             
-            # Send email
-            with smtplib.SMTP(EMAIL_PROVIDERS['gmail']['smtp_server'], 
-                            EMAIL_PROVIDERS['gmail']['smtp_port']) as server:
-                server.starttls()
-                server.login(self.sender_email, self.sender_password)
-                server.send_message(msg)
+        Returns:
+            int: Number of emails sent
+        """
+        if self.schedule_store is None:
+            sent, _ = await self._send_many_async(self.scheduler.pop_due(now), max_in_flight, build_workers)
+            return sent
+        
+        page_size = EMAIL_SETTINGS['claim_page_size']
+        total = 0
+        while self._can_send():
+            page = self.schedule_store.claim_due(now, limit=page_size)
+            if not page:
+                break
+            self._claims_renewed_at = time.monotonic()
+            sent, deferred = await self._send_many_async(page, max_in_flight, build_workers)
+            total += sent
+            if deferred or len(page) < page_size:
+                break
+        return total
+
+    async def _send_many_async(self, emails: List[ScheduledEmail], max_in_flight: Optional[int] = None,
+                               build_workers: Optional[int] = None) -> Tuple[int, int]:
+        """
+        Send the given scheduled emails (already claimed, with a store) with bounded concurrency
+        
+        With ``build_workers`` > 0 the work is split into two stages: worker
+        processes render and serialize each message (CPU bound), and the I/O
+        threads only hand the finished bytes to the transport. Builds
+        may run up to ``build_workers`` messages ahead of the senders.
+        
+        Returns:
+            Tuple[int, int]: Emails sent, and emails put back unattempted
+            because of rate limits or because sending stopped
+        """
+        max_in_flight = max_in_flight or EMAIL_SETTINGS['max_in_flight']
+        if build_workers is None:
+            build_workers = EMAIL_SETTINGS['build_workers']
+        build_pool = self._get_build_pool(build_workers) if build_workers > 0 else None
+        
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(max_in_flight + build_workers)
+        in_flight = set()
+        sent = []
+        failed = []
+        gave_up = []
+        held = []  # Failed for a reason not charged to the email; released to pending
+        skipped = []  # Duplicates: settled without sending
+        deferred = 0
+        tasks = []
+        
+        async def deliver(email, account):
+            if build_pool is None:
+                await loop.run_in_executor(
+                    executor, self._deliver, account,
+                    email.recipient_email, email.recipient_name,
+                    email.company, email.is_reminder, email.batch_num
+                )
+                return
+            # Measured from this side, so it includes time queued for a worker
+            with self._build_seconds.time():
+                data = await loop.run_in_executor(
+                    build_pool, build_in_worker, account.email,
+                    email.recipient_email, email.recipient_name,
+                    email.company, email.is_reminder
+                )
+            await loop.run_in_executor(
+                executor, account.transport.send_raw, account.email, [email.recipient_email], data
+            )
+        
+        async def send_one(email, account):
+            self._in_flight_gauge.inc()
+            try:
+                await deliver(email, account)
+                self._record_sent(email.recipient_email, email.recipient_name,
+                                  email.is_reminder, email.batch_num)
+                sent.append(email)
+            except Exception as e:
+                # Sent keys stay in in_flight until the drained batch is added to the sent index
+                in_flight.discard(self._sent_key(email.recipient_email, email.is_reminder))
+                if self._hold_for_sender(email, e, account):
+                    held.append(email)
+                    self._requeue([email])
+                    return
+                failed.append(email)
+                if self._handle_send_failure(email, e):
+                    # Back into the delayed queue; the rest of the run carries on
+                    self._requeue([email])
+                else:
+                    gave_up.append(email)
+            finally:
+                self._in_flight_gauge.dec()
+                slots.release()
+        
+        with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            for idx, email in enumerate(emails):
+                if not self._can_send():
+                    logger.error(f"Sending stopped with {len(emails) - idx} emails left in the queue")
+                    deferred = len(emails) - idx
+                    self._requeue(emails[idx:])
+                    break
+                recipient = email.recipient_email
+                key = self._sent_key(recipient, email.is_reminder)
+                if key in in_flight or self.sent_index.contains_key(key):
+                    logger.debug(f"Email already sent to {recipient}")
+                    self._send_log.add("skipped as duplicate")
+                    self._duplicate_counter.inc()
+                    skipped.append(email)
+                    continue
                 
-            logger.info(f"[Batch {batch_num}] Successfully sent {template_type} email to: {recipient_name} ({recipient_email})")
-            
-            self.sent_emails.add(recipient_email)
-            self.daily_count += 1
-            self.last_send_time = datetime.now()
+                await slots.acquire()
+                self._renew_claims()
+                # Wait for an account with a token in every rate window; give up on
+                # long waits and keep the rest queued
+                account = await self.dispatcher.acquire_async(timeout=EMAIL_SETTINGS['rate_limit_max_wait'])
+                if account is None:
+                    slots.release()
+                    logger.warning("Email rate limit reached on every sender account")
+                    self._rate_limited_counter.inc(len(emails) - idx)
+                    deferred = len(emails) - idx
+                    self._requeue(emails[idx:])
+                    break
+                
+                in_flight.add(key)
+                tasks.append(asyncio.create_task(send_one(email, account)))
             
-        except Exception as e:
-            logger.error(f"Error sending email to {recipient_email}: {e}")
-            raise          
+            await asyncio.gather(*tasks)
+        
+        sent_ids = {id(email) for email in sent}
+        # One transaction for the whole batch instead of one per message on the event loop
+        self.sent_index.add_many(
+            (e.recipient_email, self.campaign, 'reminder' if e.is_reminder else 'initial') for e in sent
+        )
+        if self.schedule_store is not None:
+            self.schedule_store.mark_sent(e.id for e in sent if e.id is not None)
+            self.schedule_store.mark_skipped(e.id for e in skipped if e.id is not None)
+            # Claimed emails that were not attempted go back to pending for the next run;
+            # failed ones were already rescheduled or marked failed
+            settled = sent_ids | {id(email) for email in failed} | {id(email) for email in skipped}
+            self.schedule_store.release(e.id for e in emails if e.id is not None and id(e) not in settled)
+        
+        self._forget(sent + gave_up + skipped)
+        self._send_log.flush()
+        if held:
+            logger.warning(f"{len(held)} emails deferred until a sender account can send again")
+        logger.info(f"Sent {len(sent)} scheduled emails")
+        return len(sent), deferred
+
+    def send_scheduled(self, max_in_flight: Optional[int] = None) -> int:
+        """Synchronous wrapper around ``send_scheduled_async``"""
+        return asyncio.run(self.send_scheduled_async(max_in_flight=max_in_flight))
+
+    def run_scheduler(self, max_in_flight: Optional[int] = None):
+        """
+        Send scheduled emails as they fall due until the scheduler is closed
+        
+        Sleeps until the next send time instead of polling, and wakes early
+        when new emails are scheduled.
+        """
+        logger.info(f"Scheduler running with {len(self.scheduled_emails)} queued emails")
+        while not self.scheduler.closed:
+            if not self._can_send():
+                logger.error("Scheduler stopped: no sender account can send any more")
+                break
+            wait = self.dispatcher.wait_time()
+            if wait > EMAIL_SETTINGS['rate_limit_max_wait']:
+                logger.warning(f"Email rate limit reached, pausing for {wait:.0f}s")
+                self.scheduler.pause(wait)
+                continue
+            if self.schedule_store is not None:
+                asyncio.run(self.send_scheduled_async(max_in_flight))
+                next_due = self.schedule_store.next_send_time()
+                if next_due is None or next_due > datetime.now():
+                    self.scheduler.sleep_until(next_due.timestamp() if next_due else None)
+                continue
+            due = self.scheduler.wait_for_due()
+            if due:
+                asyncio.run(self._send_many_async(due, max_in_flight))
+
     def test_smtp_connection(self):
         """Test SMTP connection before running automation"""
         try:
@@ -274,31 +1014,28 @@ class EmailAutomation:
             logger.error(f"Unexpected error during SMTP test: {str(e)}")
             logger.error(f"Using email: {self.sender_email}")
             return False
-    def verify_schedule(self):
-        """Verify and display all scheduled emails"""
-        if not hasattr(self, 'scheduled_emails') or not self.scheduled_emails:
+    def verify_schedule(self, limit: int = 50, offset: int = 0):
+        """
+        Display schedule counts and one page of scheduled emails
+        
+        Args:
+            limit: Emails to list
+            offset: Emails to skip before listing
+        """
+        index = self.scheduled_emails
+        if not index:
             print("\nNo emails currently scheduled")
             return
             
         print("\n=== SCHEDULED EMAILS ===")
+        print(f"\nTotal scheduled emails: {len(index)} "
+              f"({index.count(template_type='initial')} initial, {index.count(template_type='reminder')} reminders)")
+        for dimension in ('date', 'company', 'batch'):
+            counts = index.counts(dimension)
+            print(f"\nBy {dimension}: " + ', '.join(f"{value}: {n}" for value, n in counts.items()))
         
-        # Group by date
-        from collections import defaultdict
-        schedule_by_date = defaultdict(list)
-        for email in self.scheduled_emails:
-            date = email['send_time'].strftime('%Y-%m-%d')
-            schedule_by_date[date].append(email)
-        
-        # Print schedule
-        for date, emails in sorted(schedule_by_date.items()):
-            print(f"\nDate: {date}")
-            for email in sorted(emails, key=lambda x: x['send_time']):
-                print(f"""
-        Batch {email['batch_num']}:
-        - Recipient: {email['recipient_name']} ({email['recipient_email']})
-        - Type: {'Reminder' if email['is_reminder'] else 'Initial'} email
-        - Company: {email['company'].title()}
-        - Scheduled Time: {email['send_time'].strftime('%H:%M:%S')}
-        """)
-        
-        print(f"\nTotal scheduled emails: {len(self.scheduled_emails)}")
\ No newline at end of file
+        rows = index.rows(offset=offset, limit=limit)
+        print(f"\nShowing {offset + 1}-{offset + len(rows)} of {len(index)}:")
+        for row in rows:
+            print(f"  {row['date']} {row['time']}  batch {row['batch']:>3}  {row['type']:<8}  "
+                  f"{row['company']:<10}  {row['name']} ({row['recipient']})")
@@ -0,0 +1,138 @@
+"""
+Logging helpers that keep log I/O off the send path
+
+``configure_logging`` applies a ``LOGGING`` dictConfig and then moves the
+root logger's handlers behind a queue, so a log call only enqueues the
+record and a background listener does the formatting and writing.
+``LogSummary`` rolls per-recipient events up into periodic summary lines,
+and ``DebugSampler`` keeps one in every N debug records from chatty loggers.
+"""
+import atexit
+import itertools
+import logging
+import logging.config
+import logging.handlers
+import queue
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, Optional
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def configure_logging(config: Dict, use_queue: bool = True) -> Optional[logging.handlers.QueueListener]:
+    """
+    Apply a dictConfig and optionally route the root handlers through a queue
+
+    Args:
+        config: ``logging.config.dictConfig`` dictionary (``LOGGING``)
+        use_queue: Hand records to a background listener instead of writing them inline
+
+    Returns:
+        Optional[QueueListener]: The running listener, if one was started
+    """
+    stop_logging()
+    logging.config.dictConfig(config)
+    if not use_queue:
+        return None
+
+    global _listener
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+    if not handlers:
+        return None
+    for handler in handlers:
+        root.removeHandler(handler)
+
+    log_queue = queue.SimpleQueue()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    # respect_handler_level keeps the console at INFO while the file gets DEBUG
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging():
+    """Flush queued records and stop the listener started by ``configure_logging``"""
+    global _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    listener.stop()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            root.removeHandler(handler)
+    for handler in listener.handlers:
+        root.addHandler(handler)
+
+
+class DebugSampler(logging.Filter):
+    """Pass one in every ``rate`` DEBUG records; other levels always pass"""
+
+    def __init__(self, rate: int = 100):
+        """
+        Args:
+            rate: Keep every ``rate``-th debug record (1 keeps them all)
+        """
+        super().__init__()
+        self.rate = max(1, int(rate))
+        self._seen = itertools.count()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.rate == 1:
+            return True
+        return next(self._seen) % self.rate == 0
+
+
+class LogSummary:
+    """
+    Counts per-recipient events and logs them as one summary line per interval
+
+    ``add`` is cheap enough to call once per email; a line such as
+    ``Send progress: initial sent 120, reminder sent 40`` is logged at most
+    once every ``interval`` seconds, and whatever is left on ``flush``.
+    """
+
+    def __init__(self, logger: logging.Logger, title: str, interval: float = 10.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            logger: Logger the summary lines go to (at INFO)
+            title: Prefix of every summary line
+            interval: Minimum seconds between summary lines
+            clock: Monotonic time source (overridable for tests)
+        """
+        self.logger = logger
+        self.title = title
+        self.interval = interval
+        self._clock = clock
+        self._counts = Counter()
+        self._lock = threading.Lock()
+        self._last_flush = clock()
+
+    def add(self, event: str, count: int = 1):
+        """Count an event, logging a summary if the interval has elapsed"""
+        with self._lock:
+            self._counts[event] += count
+            if self._clock() - self._last_flush < self.interval:
+                return
+            counts = self._take()
+        self._log(counts)
+
+    def flush(self):
+        """Log whatever has been counted since the last summary"""
+        with self._lock:
+            counts = self._take()
+        self._log(counts)
+
+    def _take(self) -> Counter:
+        counts, self._counts = self._counts, Counter()
+        self._last_flush = self._clock()
+        return counts
+
+    def _log(self, counts: Counter):
+        if counts:
+            self.logger.info(f"{self.title}: {', '.join(f'{event} {n}' for event, n in counts.items())}")
@@ -0,0 +1,89 @@
+"""
+MIME message construction, shared by the inline send path and build workers
+"""
+import logging
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Dict, Optional
+
+from .attachments import AttachmentCache
+from .templates import EmailTemplateManager
+from .transports import serialize_message
+
+logger = logging.getLogger(__name__)
+
+
+class MessageBuilder:
+    """Renders templates and attachments into ready-to-send messages"""
+
+    def __init__(self, resume_path: str, attachment_settings: Dict,
+                 template_manager: Optional[EmailTemplateManager] = None,
+                 attachment_cache: Optional[AttachmentCache] = None):
+        """
+        Initialize the builder
+
+        Args:
+            resume_path: Default attachment file
+            attachment_settings: ``ATTACHMENT_SETTINGS`` dictionary
+            template_manager: Template manager to render with (created if omitted)
+            attachment_cache: Attachment cache to reuse (created if omitted)
+        """
+        self.resume_path = resume_path
+        self.attachment_settings = attachment_settings
+        self.template_manager = template_manager or EmailTemplateManager()
+        self.attachment_cache = attachment_cache or AttachmentCache()
+
+    def build(self, sender_email: str, recipient_email: str, recipient_name: str,
+              company: str, is_reminder: bool) -> MIMEMultipart:
+        """
+        Build the MIME message for one recipient
+
+        Args:
+            sender_email: From address
+            recipient_email: To address
+            recipient_name: Name used in the greeting
+            company: Company whose template and attachment variant are used
+            is_reminder: Whether to use the reminder template
+
+        Returns:
+            MIMEMultipart: Complete message
+        """
+        msg = MIMEMultipart()
+        msg['From'] = sender_email
+        msg['To'] = recipient_email
+
+        template_type = 'reminder' if is_reminder else 'initial'
+        subject, body = self.template_manager.render(company, template_type, name=recipient_name)
+
+        msg['Subject'] = subject
+        msg.attach(MIMEText(body, 'plain'))
+
+        # Attach resume (encoded once and reused across messages)
+        variant = self.attachment_settings['company_variants'].get(company, {})
+        msg.attach(self.attachment_cache.get(
+            variant.get('path', self.resume_path),
+            filename=variant.get('filename', self.attachment_settings['filename']),
+            subtype=self.attachment_settings['subtype']
+        ))
+        return msg
+
+    def build_bytes(self, sender_email: str, recipient_email: str, recipient_name: str,
+                    company: str, is_reminder: bool) -> bytes:
+        """Build a message and serialize it to SMTP wire format (CRLF line endings)"""
+        return serialize_message(self.build(sender_email, recipient_email, recipient_name, company, is_reminder))
+
+
+# Per-process builder used by the process-pool build stage
+_worker_builder: Optional[MessageBuilder] = None
+
+
+def init_build_worker(resume_path: str, attachment_settings: Dict):
+    """Process pool initializer: create this worker's builder once"""
+    global _worker_builder
+    _worker_builder = MessageBuilder(resume_path, attachment_settings)
+
+
+def build_in_worker(sender_email: str, recipient_email: str, recipient_name: str,
+                    company: str, is_reminder: bool) -> bytes:
+    """Process pool task: build one message's wire bytes"""
+    return _worker_builder.build_bytes(sender_email, recipient_email, recipient_name, company, is_reminder)
@@ -0,0 +1,227 @@
+"""
+Lightweight send-path metrics with Prometheus text and JSON export
+"""
+import json
+import logging
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Seconds; spans fast local builds up to slow remote SMTP handshakes
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Counter:
+    """Monotonically increasing count"""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+
+class Gauge:
+    """Value that can go up and down, or be read from a callback at export time"""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._value = 0.0
+        self._function = None
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        with self._lock:
+            self._value = value
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1):
+        self.inc(-amount)
+
+    def set_function(self, function: Optional[Callable[[], float]]):
+        """Report ``function()`` instead of the stored value"""
+        self._function = function
+
+    def clear_function(self, function: Callable[[], float]):
+        """Go back to the stored value if ``function`` is still the one being reported"""
+        if self._function == function:
+            self._function = None
+
+    @property
+    def value(self) -> float:
+        if self._function is not None:
+            try:
+                return self._function()
+            except Exception as e:
+                logger.debug(f"Gauge {self.name} callback failed: {e}")
+                return math.nan
+        return self._value
+
+
+class Histogram:
+    """Distribution of observed durations in cumulative buckets"""
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[idx] += 1
+            self._sum += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Observe the wall-clock duration of the ``with`` block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    @property
+    def count(self) -> int:
+        return sum(self._counts)
+
+    @property
+    def sum(self) -> float:
+        return self._sum
+
+    def cumulative(self) -> Dict[str, int]:
+        """Cumulative count per upper bound, Prometheus style"""
+        with self._lock:
+            counts = list(self._counts)
+        result, total = {}, 0
+        for bound, count in zip(self.buckets, counts):
+            total += count
+            result[_format_bound(bound)] = total
+        result['+Inf'] = total + counts[-1]
+        return result
+
+
+def _format_bound(bound: float) -> str:
+    return repr(float(bound))
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float) and math.isnan(value):
+        return 'NaN'
+    return str(value)
+
+
+class MetricsRegistry:
+    """
+    Named counters, gauges and histograms
+
+    Metrics are created on first use, so instrumented code just asks the
+    registry for the metric it needs.
+    """
+
+    def __init__(self, prefix: str = 'massemailer_'):
+        self.prefix = prefix
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name: str, help_text: str, **kwargs):
+        full_name = self.prefix + name
+        with self._lock:
+            metric = self._metrics.get(full_name)
+            if metric is None:
+                metric = self._metrics[full_name] = cls(full_name, help_text, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {full_name} is already registered as {type(metric).__name__}")
+            return metric
+
+    def counter(self, name: str, help_text: str = '') -> Counter:
+        return self._get(Counter, name, help_text)
+
+    def gauge(self, name: str, help_text: str = '') -> Gauge:
+        return self._get(Gauge, name, help_text)
+
+    def histogram(self, name: str, help_text: str = '', buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help_text, buckets=buckets)
+
+    def snapshot(self) -> Dict:
+        """
+        Current values of every metric
+
+        Returns:
+            Dict: ``counters``, ``gauges`` and ``histograms`` keyed by metric name
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        snapshot = {'timestamp': time.time(), 'counters': {}, 'gauges': {}, 'histograms': {}}
+        for metric in metrics:
+            if isinstance(metric, Counter):
+                snapshot['counters'][metric.name] = metric.value
+            elif isinstance(metric, Gauge):
+                snapshot['gauges'][metric.name] = metric.value
+            else:
+                snapshot['histograms'][metric.name] = {
+                    'count': metric.count,
+                    'sum': metric.sum,
+                    'buckets': metric.cumulative(),
+                }
+        return snapshot
+
+    def to_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines = []
+        for metric in metrics:
+            kind = {Counter: 'counter', Gauge: 'gauge', Histogram: 'histogram'}[type(metric)]
+            if metric.help_text:
+                lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {kind}")
+            if isinstance(metric, Histogram):
+                for bound, count in metric.cumulative().items():
+                    lines.append(f'{metric.name}_bucket{{le="{bound}"}} {count}')
+                lines.append(f"{metric.name}_sum {metric.sum}")
+                lines.append(f"{metric.name}_count {metric.count}")
+            else:
+                lines.append(f"{metric.name} {_format_value(metric.value)}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        """Atomically write the Prometheus text format (e.g. for node_exporter's textfile collector)"""
+        _write_atomic(path, self.to_prometheus())
+
+    def write_json(self, path: str):
+        """Atomically write a JSON snapshot"""
+        _write_atomic(path, json.dumps(self.snapshot(), indent=2))
+
+
+def _write_atomic(path: str, content: str):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+# Process-wide registry used by the send path unless another one is passed in
+REGISTRY = MetricsRegistry()
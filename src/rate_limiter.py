@@ -0,0 +1,258 @@
+"""
+Multi-window token-bucket rate limiting for outgoing email
+"""
+import asyncio
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Reported capacity of a limiter with no windows configured
+UNLIMITED = 2 ** 31 - 1
+
+# Limiters with unsaved state, written out when the interpreter exits
+_PERSISTED = weakref.WeakSet()
+
+# Writes batched state files off the send path (the event loop included), in order
+_WRITER = ThreadPoolExecutor(max_workers=1, thread_name_prefix='rate-limit-state')
+
+
+@atexit.register
+def _flush_all():
+    for limiter in list(_PERSISTED):
+        limiter.flush()
+
+
+class TokenBucket:
+    """Bucket holding up to ``capacity`` tokens, refilled evenly over ``period`` seconds"""
+
+    def __init__(self, capacity: int, period: float, tokens: Optional[float] = None,
+                 updated: Optional[float] = None):
+        if capacity <= 0 or period <= 0:
+            raise ValueError("Bucket capacity and period must be positive")
+        self.capacity = capacity
+        self.period = period
+        self.rate = capacity / period
+        self.tokens = float(capacity if tokens is None else min(tokens, capacity))
+        self.updated = time.time() if updated is None else updated
+
+    def refill(self, now: float):
+        elapsed = max(0.0, now - self.updated)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float, tokens: float = 1) -> float:
+        """Seconds until ``tokens`` tokens are available"""
+        self.refill(now)
+        missing = tokens - self.tokens
+        return 0.0 if missing <= 0 else missing / self.rate
+
+
+class RateLimiter:
+    """
+    Enforces several token buckets at once (e.g. per second, hour, day, batch)
+
+    A token is only taken when every window has one available, so the
+    tightest window always wins. Bucket state can be persisted to a JSON
+    file so limits carry over across restarts. Writes are batched (every
+    ``save_every`` tokens or ``save_interval`` seconds) and made by a
+    background thread to keep disk I/O off the send path; ``close`` and
+    interpreter exit write synchronously. A hard crash can forget at most
+    a batch of sends.
+    """
+
+    def __init__(self, windows: Dict[str, Tuple[int, float]], state_path: Optional[str] = None,
+                 save_every: int = 20, save_interval: float = 5.0):
+        """
+        Initialize the limiter
+
+        Args:
+            windows: Window name -> (max sends, period in seconds)
+            state_path: Optional JSON file used to persist bucket state
+            save_every: Tokens taken between state writes
+            save_interval: Maximum seconds a taken token stays unsaved
+        """
+        self.state_path = state_path
+        self.save_every = save_every
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._unsaved = 0
+        self._last_save = time.monotonic()
+        self._snapshots = 0  # Sequence number of the latest snapshot
+        self._saved = 0  # Sequence number of the snapshot on disk
+        self.buckets = {name: TokenBucket(limit, period) for name, (limit, period) in windows.items()}
+        self._load()
+        if state_path:
+            _PERSISTED.add(self)
+
+    @classmethod
+    def from_provider(cls, provider: Dict, cooling_period: Optional[float] = None,
+                      state_path: Optional[str] = None) -> 'RateLimiter':
+        """
+        Build the windows configured for an ``EMAIL_PROVIDERS`` entry
+
+        Args:
+            provider: Provider settings dictionary
+            cooling_period: Hours over which ``batch_limit`` sends are allowed
+            state_path: Optional JSON file used to persist bucket state
+
+        Returns:
+            RateLimiter: Configured limiter
+        """
+        windows = {}
+        if provider.get('per_second_limit'):
+            windows['second'] = (provider['per_second_limit'], 1.0)
+        if provider.get('hourly_limit'):
+            windows['hour'] = (provider['hourly_limit'], 3600.0)
+        if provider.get('daily_limit'):
+            windows['day'] = (provider['daily_limit'], 86400.0)
+        if provider.get('batch_limit') and cooling_period:
+            windows['batch'] = (provider['batch_limit'], cooling_period * 3600.0)
+        return cls(windows, state_path=state_path)
+
+    def _load(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable rate limit state {self.state_path}: {e}")
+            return
+        for name, bucket in self.buckets.items():
+            saved = state.get(name)
+            # Only restore state recorded for the same window configuration
+            if saved and saved.get('capacity') == bucket.capacity and saved.get('period') == bucket.period:
+                bucket.tokens = min(bucket.capacity, saved['tokens'])
+                bucket.updated = saved['updated']
+
+    def _snapshot(self) -> Tuple[int, Dict]:
+        """Sequence number and bucket state to persist; call with ``_lock`` held"""
+        self._unsaved = 0
+        self._last_save = time.monotonic()
+        self._snapshots += 1
+        return self._snapshots, {
+            name: {'capacity': b.capacity, 'period': b.period, 'tokens': b.tokens, 'updated': b.updated}
+            for name, b in self.buckets.items()
+        }
+
+    def _save(self, snapshot: Tuple[int, Dict]):
+        # Serialized separately from _lock so sends are not held up by the write
+        sequence, state = snapshot
+        with self._save_lock:
+            if sequence <= self._saved:
+                return  # A newer snapshot was already written by flush()
+            tmp_path = f"{self.state_path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.state_path)
+            self._saved = sequence
+
+    def flush(self):
+        """Write any unsaved bucket state"""
+        if not self.state_path:
+            return
+        with self._lock:
+            if not self._unsaved:
+                return
+            snapshot = self._snapshot()
+        self._save(snapshot)
+
+    def close(self):
+        """Persist the current state; the limiter stays usable"""
+        self.flush()
+
+    def wait_time(self) -> float:
+        """Seconds until a send would be allowed by every window"""
+        now = time.time()
+        with self._lock:
+            return max((b.wait_time(now) for b in self.buckets.values()), default=0.0)
+
+    def remaining(self) -> int:
+        """Whole sends currently available across all windows"""
+        now = time.time()
+        with self._lock:
+            for bucket in self.buckets.values():
+                bucket.refill(now)
+            return int(min((b.tokens for b in self.buckets.values()), default=UNLIMITED))
+
+    def capacity_left(self) -> int:
+        """Whole sends left in the longest window (usually the daily limit)"""
+        if not self.buckets:
+            return UNLIMITED
+        bucket = max(self.buckets.values(), key=lambda b: b.period)
+        with self._lock:
+            bucket.refill(time.time())
+            return int(bucket.tokens)
+
+    def try_acquire(self) -> bool:
+        """
+        Take a token from every window if all of them have one
+
+        Returns:
+            bool: True if the send may proceed
+        """
+        now = time.time()
+        snapshot = None
+        with self._lock:
+            if any(b.wait_time(now) > 0 for b in self.buckets.values()):
+                return False
+            for bucket in self.buckets.values():
+                bucket.tokens -= 1
+            if self.state_path:
+                self._unsaved += 1
+                if (self._unsaved >= self.save_every
+                        or time.monotonic() - self._last_save >= self.save_interval):
+                    snapshot = self._snapshot()
+        if snapshot is not None:
+            _WRITER.submit(self._save_logged, snapshot)
+        return True
+
+    def _save_logged(self, snapshot: Tuple[int, Dict]):
+        """Background ``_save``; state that failed to write is written again by the next save"""
+        try:
+            self._save(snapshot)
+        except OSError as e:
+            logger.warning(f"Could not save rate limit state {self.state_path}: {e}")
+            with self._lock:
+                self._unsaved += 1
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until a token is available
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            bool: True if a token was taken, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.try_acquire():
+            wait = self.wait_time()
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if wait > remaining:
+                    return False
+            time.sleep(wait)
+        return True
+
+    async def acquire_async(self, timeout: Optional[float] = None) -> bool:
+        """Async counterpart of ``acquire`` that yields to the event loop while waiting"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.try_acquire():
+            wait = self.wait_time()
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if wait > remaining:
+                    return False
+            await asyncio.sleep(wait)
+        return True
@@ -0,0 +1,113 @@
+"""
+SMTP failure classification and retry backoff
+"""
+import logging
+import random
+import smtplib
+import socket
+from datetime import timedelta
+from typing import Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+TRANSIENT = 'transient'
+PERMANENT = 'permanent'
+ACCOUNT = 'account'  # The sending account is unusable (e.g. bad credentials)
+LOCAL = 'local'      # This machine cannot send (e.g. the attachment is missing)
+
+# OSErrors raised by the network rather than by local files
+_NETWORK_ERRORS = (ConnectionError, TimeoutError, socket.gaierror, socket.herror)
+
+
+def classify_smtp_error(error: BaseException) -> str:
+    """
+    Decide whether a failed send is worth retrying
+
+    4xx replies, dropped connections and timeouts are transient; 5xx
+    replies about the recipient, sender or message are permanent.
+    Authentication failures concern the sending account and local I/O
+    errors (a missing attachment, a full disk) this machine; neither is
+    the recipient's fault, so they are ``ACCOUNT`` and ``LOCAL`` and must
+    not be charged to the email. Any other error is treated as transient
+    and bounded by the retry policy's attempt limit.
+
+    Args:
+        error: Exception raised while sending
+
+    Returns:
+        str: ``TRANSIENT``, ``PERMANENT``, ``ACCOUNT`` or ``LOCAL``
+    """
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        codes = [code for code, _ in error.recipients.values()]
+        return TRANSIENT if codes and all(400 <= code < 500 for code in codes) else PERMANENT
+    if isinstance(error, smtplib.SMTPAuthenticationError):
+        return ACCOUNT
+    if isinstance(error, smtplib.SMTPResponseException):
+        return PERMANENT if 500 <= error.smtp_code < 600 else TRANSIENT
+    if isinstance(error, smtplib.SMTPException) or isinstance(error, _NETWORK_ERRORS):
+        return TRANSIENT
+    if isinstance(error, OSError):
+        return LOCAL
+    return TRANSIENT
+
+
+def _seconds(value: Union[timedelta, float]) -> float:
+    return value.total_seconds() if isinstance(value, timedelta) else float(value)
+
+
+class RetryPolicy:
+    """Exponential backoff with jitter, bounded by an attempt limit"""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 1800.0, max_delay: float = 21600.0,
+                 exponential_backoff: bool = True, jitter: float = 0.2, rng: Optional[random.Random] = None):
+        """
+        Initialize the policy
+
+        Args:
+            max_attempts: Sends attempted in total before giving up
+            base_delay: Seconds before the first retry
+            max_delay: Upper bound on any single delay
+            exponential_backoff: Double the delay after each failed attempt
+            jitter: Fraction by which delays are randomly spread (0.2 gives +/-20%)
+            rng: Random source (overridable for tests)
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.exponential_backoff = exponential_backoff
+        self.jitter = jitter
+        self._rng = rng or random.Random()
+
+    @classmethod
+    def from_settings(cls, settings: Dict) -> 'RetryPolicy':
+        """Build a policy from ``RETRY_SETTINGS``"""
+        return cls(
+            max_attempts=settings['max_attempts'],
+            base_delay=_seconds(settings['delay_between_attempts']),
+            max_delay=_seconds(settings.get('max_delay', timedelta(hours=6))),
+            exponential_backoff=settings.get('exponential_backoff', True),
+            jitter=settings.get('jitter', 0.2),
+        )
+
+    def should_retry(self, attempts: int, classification: str) -> bool:
+        """
+        Args:
+            attempts: Failed attempts so far, including the one just made
+            classification: Result of ``classify_smtp_error``
+
+        Returns:
+            bool: True if another attempt should be scheduled
+        """
+        return classification == TRANSIENT and attempts < self.max_attempts
+
+    def delay(self, attempts: int) -> float:
+        """
+        Seconds to wait before the next attempt
+
+        Args:
+            attempts: Failed attempts so far (1 after the first failure)
+        """
+        delay = self.base_delay * (2 ** (attempts - 1) if self.exponential_backoff else 1)
+        delay = min(delay, self.max_delay)
+        # Spread retries out so failures from one outage do not all come back at once
+        return delay * self._rng.uniform(1 - self.jitter, 1 + self.jitter)
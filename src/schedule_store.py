@@ -0,0 +1,433 @@
+"""
+Durable SQLite-backed store for scheduled emails
+"""
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+
+from .scheduler import DIMENSIONS, ROW_FIELDS, ScheduledEmail, write_rows
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scheduled_emails (
+    id INTEGER PRIMARY KEY,
+    recipient_email TEXT NOT NULL,
+    recipient_name TEXT NOT NULL,
+    company TEXT NOT NULL,
+    is_reminder INTEGER NOT NULL,
+    batch_num INTEGER NOT NULL,
+    send_time REAL NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    claimed_at REAL,
+    claimed_by TEXT,
+    lease_expires REAL,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_scheduled_status_send_time ON scheduled_emails (status, send_time);
+CREATE INDEX IF NOT EXISTS idx_scheduled_send_time ON scheduled_emails (send_time);
+CREATE INDEX IF NOT EXISTS idx_scheduled_recipient ON scheduled_emails (recipient_email);
+"""
+
+# Columns added after the first release, with their types, for databases created before them
+MIGRATIONS = (('claimed_by', 'TEXT'), ('lease_expires', 'REAL'))
+
+COLUMNS = ('id', 'recipient_email', 'recipient_name', 'company', 'is_reminder', 'batch_num', 'send_time',
+           'attempts')
+
+# SQL for each ScheduleIndex dimension; dates use local time like datetime.fromtimestamp
+DIMENSION_SQL = {
+    'date': "date(send_time, 'unixepoch', 'localtime')",
+    'company': "company",
+    'batch': "batch_num",
+    'type': "CASE WHEN is_reminder THEN 'reminder' ELSE 'initial' END",
+}
+
+# ScheduleIndex.iter_rows fields, in ROW_FIELDS order
+ROW_SQL = (f"{DIMENSION_SQL['date']}, time(send_time, 'unixepoch', 'localtime'), batch_num, "
+           f"{DIMENSION_SQL['type']}, company, recipient_email, recipient_name")
+
+
+class ScheduleStore:
+    """
+    Persists the email schedule so a campaign survives process restarts
+
+    Rows move through ``pending`` -> ``claimed`` -> ``sent``, or end in
+    ``failed`` when a send fails permanently, or ``skipped`` when the same
+    message was already sent (or is being sent) for another row. Senders
+    take due work a page at a time with ``claim_due``, so nothing ever loads
+    the whole schedule.
+
+    Each claim records which store (``owner``) took the row and when its
+    lease expires. Another process working on the same database never
+    takes over a live claim: ``recover_claims`` only returns rows whose
+    lease ran out (a crashed or stuck run) to ``pending``, and ``release``
+    only releases this owner's claims.
+    """
+
+    def __init__(self, db_path: str, lease: float = 3600.0, owner: Optional[str] = None):
+        """
+        Open (and create if needed) the schedule database
+
+        Args:
+            db_path: Path to the SQLite file, or ':memory:'
+            lease: Seconds a claim stays ours before another run may recover it
+            owner: Name recorded on claims (defaults to host, process id and a random suffix)
+        """
+        self.db_path = db_path
+        self.lease = lease
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(scheduled_emails)")}
+        for column, kind in MIGRATIONS:
+            if column not in existing:
+                self._conn.execute(f"ALTER TABLE scheduled_emails ADD COLUMN {column} {kind}")
+
+    @staticmethod
+    def _to_entry(row) -> ScheduledEmail:
+        return ScheduledEmail(row[1], row[2], row[3], bool(row[4]), row[5], row[6], row_id=row[0], attempts=row[7])
+
+    def add_many(self, entries: List[Union[ScheduledEmail, Dict]]) -> List[ScheduledEmail]:
+        """
+        Insert scheduled emails in a single transaction
+
+        Each record gets its row id stored in ``id``.
+
+        Args:
+            entries: Scheduled email records (dictionaries are converted)
+
+        Returns:
+            List[ScheduledEmail]: The stored records
+        """
+        entries = [ScheduledEmail.coerce(entry) for entry in entries]
+        if not entries:
+            return entries
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                (next_id,) = cursor.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM scheduled_emails").fetchone()
+                for offset, entry in enumerate(entries):
+                    entry.id = next_id + offset
+                cursor.executemany(
+                    "INSERT INTO scheduled_emails "
+                    "(id, recipient_email, recipient_name, company, is_reminder, batch_num, send_time, attempts) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (entry.id, entry.recipient_email, entry.recipient_name,
+                         entry.company, int(entry.is_reminder), entry.batch_num, entry.send_at, entry.attempts)
+                        for entry in entries
+                    ]
+                )
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+        logger.debug(f"Stored {len(entries)} scheduled emails")
+        return entries
+
+    def claim_due(self, now: Optional[datetime] = None, limit: int = 1000) -> List[ScheduledEmail]:
+        """
+        Atomically claim pending rows whose send time has passed
+
+        The rows are leased to this store's ``owner`` for ``lease`` seconds.
+
+        Args:
+            now: Reference time (defaults to the current time)
+            limit: Maximum rows to claim
+
+        Returns:
+            List[ScheduledEmail]: Claimed scheduled emails in send-time order
+        """
+        now_ts = (now or datetime.now()).timestamp()
+        claimed_at = time.time()  # Leases run on the real clock even when ``now`` looks ahead
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                rows = cursor.execute(
+                    f"SELECT {', '.join(COLUMNS)} FROM scheduled_emails "
+                    "WHERE status = 'pending' AND send_time <= ? "
+                    "ORDER BY send_time LIMIT ?",
+                    (now_ts, limit)
+                ).fetchall()
+                cursor.executemany(
+                    "UPDATE scheduled_emails SET status = 'claimed', claimed_at = ?, claimed_by = ?, "
+                    "lease_expires = ? WHERE id = ?",
+                    [(claimed_at, self.owner, claimed_at + self.lease, row[0]) for row in rows]
+                )
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+        return [self._to_entry(row) for row in rows]
+
+    def _update_many(self, sql: str, params: Iterable[tuple]):
+        """Run one UPDATE for every parameter tuple in a single transaction, rolled back on error"""
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute("BEGIN")
+            try:
+                cursor.executemany(sql, params)
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+
+    def _set_status(self, ids: Iterable[int], status: str):
+        self._update_many("UPDATE scheduled_emails SET status = ? WHERE id = ?",
+                          [(status, row_id) for row_id in ids])
+
+    def mark_sent(self, ids: Iterable[int]):
+        """Mark rows as successfully sent"""
+        self._set_status(ids, 'sent')
+
+    def mark_skipped(self, ids: Iterable[int]):
+        """Settle rows that are not to be sent: duplicates of a sent message or contacts since removed"""
+        self._set_status(ids, 'skipped')
+
+    def rename_pending(self, names: Dict[int, str]):
+        """Update the recipient name of pending rows, by row id"""
+        self._update_many(
+            "UPDATE scheduled_emails SET recipient_name = ? WHERE id = ? AND status = 'pending'",
+            [(name, row_id) for row_id, name in names.items()]
+        )
+
+    def release(self, ids: Iterable[int]):
+        """Return rows claimed by this owner to the pending state"""
+        self._update_many(
+            "UPDATE scheduled_emails SET status = 'pending', claimed_at = NULL, claimed_by = NULL, "
+            "lease_expires = NULL WHERE id = ? AND status = 'claimed' AND claimed_by = ?",
+            [(row_id, self.owner) for row_id in ids]
+        )
+
+    def renew_claims(self) -> int:
+        """
+        Extend the lease on every row this owner still has claimed
+
+        Returns:
+            int: Number of claims renewed
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE scheduled_emails SET lease_expires = ? WHERE status = 'claimed' AND claimed_by = ?",
+                (time.time() + self.lease, self.owner)
+            )
+        return cursor.rowcount
+
+    def reschedule(self, row_id: int, send_at: float, error: str):
+        """Return a row to pending with a new send time after a transient failure"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE scheduled_emails SET status = 'pending', send_time = ?, attempts = attempts + 1, "
+                "claimed_at = NULL, claimed_by = NULL, lease_expires = NULL, last_error = ? WHERE id = ?",
+                (send_at, error, row_id)
+            )
+
+    def mark_failed(self, row_id: int, error: str):
+        """Record a permanent failure; the row is never retried"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE scheduled_emails SET status = 'failed', attempts = attempts + 1, "
+                "claimed_at = NULL, claimed_by = NULL, lease_expires = NULL, last_error = ? WHERE id = ?",
+                (error, row_id)
+            )
+
+    def recover_claims(self) -> int:
+        """
+        Return rows whose claim lease has expired to pending
+
+        Live claims of other runs (and of this one) are left alone; a claim
+        without a lease predates leases and counts as expired.
+
+        Returns:
+            int: Number of rows recovered
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE scheduled_emails SET status = 'pending', claimed_at = NULL, claimed_by = NULL, "
+                "lease_expires = NULL WHERE status = 'claimed' AND (lease_expires IS NULL OR lease_expires <= ?)",
+                (time.time(),)
+            )
+        return cursor.rowcount
+
+    def count(self, status: Optional[str] = None) -> int:
+        """Count rows, optionally restricted to one status"""
+        with self._lock:
+            if status is None:
+                (total,) = self._conn.execute("SELECT COUNT(*) FROM scheduled_emails").fetchone()
+            else:
+                (total,) = self._conn.execute(
+                    "SELECT COUNT(*) FROM scheduled_emails WHERE status = ?", (status,)
+                ).fetchone()
+        return total
+
+    @staticmethod
+    def _pending_where(date: Optional[str] = None, company: Optional[str] = None, batch: Optional[int] = None,
+                       template_type: Optional[str] = None) -> Tuple[str, tuple]:
+        """WHERE clause selecting pending rows, with ``ScheduleIndex``-style filters"""
+        clause = "WHERE status = 'pending'"
+        params = ()
+        for dimension, value in zip(DIMENSIONS, (date, company, batch, template_type)):
+            if value is not None:
+                clause += f" AND {DIMENSION_SQL[dimension]} = ?"
+                params += (value,)
+        return clause, params
+
+    def count_pending(self, **filters) -> int:
+        """Count pending rows, filtered by date, company, batch and/or template_type"""
+        where, params = self._pending_where(**filters)
+        with self._lock:
+            (total,) = self._conn.execute(f"SELECT COUNT(*) FROM scheduled_emails {where}", params).fetchone()
+        return total
+
+    def pending_counts(self, by: str) -> Dict:
+        """
+        Pending emails per value of one dimension, counted by SQLite
+
+        Args:
+            by: 'date', 'company', 'batch' or 'type'
+
+        Returns:
+            Dict: Value -> count, sorted by value
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {DIMENSION_SQL[by]} AS value, COUNT(*) FROM scheduled_emails "
+                "WHERE status = 'pending' GROUP BY value ORDER BY value"
+            ).fetchall()
+        return dict(rows)
+
+    def _iter_pending(self, select: str, offset: int, limit: Optional[int], page_size: int,
+                      filters: Dict) -> Iterator[tuple]:
+        """
+        Page through pending rows in (send_time, id) order
+
+        Pages after the first continue from the last (send_time, id) seen
+        rather than re-skipping, and only one page is in memory at a time.
+        """
+        where, filter_params = self._pending_where(**filters)
+        remaining = limit
+        after = None
+        while remaining is None or remaining > 0:
+            size = page_size if remaining is None else min(page_size, remaining)
+            query = f"SELECT send_time, id, {select} FROM scheduled_emails {where} "
+            if after is None:
+                query += "ORDER BY send_time, id LIMIT ? OFFSET ?"
+                params = filter_params + (size, offset)
+            else:
+                query += "AND (send_time, id) > (?, ?) ORDER BY send_time, id LIMIT ?"
+                params = filter_params + after + (size,)
+            with self._lock:
+                rows = self._conn.execute(query, params).fetchall()
+            for row in rows:
+                yield row[2:]
+            if len(rows) < size:
+                return
+            after = rows[-1][:2]
+            if remaining is not None:
+                remaining -= len(rows)
+
+    def iter_pending(self, offset: int = 0, limit: Optional[int] = None,
+                     page_size: int = 1000) -> Iterator[ScheduledEmail]:
+        """Stream pending rows as records in send-time order, a page at a time"""
+        for row in self._iter_pending(', '.join(COLUMNS), offset, limit, page_size, {}):
+            yield self._to_entry(row)
+
+    def iter_pending_rows(self, offset: int = 0, limit: Optional[int] = None, page_size: int = 1000,
+                          **filters) -> Iterator[Dict]:
+        """
+        Stream pending emails as ``ScheduleIndex`` rows in send-time order
+
+        Args:
+            offset: Rows to skip
+            limit: Maximum rows to yield (None for all)
+            page_size: Rows fetched per query
+            **filters: date, company, batch and/or template_type, as for ``ScheduleIndex.count``
+
+        Yields:
+            Dict: Row with the ``ROW_FIELDS`` keys
+        """
+        for row in self._iter_pending(ROW_SQL, offset, limit, page_size, filters):
+            yield dict(zip(ROW_FIELDS, row))
+
+    def next_send_time(self) -> Optional[datetime]:
+        """Send time of the earliest pending row, or None if nothing is pending"""
+        with self._lock:
+            (send_at,) = self._conn.execute(
+                "SELECT MIN(send_time) FROM scheduled_emails WHERE status = 'pending'"
+            ).fetchone()
+        return datetime.fromtimestamp(send_at) if send_at is not None else None
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+
+class PendingSchedule:
+    """
+    Read-only view of a store's pending rows with the ``ScheduleIndex`` query API
+
+    ``EmailAutomation`` uses it in place of the in-memory index when a
+    schedule store is configured, so reports and exports are answered by
+    SQLite a page at a time instead of from a copy of the whole schedule.
+    """
+
+    def __init__(self, store: ScheduleStore):
+        self.store = store
+
+    def __len__(self) -> int:
+        return self.store.count('pending')
+
+    def __iter__(self) -> Iterator[ScheduledEmail]:
+        return self.store.iter_pending()
+
+    def __getitem__(self, position: int) -> ScheduledEmail:
+        """The pending email at ``position`` in send-time order"""
+        if position < 0:
+            position += len(self)
+        if position >= 0:
+            for email in self.store.iter_pending(offset=position, limit=1):
+                return email
+        raise IndexError(position)
+
+    def count(self, date: Optional[str] = None, company: Optional[str] = None, batch: Optional[int] = None,
+              template_type: Optional[str] = None) -> int:
+        """Count pending emails, optionally filtered (see ``ScheduleIndex.count``)"""
+        return self.store.count_pending(date=date, company=company, batch=batch, template_type=template_type)
+
+    def counts(self, by: str) -> Dict:
+        """Pending emails per value of one dimension"""
+        return self.store.pending_counts(by)
+
+    def summary(self) -> Dict:
+        """Total, per-dimension counts and the next send time, ready for JSON"""
+        next_send = self.store.next_send_time()
+        summary = {'total': len(self), 'next_send_time': next_send.isoformat() if next_send else None}
+        for dimension in DIMENSIONS:
+            summary[f"by_{dimension}"] = self.counts(dimension)
+        return summary
+
+    def iter_rows(self, offset: int = 0, limit: Optional[int] = None, **filters) -> Iterator[Dict]:
+        """Stream detail rows in send-time order (see ``ScheduleIndex.iter_rows``)"""
+        return self.store.iter_pending_rows(offset=offset, limit=limit, **filters)
+
+    def rows(self, offset: int = 0, limit: Optional[int] = 100, **filters) -> List[Dict]:
+        """One page of ``iter_rows``"""
+        return list(self.iter_rows(offset=offset, limit=limit, **filters))
+
+    def write_rows(self, file: TextIO, fmt: str = 'jsonl', **filters) -> int:
+        """Stream detail rows to an open text file (see ``ScheduleIndex.write_rows``)"""
+        return write_rows(file, self.iter_rows(**filters), fmt)
@@ -0,0 +1,491 @@
+"""
+Due-time scheduler for queued emails and the aggregate index over them
+"""
+import csv
+import heapq
+import json
+import logging
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from operator import attrgetter
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+class ScheduledEmail:
+    """
+    One queued email in a compact, fixed-layout record
+
+    Uses ``__slots__`` instead of a per-entry dict, interns the company
+    name and keeps the send time as epoch seconds. Entries from the same
+    batch share their ``send_at`` float and ``batch_num`` objects, and a
+    reminder shares the recipient strings of its initial email, so each
+    entry costs little more than its slot pointers.
+    """
+
+    __slots__ = ('recipient_email', 'recipient_name', 'company', 'is_reminder', 'batch_num', 'send_at', 'id',
+                 'attempts')
+
+    def __init__(self, recipient_email: str, recipient_name: str, company: str, is_reminder: bool,
+                 batch_num: int, send_at: float, row_id: Optional[int] = None, attempts: int = 0):
+        """
+        Create a scheduled email
+
+        Args:
+            recipient_email: Recipient address
+            recipient_name: Name used in the greeting
+            company: Company the recipient works for
+            is_reminder: Whether this is the reminder rather than the initial email
+            batch_num: Batch the email belongs to
+            send_at: Send time as epoch seconds
+            row_id: Schedule store row id, once persisted
+            attempts: Failed send attempts so far
+        """
+        self.recipient_email = recipient_email
+        self.recipient_name = recipient_name
+        self.company = sys.intern(company)
+        self.is_reminder = is_reminder
+        self.batch_num = batch_num
+        self.send_at = send_at
+        self.id = row_id
+        self.attempts = attempts
+
+    @classmethod
+    def from_dict(cls, entry: Dict) -> 'ScheduledEmail':
+        """Build a record from the dictionary layout (``send_time`` may be a datetime or epoch seconds)"""
+        send_time = entry['send_time']
+        return cls(
+            entry['recipient_email'], entry['recipient_name'], entry['company'],
+            bool(entry['is_reminder']), int(entry['batch_num']),
+            send_time.timestamp() if isinstance(send_time, datetime) else float(send_time),
+            entry.get('id'), entry.get('attempts', 0)
+        )
+
+    @classmethod
+    def coerce(cls, entry: Union['ScheduledEmail', Dict]) -> 'ScheduledEmail':
+        """Return ``entry`` unchanged if it is already a record, otherwise convert it"""
+        return entry if isinstance(entry, cls) else cls.from_dict(entry)
+
+    @property
+    def send_time(self) -> datetime:
+        return datetime.fromtimestamp(self.send_at)
+
+    @property
+    def template_type(self) -> str:
+        return 'reminder' if self.is_reminder else 'initial'
+
+    def to_dict(self) -> Dict:
+        """Expand to the dictionary layout"""
+        return {
+            'id': self.id,
+            'recipient_email': self.recipient_email,
+            'recipient_name': self.recipient_name,
+            'company': self.company,
+            'is_reminder': self.is_reminder,
+            'batch_num': self.batch_num,
+            'send_time': self.send_time,
+            'attempts': self.attempts,
+        }
+
+    def __repr__(self) -> str:
+        return (f"ScheduledEmail({self.recipient_email!r}, {self.template_type}, batch {self.batch_num}, "
+                f"{self.send_time:%Y-%m-%d %H:%M:%S})")
+
+
+class EmailScheduler:
+    """
+    Priority queue of scheduled emails keyed by ``send_at``
+
+    Waiters sleep exactly until the earliest entry is due and are woken
+    early whenever an earlier entry is added or the scheduler is closed.
+
+    The heap holds each distinct send time once, and the emails due at that
+    time wait in a list in insertion order. Every email of a batch shares
+    its send time, so queueing one costs a single list slot.
+    """
+
+    def __init__(self):
+        self._times = []  # Heap of distinct send times
+        self._buckets = {}  # send_at -> emails due then, in insertion order
+        self._size = 0
+        self._changes = 0  # Bumped by every add and notify, so sleepers can tell they were woken
+        self._condition = threading.Condition()
+        self._closed = False
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def add(self, email: ScheduledEmail):
+        """
+        Queue a scheduled email
+
+        Args:
+            email: Scheduled email record
+        """
+        self.add_many([email])
+
+    def add_many(self, emails: Iterable[ScheduledEmail]):
+        """Queue several scheduled emails with a single wake-up"""
+        with self._condition:
+            buckets = self._buckets
+            for email in emails:
+                bucket = buckets.get(email.send_at)
+                if bucket is None:
+                    buckets[email.send_at] = [email]
+                    heapq.heappush(self._times, email.send_at)
+                else:
+                    bucket.append(email)
+                self._size += 1
+            self._changes += 1
+            self._condition.notify_all()
+
+    def next_due_time(self) -> Optional[datetime]:
+        """Send time of the earliest queued email, if any"""
+        with self._condition:
+            return datetime.fromtimestamp(self._times[0]) if self._times else None
+
+    def _pop_due_locked(self, now: float) -> List[ScheduledEmail]:
+        due = []
+        while self._times and self._times[0] <= now:
+            due.extend(self._buckets.pop(heapq.heappop(self._times)))
+        self._size -= len(due)
+        return due
+
+    def pop_due(self, now: Optional[datetime] = None) -> List[ScheduledEmail]:
+        """
+        Remove and return every email due at ``now``
+
+        Args:
+            now: Reference time (defaults to the current time)
+
+        Returns:
+            List[ScheduledEmail]: Due emails in send-time order
+        """
+        with self._condition:
+            return self._pop_due_locked(now.timestamp() if now else time.time())
+
+    def wait_for_due(self, timeout: Optional[float] = None) -> List[ScheduledEmail]:
+        """
+        Block until at least one email is due, then pop all due emails
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            List[ScheduledEmail]: Due emails, or an empty list on timeout or close
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._condition:
+            while not self._closed:
+                now = time.time()
+                due = self._pop_due_locked(now)
+                if due:
+                    return due
+
+                waits = []
+                if self._times:
+                    waits.append(self._times[0] - now)
+                if deadline is not None:
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        return []
+                    waits.append(remaining)
+                self._condition.wait(min(waits) if waits else None)
+            return []
+
+    def notify(self):
+        """Wake ``sleep_until`` callers, e.g. after emails were scheduled somewhere other than this queue"""
+        with self._condition:
+            self._changes += 1
+            self._condition.notify_all()
+
+    def sleep_until(self, when: Optional[float]):
+        """
+        Sleep until ``when``, returning early on ``add``, ``notify`` or close
+
+        Args:
+            when: Epoch seconds to wake at (None sleeps until woken)
+        """
+        with self._condition:
+            changes = self._changes
+            timeout = None if when is None else max(0.0, when - time.time())
+            self._condition.wait_for(lambda: self._closed or self._changes != changes, timeout=timeout)
+
+    def pause(self, seconds: float):
+        """Sleep for up to ``seconds``, returning early if the scheduler is closed"""
+        with self._condition:
+            if not self._closed:
+                self._condition.wait_for(lambda: self._closed, timeout=seconds)
+
+    def close(self):
+        """Stop the scheduler and wake every waiter"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+ROW_FIELDS = ('date', 'time', 'batch', 'type', 'company', 'recipient', 'name')
+DIMENSIONS = ('date', 'company', 'batch', 'type')
+EXPORT_FORMATS = ('csv', 'jsonl')
+
+_SEND_AT = attrgetter('send_at')
+
+
+def write_rows(file: TextIO, rows: Iterable[Dict], fmt: str = 'jsonl') -> int:
+    """
+    Stream schedule rows (``ROW_FIELDS`` dicts) to an open text file
+
+    Args:
+        file: Destination (opened with newline='' for CSV)
+        rows: Rows to write
+        fmt: 'csv' or 'jsonl'
+
+    Returns:
+        int: Rows written
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported schedule export format: {fmt}")
+    writer = None
+    if fmt == 'csv':
+        writer = csv.DictWriter(file, fieldnames=ROW_FIELDS)
+        writer.writeheader()
+    written = 0
+    for row in rows:
+        if writer is not None:
+            writer.writerow(row)
+        else:
+            file.write(json.dumps(row) + '\n')
+        written += 1
+    return written
+
+
+class ScheduleIndex:
+    """
+    The scheduled emails, with running counts by date, company, batch and type
+
+    Counts are updated as emails are added and removed, so ``count`` with a
+    single filter and ``counts`` never walk the schedule. Detail rows come
+    from ``iter_rows``/``rows`` in send-time order, a page at a time, and
+    ``write_rows`` streams them as CSV or JSON lines. Dates are formatted
+    once per distinct send time rather than once per email.
+
+    Records are held by identity (``ScheduledEmail`` does not define
+    equality), each mapped to a (date, company, batch, type) key shared by
+    every email in the same cell, so an entry costs one dict slot. The
+    send-time order is not kept: a page is selected with ``heapq.nsmallest``
+    when rows are requested, which keeps the index small and adds and
+    removals cheap.
+    """
+
+    def __init__(self, emails: Iterable[ScheduledEmail] = ()):
+        self._lock = threading.RLock()
+        self._entries = {}  # email -> (date, company, batch, type), in insertion order
+        self._keys = {}  # Canonical copy of each key in use, shared by its emails
+        self._counts = {dimension: Counter() for dimension in DIMENSIONS}
+        self._cells = Counter()  # (date, company, batch, type) -> emails
+        self._formatted = {}  # send_at -> (date, time of day)
+        self.add_many(emails)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[ScheduledEmail]:
+        with self._lock:
+            return iter(list(self._entries))
+
+    def __contains__(self, email: ScheduledEmail) -> bool:
+        return email in self._entries
+
+    def __getitem__(self, position: int) -> ScheduledEmail:
+        """The email at ``position`` in send-time order (sorts the schedule; use ``iter_rows`` for pages)"""
+        with self._lock:
+            emails = list(self._entries)
+        return sorted(emails, key=_SEND_AT)[position]
+
+    def _format(self, send_at: float) -> Tuple[str, str]:
+        formatted = self._formatted.get(send_at)
+        if formatted is None:
+            if len(self._formatted) >= 65536:
+                self._formatted.clear()  # Retries give every entry its own time; keep the memo bounded
+            send_time = datetime.fromtimestamp(send_at)
+            formatted = self._formatted[send_at] = (send_time.strftime('%Y-%m-%d'), send_time.strftime('%H:%M:%S'))
+        return formatted
+
+    def _update_counts(self, keys: Counter, sign: int):
+        """Apply per-combination deltas; work is per distinct combination, not per email"""
+        for key, n in keys.items():
+            for counter, value in zip([self._cells] + [self._counts[d] for d in DIMENSIONS], (key,) + key):
+                counter[value] += sign * n
+                if not counter[value]:
+                    del counter[value]
+            if key not in self._cells:
+                self._keys.pop(key, None)
+
+    def add_many(self, emails: Iterable[ScheduledEmail]):
+        """Add emails (ones already present are ignored)"""
+        with self._lock:
+            entries, keys, formatted = self._entries, self._keys, self._formatted
+            added = Counter()
+            for email in emails:
+                if email in entries:
+                    continue
+                day = (formatted.get(email.send_at) or self._format(email.send_at))[0]
+                key = (day, email.company, email.batch_num, 'reminder' if email.is_reminder else 'initial')
+                key = keys.setdefault(key, key)
+                entries[email] = key
+                added[key] += 1
+            self._update_counts(added, 1)
+
+    def add(self, email: ScheduledEmail):
+        self.add_many([email])
+
+    def discard_many(self, emails: Iterable[ScheduledEmail]):
+        """Remove emails (ones not present are ignored)"""
+        with self._lock:
+            removed = Counter()
+            for email in emails:
+                key = self._entries.pop(email, None)
+                if key is not None:
+                    removed[key] += 1
+            self._update_counts(removed, -1)
+
+    def discard(self, email: ScheduledEmail):
+        self.discard_many([email])
+
+    def refresh(self, email: ScheduledEmail):
+        """Re-file an email whose send time changed (e.g. a retry), if it is present"""
+        with self._lock:
+            if email in self._entries:
+                self.discard(email)
+                self.add(email)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys.clear()
+            self._cells.clear()
+            for counter in self._counts.values():
+                counter.clear()
+
+    def count(self, date: Optional[str] = None, company: Optional[str] = None, batch: Optional[int] = None,
+              template_type: Optional[str] = None) -> int:
+        """
+        Count scheduled emails, optionally filtered
+
+        No filter or a single filter is a constant-time lookup; several
+        filters are summed over the distinct (date, company, batch, type)
+        combinations, never over individual emails.
+
+        Args:
+            date: Send date as 'YYYY-MM-DD'
+            company: Company name
+            batch: Batch number
+            template_type: 'initial' or 'reminder'
+
+        Returns:
+            int: Matching emails
+        """
+        filters = self._filters(date, company, batch, template_type)
+        with self._lock:
+            if not filters:
+                return len(self._entries)
+            if len(filters) == 1:
+                ((position, value),) = filters
+                return self._counts[DIMENSIONS[position]].get(value, 0)
+            return sum(n for key, n in self._cells.items() if all(key[p] == v for p, v in filters))
+
+    def counts(self, by: str) -> Dict:
+        """
+        Emails per value of one dimension
+
+        Args:
+            by: 'date', 'company', 'batch' or 'type'
+
+        Returns:
+            Dict: Value -> count, sorted by value
+        """
+        with self._lock:
+            return dict(sorted(self._counts[by].items()))
+
+    def summary(self) -> Dict:
+        """Total, per-dimension counts and the next send time, ready for JSON"""
+        with self._lock:
+            next_send = min((email.send_at for email in self._entries), default=None)
+            summary = {
+                'total': len(self._entries),
+                'next_send_time': datetime.fromtimestamp(next_send).isoformat() if next_send is not None else None,
+            }
+            for dimension in DIMENSIONS:
+                summary[f"by_{dimension}"] = self.counts(dimension)
+        return summary
+
+    @staticmethod
+    def _filters(date, company, batch, template_type) -> List[Tuple[int, object]]:
+        return [(position, value) for position, value in enumerate((date, company, batch, template_type))
+                if value is not None]
+
+    def iter_rows(self, date: Optional[str] = None, company: Optional[str] = None, batch: Optional[int] = None,
+                  template_type: Optional[str] = None, offset: int = 0,
+                  limit: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Stream detail rows in send-time order
+
+        A page is picked with a bounded heap rather than a full sort; ties
+        keep insertion order.
+
+        Args:
+            date, company, batch, template_type: Optional filters, as for ``count``
+            offset: Matching rows to skip
+            limit: Maximum rows to yield (None for all)
+
+        Yields:
+            Dict: Row with the ``ROW_FIELDS`` keys
+        """
+        filters = self._filters(date, company, batch, template_type)
+        with self._lock:
+            if filters:
+                emails = [email for email, key in self._entries.items() if all(key[p] == v for p, v in filters)]
+            else:
+                emails = list(self._entries)
+        if limit is None:
+            page = sorted(emails, key=_SEND_AT)[offset:]
+        else:
+            page = heapq.nsmallest(offset + limit, emails, key=_SEND_AT)[offset:]
+        del emails
+        for email in page:
+            day, time_of_day = self._format(email.send_at)
+            yield {
+                'date': day,
+                'time': time_of_day,
+                'batch': email.batch_num,
+                'type': email.template_type,
+                'company': email.company,
+                'recipient': email.recipient_email,
+                'name': email.recipient_name,
+            }
+
+    def rows(self, offset: int = 0, limit: Optional[int] = 100, **filters) -> List[Dict]:
+        """One page of ``iter_rows``"""
+        return list(self.iter_rows(offset=offset, limit=limit, **filters))
+
+    def write_rows(self, file: TextIO, fmt: str = 'jsonl', **filters) -> int:
+        """
+        Stream detail rows to an open text file
+
+        Args:
+            file: Destination (opened with newline='' for CSV)
+            fmt: 'csv' or 'jsonl'
+            **filters: Filters and paging passed to ``iter_rows``
+
+        Returns:
+            int: Rows written
+        """
+        return write_rows(file, self.iter_rows(**filters), fmt)
@@ -0,0 +1,140 @@
+"""
+Persistent index of already-sent emails used for cross-run dedupe
+"""
+import hashlib
+import logging
+import math
+import sqlite3
+import threading
+from typing import Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over 64-bit integer keys"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        """
+        Size the filter for an expected number of keys
+
+        Args:
+            capacity: Expected number of keys
+            error_rate: Target false-positive rate at capacity
+        """
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: int):
+        # Double hashing: derive every probe from two halves of the 64-bit key
+        key &= 0xFFFFFFFFFFFFFFFF
+        h1, h2 = key & 0xFFFFFFFF, (key >> 32) | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: int):
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: int) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class SentIndex:
+    """
+    Records which (recipient, campaign, template_type) messages were sent
+
+    Keys are stored on disk as 8-byte hashes in SQLite, so the index
+    survives restarts and costs a fixed few bytes per sent message. An
+    optional in-memory Bloom filter answers most "not sent yet" checks
+    without touching the database.
+    """
+
+    def __init__(self, db_path: str = ':memory:', bloom_capacity: Optional[int] = None,
+                 bloom_error_rate: float = 0.001):
+        """
+        Open (and create if needed) the index
+
+        Args:
+            db_path: SQLite file path, or ':memory:' for a per-process index
+            bloom_capacity: Expected number of sent keys; enables the Bloom filter when set
+            bloom_error_rate: Bloom filter false-positive rate
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS sent_keys (key INTEGER PRIMARY KEY)")
+
+        self._bloom = None
+        if bloom_capacity:
+            self._bloom = BloomFilter(max(bloom_capacity, len(self)), bloom_error_rate)
+            for (key,) in self._conn.execute("SELECT key FROM sent_keys"):
+                self._bloom.add(key)
+
+    @staticmethod
+    def make_key(recipient: str, campaign: str, template_type: str) -> int:
+        """
+        Hash a dedupe key to a signed 64-bit integer
+
+        Args:
+            recipient: Recipient email address (case-insensitive)
+            campaign: Campaign name
+            template_type: 'initial' or 'reminder'
+
+        Returns:
+            int: Key suitable for an SQLite INTEGER column
+        """
+        raw = f"{recipient.lower().strip()}\0{campaign}\0{template_type}".encode('utf-8')
+        digest = hashlib.blake2b(raw, digest_size=8).digest()
+        return int.from_bytes(digest, 'big', signed=True)
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM sent_keys").fetchone()
+        return count
+
+    def contains_key(self, key: int) -> bool:
+        """Check a precomputed key"""
+        if self._bloom is not None and key not in self._bloom:
+            return False
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM sent_keys WHERE key = ?", (key,)).fetchone()
+        return row is not None
+
+    def contains(self, recipient: str, campaign: str, template_type: str) -> bool:
+        """
+        Check whether a message was already sent
+
+        Args:
+            recipient: Recipient email address
+            campaign: Campaign name
+            template_type: 'initial' or 'reminder'
+
+        Returns:
+            bool: True if it was recorded as sent
+        """
+        return self.contains_key(self.make_key(recipient, campaign, template_type))
+
+    def add(self, recipient: str, campaign: str, template_type: str):
+        """Record a sent message"""
+        self.add_many([(recipient, campaign, template_type)])
+
+    def add_many(self, entries: Iterable[Tuple[str, str, str]]):
+        """Record several sent messages in one transaction"""
+        keys = [self.make_key(*entry) for entry in entries]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany("INSERT OR IGNORE INTO sent_keys (key) VALUES (?)", [(k,) for k in keys])
+            self._conn.execute("COMMIT")
+        if self._bloom is not None:
+            for key in keys:
+                self._bloom.add(key)
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,277 @@
+"""
+Pooled, persistent SMTP sessions for the email automation system
+"""
+import logging
+import smtplib
+import socket
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from .metrics import REGISTRY, MetricsRegistry
+from .transports import Transport
+
+logger = logging.getLogger(__name__)
+
+# Errors that mean the session is gone and a fresh connection is needed
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, socket.timeout)
+
+
+class PooledConnection:
+    """An authenticated SMTP session owned by a pool"""
+
+    def __init__(self, server: smtplib.SMTP):
+        self.server = server
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.messages_sent = 0
+
+    def close(self):
+        """Close the underlying session, ignoring errors from dead sockets"""
+        try:
+            self.server.quit()
+        except Exception:
+            try:
+                self.server.close()
+            except Exception:
+                pass
+
+
+class SMTPConnectionPool(Transport):
+    """
+    Keeps a bounded number of logged-in SMTP sessions open and reuses
+    them across messages. This is the live SMTP ``Transport``.
+
+    Sessions are health-checked with RSET when they are checked out again,
+    reconnected when the server has dropped them, and recycled after
+    ``max_messages`` messages or ``idle_timeout`` seconds without use.
+    A session lost during a send is not retried here: the server may
+    already have accepted the message, so the error goes to the caller's
+    retry policy instead of resending it blindly.
+    """
+
+    name = 'smtp'
+
+    def __init__(self, host: str, port: int, username: str, password: str,
+                 pool_size: int = 1, max_messages: int = 100,
+                 idle_timeout: float = 300.0, use_tls: bool = True,
+                 timeout: float = 30.0, smtp_class=smtplib.SMTP,
+                 metrics: Optional[MetricsRegistry] = None):
+        """
+        Initialize the connection pool
+
+        Args:
+            host: SMTP server host
+            port: SMTP server port
+            username: Login user, usually the sender's email address
+            password: Login password
+            pool_size: Maximum number of concurrently open sessions
+            max_messages: Messages sent before a session is recycled
+            idle_timeout: Seconds a session may sit unused before it is recycled
+            use_tls: Whether to issue STARTTLS after connecting
+            timeout: Socket timeout for SMTP operations
+            smtp_class: SMTP client class (overridable for tests)
+            metrics: Registry receiving connect/STARTTLS/login/DATA latencies (defaults to the global one)
+        """
+        if pool_size <= 0:
+            raise ValueError("Pool size must be positive")
+
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.pool_size = pool_size
+        self.max_messages = max_messages
+        self.idle_timeout = idle_timeout
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.smtp_class = smtp_class
+
+        metrics = metrics or REGISTRY
+        self._connect_seconds = metrics.histogram('smtp_connect_seconds', 'TCP connect and EHLO time')
+        self._starttls_seconds = metrics.histogram('smtp_starttls_seconds', 'STARTTLS handshake time')
+        self._login_seconds = metrics.histogram('smtp_login_seconds', 'AUTH time')
+        self._data_seconds = metrics.histogram('smtp_data_seconds', 'Time to transmit one message')
+        self._reconnects = metrics.counter('smtp_reconnects_total', 'Sessions reopened after the server dropped them')
+
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._closed = False
+
+    @classmethod
+    def from_provider(cls, provider: Dict, username: str, password: str,
+                      metrics: Optional[MetricsRegistry] = None) -> 'SMTPConnectionPool':
+        """
+        Create a pool from an ``EMAIL_PROVIDERS`` entry
+
+        Args:
+            provider: Provider settings dictionary
+            username: Login user
+            password: Login password
+            metrics: Registry receiving the pool's latencies (defaults to the global one)
+
+        Returns:
+            SMTPConnectionPool: Configured pool
+        """
+        return cls(
+            host=provider['smtp_server'],
+            port=provider['smtp_port'],
+            username=username,
+            password=password,
+            pool_size=provider.get('pool_size', 1),
+            max_messages=provider.get('max_messages_per_connection', 100),
+            idle_timeout=provider.get('idle_timeout', 300.0),
+            use_tls=provider.get('use_tls', True),
+            metrics=metrics,
+        )
+
+    def _connect(self) -> PooledConnection:
+        """Open, secure and authenticate a new session"""
+        logger.debug(f"Opening SMTP session to {self.host}:{self.port}")
+        started = time.perf_counter()
+        server = self.smtp_class(self.host, self.port, timeout=self.timeout)
+        try:
+            server.ehlo()
+            self._connect_seconds.observe(time.perf_counter() - started)
+            if self.use_tls:
+                with self._starttls_seconds.time():
+                    server.starttls()
+                    server.ehlo()
+            if self.username:
+                with self._login_seconds.time():
+                    server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        return PooledConnection(server)
+
+    def _is_expired(self, conn: PooledConnection) -> bool:
+        """Check whether a session should be recycled"""
+        if conn.messages_sent >= self.max_messages:
+            return True
+        return time.monotonic() - conn.last_used > self.idle_timeout
+
+    @staticmethod
+    def _is_healthy(conn: PooledConnection) -> bool:
+        """Reset the session state and confirm the server still answers"""
+        try:
+            code, _ = conn.server.rset()
+            return code == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def acquire(self) -> PooledConnection:
+        """
+        Check out a healthy session, opening a new one if needed
+
+        Returns:
+            PooledConnection: Session reserved for the caller
+        """
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+
+        self._slots.acquire()
+        try:
+            while True:
+                with self._lock:
+                    conn = self._idle.popleft() if self._idle else None
+                if conn is None:
+                    return self._connect()
+                if self._is_expired(conn):
+                    logger.debug("Recycling stale SMTP session")
+                    conn.close()
+                    continue
+                if not self._is_healthy(conn):
+                    # Found before the send started, so reconnecting cannot duplicate a message
+                    logger.warning("SMTP session dropped by the server, reconnecting")
+                    self._reconnects.inc()
+                    conn.close()
+                    continue
+                return conn
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, conn: PooledConnection, discard: bool = False):
+        """
+        Return a session to the pool
+
+        Args:
+            conn: Session previously returned by ``acquire``
+            discard: Close the session instead of keeping it for reuse
+        """
+        try:
+            if discard or self._closed or self._is_expired(conn):
+                conn.close()
+            else:
+                with self._lock:
+                    self._idle.append(conn)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self) -> Iterator[PooledConnection]:
+        """Context manager wrapping ``acquire``/``release``"""
+        conn = self.acquire()
+        discard = False
+        try:
+            yield conn
+        except CONNECTION_ERRORS:
+            discard = True
+            raise
+        finally:
+            self.release(conn, discard=discard)
+
+    def _send(self, send):
+        """
+        Run ``send(server)`` on a health-checked pooled session
+
+        A connection error raised by ``send`` discards the session and is
+        re-raised, since the message may have been accepted before the
+        session was lost.
+        """
+        with self.connection() as conn:
+            with self._data_seconds.time():
+                result = send(conn.server)
+            conn.messages_sent += 1
+            conn.last_used = time.monotonic()
+            return result
+
+    def send_message(self, msg, from_addr: Optional[str] = None, to_addrs=None):
+        """
+        Send a message over a pooled session, reopening the session first
+        if the server dropped it while idle
+
+        Args:
+            msg: ``email.message.Message`` to send
+            from_addr: Envelope sender (defaults to the From header)
+            to_addrs: Envelope recipients (default to the To/Cc/Bcc headers)
+        """
+        return self._send(lambda server: server.send_message(msg, from_addr, to_addrs))
+
+    def send_raw(self, from_addr: str, to_addrs, data: bytes):
+        """
+        Send an already serialized message over a pooled session
+
+        Args:
+            from_addr: Envelope sender
+            to_addrs: Envelope recipient or list of recipients
+            data: Message in wire format (CRLF line endings)
+        """
+        return self._send(lambda server: server.sendmail(from_addr, to_addrs, data))
+
+    def check(self):
+        """Open (or reuse) an authenticated session, raising if that fails"""
+        with self.connection():
+            pass
+
+    def close(self):
+        """Close every idle session and refuse further checkouts"""
+        self._closed = True
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for conn in idle:
+            conn.close()
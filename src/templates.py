@@ -1,11 +1,65 @@
 """
 Email template management for the automation system
 """
-from typing import Dict
+from string import Formatter
+from typing import Dict, Iterable, List, Tuple
+
+# Subject lines per template type; {company} is filled in at compile time
+SUBJECT_TEMPLATES = {
+    'initial': "Data Science Opportunities at {company}",
+    'reminder': "Following up: Data Science Opportunities at {company}"
+}
+
+class CompiledTemplate:
+    """Template pre-split into literal text and placeholder segments"""
+    
+    def __init__(self, template: str):
+        """
+        Parse a ``str.format`` style template once
+        
+        Args:
+            template: Template text with simple ``{field}`` placeholders
+        """
+        self.source = template
+        self.literals: List[str] = []
+        self.fields: List[str] = []
+        
+        literal = []
+        for text, field, spec, conversion in Formatter().parse(template):
+            literal.append(text)
+            if field is None:
+                continue
+            if spec or conversion or not field.isidentifier():
+                raise ValueError(f"Unsupported placeholder in template: {{{field}}}")
+            self.literals.append(''.join(literal))
+            self.fields.append(field)
+            literal = []
+        self.tail = ''.join(literal)
+        
+    def render(self, values: Dict[str, str]) -> str:
+        """
+        Fill the placeholders
+        
+        Args:
+            values: Placeholder values
+            
+        Returns:
+            str: Rendered text
+        """
+        parts = []
+        try:
+            for literal, field in zip(self.literals, self.fields):
+                parts.append(literal)
+                parts.append(str(values[field]))
+        except KeyError as e:
+            raise ValueError(f"Missing required template value: {e}")
+        parts.append(self.tail)
+        return ''.join(parts)
 
 class EmailTemplateManager:
     def __init__(self):
         self.templates = self._create_email_templates()
+        self.compiled = self._compile_templates()
         
     def _create_email_templates(self) -> Dict[str, Dict[str, str]]:
         """Create and store email templates for each company"""
@@ -81,6 +135,68 @@ Sai Harsha Mummaneni
             
         return templates
     
+    def _compile_templates(self) -> Dict[Tuple[str, str], Tuple[CompiledTemplate, CompiledTemplate]]:
+        """Compile the subject and body of every (company, template_type) pair"""
+        compiled = {}
+        for company, templates in self.templates.items():
+            for template_type, body in templates.items():
+                subject = SUBJECT_TEMPLATES[template_type].format(company=company.title())
+                compiled[(company, template_type)] = (CompiledTemplate(subject), CompiledTemplate(body))
+        return compiled
+    
+    def get_compiled(self, company: str, template_type: str = 'initial') -> Tuple[CompiledTemplate, CompiledTemplate]:
+        """
+        Get the compiled subject and body templates
+        
+        Args:
+            company: Company name
+            template_type: 'initial' or 'reminder'
+            
+        Returns:
+            Tuple[CompiledTemplate, CompiledTemplate]: Subject and body templates
+        """
+        compiled = self.compiled.get((company.lower(), template_type))
+        if compiled is None:
+            # Raises the appropriate ValueError for unknown companies or types
+            self.get_template(company, template_type)
+        return compiled
+        
+    def render(self, company: str, template_type: str = 'initial', **kwargs) -> Tuple[str, str]:
+        """
+        Render the subject and body for one recipient in a single pass
+        
+        Args:
+            company: Company name
+            template_type: 'initial' or 'reminder'
+            kwargs: Placeholder values, e.g. name
+            
+        Returns:
+            Tuple[str, str]: Subject and body
+        """
+        subject, body = self.get_compiled(company, template_type)
+        return subject.render(kwargs), body.render(kwargs)
+        
+    def render_many(self, contacts: Iterable[Tuple[str, str]], template_type: str = 'initial') -> List[Tuple[str, str]]:
+        """
+        Render subjects and bodies for many recipients
+        
+        Args:
+            contacts: (company, name) pairs
+            template_type: 'initial' or 'reminder'
+            
+        Returns:
+            List[Tuple[str, str]]: Subject and body for each contact, in order
+        """
+        lookup = {}
+        rendered = []
+        for company, name in contacts:
+            compiled = lookup.get(company)
+            if compiled is None:
+                compiled = lookup[company] = self.get_compiled(company, template_type)
+            values = {'name': name}
+            rendered.append((compiled[0].render(values), compiled[1].render(values)))
+        return rendered
+    
     def get_template(self, company: str, template_type: str = 'initial') -> str:
         """
         Get specific email template
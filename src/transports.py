@@ -0,0 +1,193 @@
+"""
+Interchangeable message transports: live SMTP, a local maildir spool and an in-memory sink
+
+Every transport takes a built message (``send_message``) or wire-format
+bytes (``send_raw``). The spool and in-memory transports stand in for SMTP
+during dry runs and offline throughput measurements. Pick one with
+``TRANSPORT_SETTINGS['type']``.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+from collections import deque
+from email.generator import BytesGenerator
+from email.utils import getaddresses
+from io import BytesIO
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+TRANSPORT_TYPES = ('smtp', 'spool', 'memory')
+
+
+def serialize_message(msg) -> bytes:
+    """Serialize a message to SMTP wire format (CRLF line endings)"""
+    buffer = BytesIO()
+    BytesGenerator(buffer, policy=msg.policy.clone(linesep='\r\n')).flatten(msg, linesep='\r\n')
+    return buffer.getvalue()
+
+
+def _envelope(msg, from_addr: Optional[str], to_addrs) -> Tuple[str, List[str]]:
+    """Envelope sender and recipients, defaulting to the headers as smtplib does"""
+    if from_addr is None:
+        from_addr = getaddresses([msg.get('From', '')])[0][1]
+    if to_addrs is None:
+        headers = msg.get_all('To', []) + msg.get_all('Cc', []) + msg.get_all('Bcc', [])
+        to_addrs = [address for _, address in getaddresses(headers) if address]
+    return from_addr, _recipients(to_addrs)
+
+
+def _recipients(to_addrs: Union[str, Sequence[str]]) -> List[str]:
+    return [to_addrs] if isinstance(to_addrs, str) else list(to_addrs)
+
+
+class Transport:
+    """
+    Delivers messages for one sender account
+
+    Subclasses implement ``send_raw``; ``send_message`` serializes the
+    message and hands it over, so every transport pays the same
+    serialization cost as SMTP does.
+    """
+
+    name = 'transport'
+
+    def send_message(self, msg, from_addr: Optional[str] = None, to_addrs=None):
+        """
+        Send a built message
+
+        Args:
+            msg: ``email.message.Message`` to send
+            from_addr: Envelope sender (defaults to the From header)
+            to_addrs: Envelope recipients (default to the To/Cc/Bcc headers)
+        """
+        from_addr, to_addrs = _envelope(msg, from_addr, to_addrs)
+        return self.send_raw(from_addr, to_addrs, serialize_message(msg))
+
+    def send_raw(self, from_addr: str, to_addrs, data: bytes):
+        """
+        Send an already serialized message
+
+        Args:
+            from_addr: Envelope sender
+            to_addrs: Envelope recipient or list of recipients
+            data: Message in wire format (CRLF line endings)
+        """
+        raise NotImplementedError
+
+    def check(self):
+        """Raise if the transport cannot deliver (e.g. SMTP login fails)"""
+
+    def close(self):
+        """Release any resources held by the transport"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class MemoryTransport(Transport):
+    """
+    Keeps delivered messages in memory
+
+    Counts every message and byte; only the most recent ``max_messages``
+    are kept so 100k-message dry runs stay within bounded memory.
+    """
+
+    name = 'memory'
+
+    def __init__(self, max_messages: Optional[int] = 1000):
+        """
+        Args:
+            max_messages: Messages retained for inspection (None keeps all)
+        """
+        self.messages = deque(maxlen=max_messages)  # (from_addr, to_addrs, data)
+        self.sent_count = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+
+    def send_raw(self, from_addr: str, to_addrs, data: bytes):
+        with self._lock:
+            self.messages.append((from_addr, _recipients(to_addrs), data))
+            self.sent_count += 1
+            self.bytes_sent += len(data)
+        return {}
+
+
+class SpoolTransport(Transport):
+    """
+    Writes each message to a maildir-layout spool directory
+
+    Files are written under ``tmp/`` and renamed into ``new/``, so a
+    reader never sees a partial message and the spool can be opened with
+    any maildir-aware mail client or ``mailbox.Maildir``. The envelope is
+    recorded in ``X-Envelope-From``/``X-Envelope-To`` headers ahead of the
+    message.
+    """
+
+    name = 'spool'
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory: Spool root (``tmp``, ``new`` and ``cur`` are created inside)
+        """
+        self.directory = directory
+        for sub in ('tmp', 'new', 'cur'):
+            os.makedirs(os.path.join(directory, sub), exist_ok=True)
+        self._counter = 0
+        self._lock = threading.Lock()
+        self._host = socket.gethostname().replace('/', '_').replace(':', '_')
+
+    def _unique_name(self) -> str:
+        with self._lock:
+            self._counter += 1
+            counter = self._counter
+        now = time.time()
+        return f"{int(now)}.M{int(now % 1 * 1e6)}P{os.getpid()}Q{counter}.{self._host}"
+
+    def send_raw(self, from_addr: str, to_addrs, data: bytes):
+        name = self._unique_name()
+        envelope = (f"X-Envelope-From: {from_addr}\r\n"
+                    f"X-Envelope-To: {', '.join(_recipients(to_addrs))}\r\n").encode('utf-8')
+        tmp_path = os.path.join(self.directory, 'tmp', name)
+        with open(tmp_path, 'wb') as f:
+            f.write(envelope)
+            f.write(data)
+        os.replace(tmp_path, os.path.join(self.directory, 'new', name))
+        return {}
+
+    def check(self):
+        if not os.access(os.path.join(self.directory, 'new'), os.W_OK):
+            raise PermissionError(f"Spool directory is not writable: {self.directory}")
+
+
+def create_transport(settings: Dict, provider: Dict, username: str, password: str,
+                     metrics=None) -> Transport:
+    """
+    Build the transport selected by ``TRANSPORT_SETTINGS``
+
+    Args:
+        settings: ``TRANSPORT_SETTINGS`` (type, spool_dir, memory_max_messages)
+        provider: ``EMAIL_PROVIDERS`` entry, used by the SMTP transport
+        username: SMTP login user
+        password: SMTP login password
+        metrics: Registry for SMTP latencies
+
+    Returns:
+        Transport: Ready-to-use transport
+    """
+    kind = settings.get('type', 'smtp')
+    if kind == 'smtp':
+        from .smtp_pool import SMTPConnectionPool
+        return SMTPConnectionPool.from_provider(provider, username, password, metrics)
+    if kind == 'spool':
+        # One maildir per sender keeps dry-run output per account
+        return SpoolTransport(os.path.join(settings['spool_dir'], username or 'default'))
+    if kind == 'memory':
+        return MemoryTransport(settings.get('memory_max_messages', 1000))
+    raise ValueError(f"Unknown transport type: {kind} (expected one of {', '.join(TRANSPORT_TYPES)})")
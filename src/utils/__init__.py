@@ -3,6 +3,11 @@ Utility modules for email automation system.
 """
 
 from .validators import EmailValidator, DataValidator
-from .company_matcher import CompanyMatcher
+from .company_matcher import CompanyMatcher, DomainIndex
+from .contact_reader import iter_contact_frames
+from .fingerprints import ContactFingerprints
+from .contact_cache import ContactCache
+from .domain_checker import DomainChecker, DNSResolver
 
-__all__ = ['EmailValidator', 'DataValidator', 'CompanyMatcher']
\ No newline at end of file
+__all__ = ['EmailValidator', 'DataValidator', 'CompanyMatcher', 'DomainIndex', 'iter_contact_frames',
+           'ContactFingerprints', 'ContactCache', 'DomainChecker', 'DNSResolver']
\ No newline at end of file
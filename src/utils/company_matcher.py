@@ -1,30 +1,139 @@
-import re
+import os
+import csv
+import json
 import logging
-from typing import Dict, Optional
+import functools
+from typing import Dict, Iterable, List, Optional
 
 logger = logging.getLogger(__name__)
 
+class DomainIndex:
+    """
+    Hash index from email domains to companies
+    
+    Plain entries (``amazon.com``) match the domain and any subdomain, with
+    the longest suffix winning. Entries ending in ``.*`` (``amazon.*``)
+    match the name under any TLD, i.e. the first label after the ``@``.
+    A lookup hashes at most one key per domain label, so it costs
+    O(domain length) however many companies are indexed.
+    """
+    
+    def __init__(self):
+        self._suffixes: Dict[str, str] = {}
+        self._labels: Dict[str, str] = {}
+        
+    def __len__(self) -> int:
+        return len(self._suffixes) + len(self._labels)
+        
+    def add(self, domain: str, company: str):
+        """
+        Map a domain to a company
+        
+        Args:
+            domain: Domain such as 'amazon.com', or 'amazon.*' for any TLD
+            company: Company name
+        """
+        domain = domain.lower().strip().lstrip('@').rstrip('.')
+        company = company.lower().strip()
+        if not domain or not company:
+            return
+        if domain.endswith('.*'):
+            self._labels.setdefault(domain[:-2], company)
+        else:
+            self._suffixes.setdefault(domain, company)
+            
+    def lookup(self, domain: str) -> Optional[str]:
+        """
+        Find the company owning a domain
+        
+        Args:
+            domain: Lower-cased domain part of an email address
+            
+        Returns:
+            Optional[str]: Company name, or None if the domain is not indexed
+        """
+        # Walk parent domains: a.b.amazon.com -> b.amazon.com -> amazon.com -> com
+        suffix = domain
+        while suffix:
+            company = self._suffixes.get(suffix)
+            if company is not None:
+                return company
+            suffix = suffix.partition('.')[2]
+            
+        label, dot, rest = domain.partition('.')
+        if dot and rest:
+            return self._labels.get(label)
+        return None
+
 class CompanyMatcher:
     """Utility class for identifying companies from email addresses"""
     
-    # Company email patterns
-    COMPANY_PATTERNS = {
-        'amazon': [r'@amazon\.', r'@a2z\.'],
-        'meta': [r'@meta\.', r'@fb\.', r'@facebook\.'],
-        'google': [r'@google\.', r'@gmail\.'],
-        'apple': [r'@apple\.', r'@icloud\.']
+    # Company email domains; 'name.*' matches the name under any TLD
+    COMPANY_DOMAINS = {
+        'amazon': ['amazon.*', 'a2z.*'],
+        'meta': ['meta.*', 'fb.*', 'facebook.*'],
+        'google': ['google.*', 'gmail.*'],
+        'apple': ['apple.*', 'icloud.*']
     }
     
-    # Compiled regex patterns for performance
-    _compiled_patterns: Dict[str, list] = {}
-    
-    def __init__(self):
-        """Initialize regex patterns"""
-        for company, patterns in self.COMPANY_PATTERNS.items():
-            self._compiled_patterns[company] = [
-                re.compile(pattern, re.IGNORECASE) 
-                for pattern in patterns
-            ]
+    def __init__(self, domains_file: Optional[str] = None, cache_size: int = 65536):
+        """
+        Build the domain index
+        
+        Args:
+            domains_file: Optional CSV (company,domain) or JSON ({company: [domains]})
+                file with additional company domains
+            cache_size: Number of domain lookups memoized per matcher
+        """
+        self.companies: List[str] = []
+        self._index = DomainIndex()
+        for company, domains in self.COMPANY_DOMAINS.items():
+            self.add_domains(company, domains)
+        if domains_file:
+            self.load_domains(domains_file)
+            
+        self._lookup = functools.lru_cache(maxsize=cache_size)(self._index.lookup)
+        
+    def add_domains(self, company: str, domains: Iterable[str]):
+        """
+        Register email domains for a company
+        
+        Args:
+            company: Company name
+            domains: Domains owned by the company
+        """
+        company = company.lower().strip()
+        if company not in self.companies:
+            self.companies.append(company)
+        for domain in domains:
+            self._index.add(domain, company)
+        if hasattr(self, '_lookup'):
+            self._lookup.cache_clear()
+            
+    def load_domains(self, path: str) -> int:
+        """
+        Load company domains from a CSV or JSON file
+        
+        Args:
+            path: Path to the mapping file
+            
+        Returns:
+            int: Number of domains loaded
+        """
+        mappings: Dict[str, List[str]] = {}
+        if os.path.splitext(path)[1].lower() == '.json':
+            with open(path) as f:
+                mappings = json.load(f)
+        else:
+            with open(path, newline='') as f:
+                for row in csv.DictReader(f):
+                    mappings.setdefault(row['company'], []).append(row['domain'])
+                    
+        for company, domains in mappings.items():
+            self.add_domains(company, domains)
+        loaded = sum(len(domains) for domains in mappings.values())
+        logger.info(f"Loaded {loaded} company domains from {path}")
+        return loaded
     
     def identify_company(self, email: Optional[str]) -> str:
         """
@@ -40,16 +149,33 @@ class CompanyMatcher:
             return 'unknown'
             
         email = email.lower().strip()
+        _, at, domain = email.rpartition('@')
         
-        # Check each company's patterns
-        for company, patterns in self._compiled_patterns.items():
-            if any(pattern.search(email) for pattern in patterns):
-                logger.debug(f"Identified {company} from email: {email}")
-                return company
+        company = self._lookup(domain) if at else None
+        if company is not None:
+            # Lazy %-formatting: most of these are dropped by the debug sampler
+            logger.debug("Identified %s from email: %s", company, email)
+            return company
                 
-        logger.debug(f"Unknown company for email: {email}")
+        logger.debug("Unknown company for email: %s", email)
         return 'unknown'
     
+    def identify_companies(self, emails):
+        """
+        Vectorized ``identify_company`` over a pandas Series of strings
+        
+        Args:
+            emails: Series of email addresses
+            
+        Returns:
+            pd.Series: Company name (or 'unknown') for each address
+        """
+        domains = emails.str.lower().str.strip().str.extract(r'@([^@]*)$', expand=False)
+        
+        # Resolve each distinct domain once, then map the whole column
+        companies = {domain: self._lookup(domain) or 'unknown' for domain in domains.dropna().unique()}
+        return domains.map(companies).fillna('unknown').astype(object)
+    
     def get_company_quota(self, company: str, default_quota: int = 10) -> int:
         """
         Get email quota for specific company
@@ -84,7 +210,7 @@ class CompanyMatcher:
             return False
             
         # Check if we have contacts for each target company
-        missing_companies = set(self.COMPANY_PATTERNS.keys()) - set(companies.keys())
+        missing_companies = set(self.companies) - set(companies.keys())
         if missing_companies:
             logger.warning(f"Missing contacts for companies: {missing_companies}")
             return False
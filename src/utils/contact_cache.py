@@ -0,0 +1,164 @@
+"""
+Memory-mapped Arrow cache of validated contact tables, keyed by the source files' mtime and size
+"""
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, Iterable, Iterator, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever validation or company matching changes what ends up in the table
+CACHE_VERSION = 1
+COLUMNS = ['company', 'name', 'email', 'role', 'key', 'hash']
+_METADATA_KEY = b'massemailer.source'
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        raise ImportError("Caching parsed contacts requires pyarrow: pip install pyarrow")
+    return pyarrow
+
+
+class ContactCache:
+    """
+    Caches the validated, company-matched contact table as Arrow IPC files
+
+    Each source file gets one cache file, tagged with the source's path,
+    mtime and size (and those of any files the parse depends on, such as
+    the company domain list). While they still match, later loads are
+    memory-mapped reads of the cache instead of a full parse.
+    """
+
+    def __init__(self, cache_dir: str):
+        """
+        Args:
+            cache_dir: Directory holding the cache files (created if needed)
+
+        Raises:
+            ImportError: If pyarrow is not installed
+        """
+        self.pa = _import_pyarrow()
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self.schema = self.pa.schema([
+            ('company', self.pa.string()),
+            ('name', self.pa.string()),
+            ('email', self.pa.string()),
+            ('role', self.pa.string()),
+            ('key', self.pa.int64()),   # Contact fingerprint key (see ContactFingerprints)
+            ('hash', self.pa.int64()),  # Contact row fingerprint
+        ])
+
+    def path_for(self, source: str) -> str:
+        """Cache file used for ``source``"""
+        digest = hashlib.sha1(os.path.abspath(source).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"contacts-{digest}.arrow")
+
+    @staticmethod
+    def signature(source: str, dependencies: Iterable[str] = ()) -> Dict:
+        """
+        Describe the current state of a source file and its dependencies
+
+        Args:
+            source: Contact file path
+            dependencies: Other files whose contents affect the parsed table
+
+        Returns:
+            Dict: JSON-serializable key the cache entry must match
+        """
+        def stat(path):
+            if not os.path.exists(path):
+                return None
+            st = os.stat(path)
+            return [st.st_mtime_ns, st.st_size]
+
+        return {
+            'version': CACHE_VERSION,
+            'source': os.path.abspath(source),
+            'stat': stat(source),
+            'dependencies': {os.path.abspath(path): stat(path) for path in dependencies},
+        }
+
+    def load(self, source: str, dependencies: Iterable[str] = (),
+             chunksize: Optional[int] = None) -> Optional[Iterator[pd.DataFrame]]:
+        """
+        Read the cached table for ``source`` if it is still current
+
+        Args:
+            source: Contact file path
+            dependencies: Other files whose contents affect the parsed table
+            chunksize: Maximum rows per yielded frame
+
+        Returns:
+            Optional[Iterator[pd.DataFrame]]: Cached frames, or None on a miss
+        """
+        path = self.path_for(source)
+        if not os.path.exists(path):
+            return None
+        try:
+            # Memory-mapped, so reading the table does not copy the file into memory
+            with self.pa.memory_map(path, 'r') as mapped:
+                table = self.pa.ipc.open_file(mapped).read_all()
+        except (OSError, self.pa.ArrowInvalid) as e:
+            logger.warning(f"Ignoring unreadable contact cache {path}: {e}")
+            return None
+
+        metadata = table.schema.metadata or {}
+        if json.loads(metadata.get(_METADATA_KEY, b'null')) != self.signature(source, dependencies):
+            logger.info(f"Contact cache for {source} is stale")
+            return None
+
+        logger.info(f"Loaded {table.num_rows} parsed contacts for {source} from {path}")
+        return (batch.to_pandas() for batch in table.to_batches(max_chunksize=chunksize))
+
+    def writer(self, source: str, dependencies: Iterable[str] = ()) -> 'ContactCacheWriter':
+        """
+        Start a cache entry for ``source``
+
+        The signature is taken now, before the source is read, so a file
+        modified mid-parse is not mistaken for the version that was parsed.
+        """
+        return ContactCacheWriter(self, self.path_for(source), self.signature(source, dependencies))
+
+
+class ContactCacheWriter:
+    """Streams validated contact frames into a cache file, published only on ``commit``"""
+
+    def __init__(self, cache: ContactCache, path: str, signature: Dict):
+        self.pa = cache.pa
+        self.path = path
+        self.tmp_path = f"{path}.{os.getpid()}.tmp"
+        self.schema = cache.schema.with_metadata({_METADATA_KEY: json.dumps(signature).encode('utf-8')})
+        self.rows = 0
+        self._writer = self.pa.ipc.new_file(self.tmp_path, self.schema)
+
+    def write(self, contacts: pd.DataFrame):
+        """Append a frame with the cache's columns"""
+        batch = self.pa.RecordBatch.from_pandas(contacts[COLUMNS], schema=self.schema, preserve_index=False)
+        self._writer.write_batch(batch)
+        self.rows += len(contacts)
+
+    def commit(self):
+        """Publish the cache file, replacing any earlier version"""
+        self._writer.close()
+        self._writer = None
+        os.replace(self.tmp_path, self.path)
+        logger.info(f"Cached {self.rows} parsed contacts in {self.path}")
+
+    def discard(self):
+        """Drop an unfinished cache file (no-op after ``commit``)"""
+        if self._writer is None:
+            return
+        self._writer.close()
+        self._writer = None
+        try:
+            os.remove(self.tmp_path)
+        except OSError:
+            pass
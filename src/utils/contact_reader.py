@@ -0,0 +1,96 @@
+"""
+Chunked readers for .xlsx, .csv and .parquet contact files
+"""
+import os
+import logging
+from typing import Iterator, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNKSIZE = 10_000
+
+
+def _iter_excel(path: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    """Stream rows from an .xlsx workbook using openpyxl's read-only mode"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        # The first sheet, as pd.read_excel reads, whichever sheet was active when saved
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            yield pd.DataFrame()
+            return
+        columns = [str(col) if col is not None else f"Unnamed: {i}" for i, col in enumerate(header)]
+
+        chunk = []
+        for row in rows:
+            # pd.read_excel skips rows that are entirely blank
+            if all(value is None for value in row):
+                continue
+            chunk.append(row)
+            if len(chunk) >= chunksize:
+                yield pd.DataFrame(chunk, columns=columns)
+                chunk = []
+        yield pd.DataFrame(chunk, columns=columns)
+    finally:
+        workbook.close()
+
+
+def _iter_csv(path: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    """Stream rows from a CSV file"""
+    empty = True
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        empty = False
+        yield chunk
+    if empty:
+        yield pd.read_csv(path, nrows=0)
+
+
+def _iter_parquet(path: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    """Stream record batches from a Parquet file (requires pyarrow)"""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Reading Parquet contact lists requires pyarrow: pip install pyarrow")
+
+    parquet_file = pq.ParquetFile(path)
+    empty = True
+    for batch in parquet_file.iter_batches(batch_size=chunksize):
+        empty = False
+        yield batch.to_pandas()
+    if empty:
+        yield parquet_file.schema_arrow.empty_table().to_pandas()
+
+
+READERS = {
+    '.xlsx': _iter_excel,
+    '.xlsm': _iter_excel,
+    '.csv': _iter_csv,
+    '.parquet': _iter_parquet,
+}
+
+
+def iter_contact_frames(path: str, chunksize: Optional[int] = None) -> Iterator[pd.DataFrame]:
+    """
+    Stream a contact list as DataFrame chunks
+
+    At least one (possibly empty) frame is always yielded so callers can
+    validate the column structure of an empty file.
+
+    Args:
+        path: Path to an .xlsx, .csv or .parquet contact list
+        chunksize: Maximum rows per chunk
+
+    Returns:
+        Iterator[pd.DataFrame]: Chunks with the file's columns
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in READERS:
+        raise ValueError(f"Unsupported contact file type: {extension}")
+
+    logger.debug(f"Streaming contacts from {path}")
+    return READERS[extension](path, chunksize or DEFAULT_CHUNKSIZE)
@@ -0,0 +1,259 @@
+"""
+Recipient domain deliverability checks with concurrent DNS lookups cached in SQLite
+"""
+import logging
+import math
+import socket
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# A resolver maps a domain to True (accepts mail), False (definitely does
+# not) or None (could not tell, e.g. a timeout). Unknown results are never
+# cached and never drop a contact.
+Resolver = Callable[[str], Optional[bool]]
+
+# getaddrinfo errors that mean the name has no addresses, as opposed to a lookup failure
+_NO_SUCH_NAME = {socket.EAI_NONAME, getattr(socket, 'EAI_NODATA', socket.EAI_NONAME)}
+
+
+def _seconds(value: Union[float, timedelta]) -> float:
+    return value.total_seconds() if isinstance(value, timedelta) else float(value)
+
+
+class DNSResolver:
+    """
+    Default resolver: looks for MX records, falling back to A/AAAA records
+
+    MX lookups use dnspython when it is installed. Without it (or when a
+    domain has no MX records) a domain counts as deliverable if it has an
+    address, which is where senders deliver when there is no MX (RFC 5321
+    section 5.1). A null MX (RFC 7505) marks a domain that accepts no mail.
+    Both lookups give up after ``timeout`` seconds and report the domain as
+    unknown.
+    """
+
+    def __init__(self, timeout: float = 5.0):
+        """
+        Args:
+            timeout: Seconds allowed per lookup
+        """
+        self.timeout = timeout
+        try:
+            import dns.resolver
+            self._dns = dns
+        except ImportError:
+            logger.info("dnspython is not installed; checking recipient domains by address only")
+            self._dns = None
+
+    def __call__(self, domain: str) -> Optional[bool]:
+        if self._dns is None:
+            return self._has_address(domain)
+        try:
+            answers = self._dns.resolver.resolve(domain, 'MX', lifetime=self.timeout)
+        except self._dns.resolver.NXDOMAIN:
+            return False
+        except self._dns.resolver.NoAnswer:
+            return self._has_address(domain)
+        except self._dns.exception.DNSException as e:
+            logger.debug(f"MX lookup failed for {domain}: {e}")
+            return None
+        return {str(answer.exchange).rstrip('.') for answer in answers} != {''}
+
+    def _has_address(self, domain: str) -> Optional[bool]:
+        # getaddrinfo takes no timeout, so it runs in a daemon thread that is abandoned if it hangs
+        result = []
+
+        def lookup():
+            try:
+                socket.getaddrinfo(domain, None)
+                result.append(True)
+            except socket.gaierror as e:
+                if e.errno in _NO_SUCH_NAME:
+                    result.append(False)
+                else:
+                    logger.debug(f"Address lookup failed for {domain}: {e}")
+            except OSError as e:
+                logger.debug(f"Address lookup failed for {domain}: {e}")
+
+        thread = threading.Thread(target=lookup, name=f"getaddrinfo-{domain}", daemon=True)
+        thread.start()
+        thread.join(self.timeout)
+        if thread.is_alive():
+            logger.debug(f"Address lookup for {domain} timed out after {self.timeout}s")
+            return None
+        return result[0] if result else None
+
+
+class DomainChecker:
+    """
+    Checks whether recipient domains accept mail, once per domain
+
+    Unique domains are resolved concurrently and the answers are kept in
+    memory and in an SQLite cache. Deliverable domains are trusted for
+    ``ttl`` seconds and dead ones for ``dead_ttl`` seconds (shorter, so a
+    domain that comes back is picked up again). Lookups still running after
+    ``timeout`` seconds per round of workers count as unknown, so a hung
+    resolver cannot stall ingestion.
+    """
+
+    def __init__(self, resolver: Optional[Resolver] = None, cache_path: Optional[str] = None,
+                 ttl: float = 7 * 86400, dead_ttl: float = 86400, max_workers: int = 16,
+                 timeout: float = 5.0, clock: Callable[[], float] = time.time):
+        """
+        Open (and create if needed) the domain cache
+
+        Args:
+            resolver: Domain -> True/False/None lookup (defaults to ``DNSResolver``)
+            cache_path: SQLite file for cached answers (None keeps them in memory only)
+            ttl: Seconds a deliverable answer stays valid
+            dead_ttl: Seconds an undeliverable answer stays valid
+            max_workers: Concurrent lookups
+            timeout: Seconds allowed per lookup before the domain counts as unknown
+            clock: Time source, for tests
+        """
+        self.resolver = resolver or DNSResolver(timeout)
+        self.ttl = ttl
+        self.dead_ttl = dead_ttl
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(cache_path or ':memory:', check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS domain_status "
+            "(domain TEXT PRIMARY KEY, deliverable INTEGER NOT NULL, checked_at REAL NOT NULL)"
+        )
+        self._conn.execute("DELETE FROM domain_status WHERE checked_at < ?", (clock() - max(ttl, dead_ttl),))
+        self._known = {
+            domain: (bool(deliverable), checked_at)
+            for domain, deliverable, checked_at in self._conn.execute(
+                "SELECT domain, deliverable, checked_at FROM domain_status")
+        }
+        self.stats = {'cached': 0, 'resolved': 0, 'unknown': 0, 'dead': 0, 'dropped': 0}
+
+    @classmethod
+    def from_settings(cls, settings: Dict, cache_path: Optional[str] = None,
+                      resolver: Optional[Resolver] = None) -> 'DomainChecker':
+        """Build a checker from ``DOMAIN_CHECK_SETTINGS``"""
+        return cls(
+            resolver=resolver or DNSResolver(settings.get('timeout', 5.0)),
+            cache_path=cache_path,
+            ttl=_seconds(settings.get('ttl', timedelta(days=7))),
+            dead_ttl=_seconds(settings.get('dead_ttl', timedelta(days=1))),
+            max_workers=settings.get('max_workers', 16),
+            timeout=settings.get('timeout', 5.0),
+        )
+
+    def _cached(self, domain: str, now: float) -> Optional[bool]:
+        entry = self._known.get(domain)
+        if entry is None:
+            return None
+        deliverable, checked_at = entry
+        if now - checked_at > (self.ttl if deliverable else self.dead_ttl):
+            return None
+        return deliverable
+
+    def _resolve(self, domain: str) -> Optional[bool]:
+        try:
+            return self.resolver(domain)
+        except Exception as e:
+            logger.warning(f"Domain lookup failed for {domain}: {e}")
+            return None
+
+    def check_many(self, domains: Iterable[str]) -> Dict[str, Optional[bool]]:
+        """
+        Look up every distinct domain, resolving the ones not in the cache concurrently
+
+        Args:
+            domains: Domain names (lowercase)
+
+        Returns:
+            Dict[str, Optional[bool]]: Domain -> deliverable, or None when unknown
+        """
+        now = self.clock()
+        results = {}
+        missing = []
+        for domain in set(domains):
+            cached = self._cached(domain, now)
+            if cached is None:
+                missing.append(domain)
+            else:
+                results[domain] = cached
+        self.stats['cached'] += len(results)
+
+        if missing:
+            answers = self._resolve_all(missing)
+            known = [(domain, answer) for domain, answer in zip(missing, answers) if answer is not None]
+            self._store(known, now)
+            results.update(zip(missing, answers))
+            self.stats['resolved'] += len(missing)
+            self.stats['unknown'] += len(missing) - len(known)
+            self.stats['dead'] += sum(1 for _, answer in known if not answer)
+        return results
+
+    def _resolve_all(self, domains: List[str]) -> List[Optional[bool]]:
+        """Resolve concurrently; lookups unfinished by the deadline are unknown and left behind"""
+        workers = max(1, min(self.max_workers, len(domains)))
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='dns')
+        try:
+            futures = [pool.submit(self._resolve, domain) for domain in domains]
+            wait(futures, timeout=self.timeout * math.ceil(len(domains) / workers))
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+        answers = [future.result() if future.done() and not future.cancelled() else None for future in futures]
+        timed_out = sum(1 for future in futures if not future.done() or future.cancelled())
+        if timed_out:
+            logger.warning(f"{timed_out} domain lookups timed out; their contacts are kept")
+        return answers
+
+    def check(self, domain: str) -> Optional[bool]:
+        """Whether one domain accepts mail (None when unknown)"""
+        return self.check_many([domain])[domain]
+
+    def _store(self, answers, now: float):
+        if not answers:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO domain_status (domain, deliverable, checked_at) VALUES (?, ?, ?)",
+                ((domain, int(answer), now) for domain, answer in answers)
+            )
+            self._conn.execute("COMMIT")
+        for domain, answer in answers:
+            self._known[domain] = (answer, now)
+
+    def deliverable_mask(self, emails: pd.Series) -> pd.Series:
+        """
+        Flag addresses whose domain is not known to be dead
+
+        Args:
+            emails: Series of (already format-validated) email addresses
+
+        Returns:
+            pd.Series: Boolean mask, False for addresses on undeliverable domains
+        """
+        domains = emails.str.rsplit('@', n=1).str[-1].str.strip().str.lower()
+        statuses = self.check_many(domains.unique())
+        dead = {domain for domain, deliverable in statuses.items() if deliverable is False}
+        mask = ~domains.isin(dead)
+        self.stats['dropped'] += int((~mask).sum())
+        return mask
+
+    def summary(self) -> Dict[str, int]:
+        """Cache hits, lookups, unknown and dead domains, and dropped addresses so far"""
+        return dict(self.stats)
+
+    def close(self):
+        """Close the cache database"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,157 @@
+"""
+Per-contact row fingerprints that make contact re-ingestion incremental
+"""
+import logging
+import sqlite3
+import threading
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class ContactFingerprints:
+    """
+    Remembers one fingerprint per contact so re-ingestion only handles changes
+
+    Each row is identified by a hash of its normalized email address and
+    fingerprinted by a hash of its normalized email, name and role. Both
+    are 64-bit values stored in SQLite next to the contact file. Comparing
+    a new pass over the file against them tells which contacts were added,
+    changed or removed since the last committed pass.
+
+    Only the scheduling work is incremental: every pass still reads,
+    validates and hashes the whole contact file (the contact cache skips
+    the parse when the file is unchanged).
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Open (and create if needed) the fingerprint database
+
+        Args:
+            db_path: SQLite file path, or ':memory:'
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS contact_fingerprints "
+            "(email_key INTEGER PRIMARY KEY, row_hash INTEGER NOT NULL)"
+        )
+        self._known = self._load()
+        self.reset_pass()
+
+    def _load(self) -> pd.Series:
+        with self._lock:
+            rows = self._conn.execute("SELECT email_key, row_hash FROM contact_fingerprints").fetchall()
+        keys = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        hashes = np.fromiter((row[1] for row in rows), dtype=np.int64, count=len(rows))
+        return pd.Series(hashes, index=keys)
+
+    def __len__(self) -> int:
+        return len(self._known)
+
+    @staticmethod
+    def email_keys(emails: pd.Series) -> np.ndarray:
+        """Hash email addresses to the keys ``fingerprint`` identifies contacts by"""
+        emails = emails.str.strip().str.lower()
+        return pd.util.hash_pandas_object(emails, index=False).to_numpy().view(np.int64)
+
+    @staticmethod
+    def fingerprint(emails: pd.Series, names: pd.Series, roles: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Hash contact rows
+
+        Args:
+            emails: Email column as strings
+            names: Name column as strings
+            roles: Role column as strings
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Email keys and row fingerprints (int64)
+        """
+        emails = emails.str.strip().str.lower()
+        rows = pd.DataFrame({'email': emails, 'name': names.str.strip(), 'role': roles.str.strip()})
+        keys = ContactFingerprints.email_keys(emails)
+        hashes = pd.util.hash_pandas_object(rows, index=False).to_numpy().view(np.int64)
+        return keys, hashes
+
+    def reset_pass(self):
+        """Forget changes seen since the last commit and start a new pass over the file"""
+        self._seen = []
+        self._pending = []
+        self.stats = {'new': 0, 'changed': 0, 'unchanged': 0}
+
+    def diff(self, keys: np.ndarray, hashes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Compare a chunk of rows with the committed fingerprints
+
+        New and changed rows are staged for the next ``commit``.
+
+        Args:
+            keys: Email keys from ``fingerprint``
+            hashes: Row fingerprints from ``fingerprint``
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Boolean masks of rows whose contact is new and changed
+        """
+        # Look up positions rather than reindexing, which would round the hashes through float64
+        positions = self._known.index.get_indexer(keys)
+        new = positions < 0
+        changed = np.zeros(len(keys), dtype=bool)
+        changed[~new] = self._known.to_numpy()[positions[~new]] != hashes[~new]
+
+        self._seen.append(keys)
+        self._pending.append((keys[new | changed], hashes[new | changed]))
+        self.stats['new'] += int(new.sum())
+        self.stats['changed'] += int(changed.sum())
+        self.stats['unchanged'] += int(len(keys) - new.sum() - changed.sum())
+        return new, changed
+
+    def removed_keys(self) -> np.ndarray:
+        """Committed email keys not seen during the current pass"""
+        seen = np.concatenate(self._seen) if self._seen else np.empty(0, dtype=np.int64)
+        return self._known.index.difference(seen).to_numpy()
+
+    def summary(self) -> Dict[str, int]:
+        """Counts of new, changed, unchanged and removed contacts in the current pass"""
+        return dict(self.stats, removed=len(self.removed_keys()))
+
+    def commit(self):
+        """Record the current pass as the baseline for the next one"""
+        removed = self.removed_keys()
+        if self._pending:
+            keys = np.concatenate([k for k, _ in self._pending])
+            hashes = np.concatenate([h for _, h in self._pending])
+        else:
+            keys = hashes = np.empty(0, dtype=np.int64)
+
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO contact_fingerprints (email_key, row_hash) VALUES (?, ?)",
+                zip(keys.tolist(), hashes.tolist())
+            )
+            self._conn.executemany(
+                "DELETE FROM contact_fingerprints WHERE email_key = ?",
+                ((key,) for key in removed.tolist())
+            )
+            self._conn.execute("COMMIT")
+
+        updates = pd.Series(hashes, index=keys)
+        updates = updates[~updates.index.duplicated(keep='last')]
+        known = self._known.drop(removed)
+        known = known[~known.index.isin(updates.index)]
+        self._known = pd.concat([known, updates])
+        logger.info(f"Committed contact fingerprints: {len(keys)} added or changed, {len(removed)} removed")
+        self.reset_pass()
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
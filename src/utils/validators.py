@@ -33,16 +33,35 @@ class EmailValidator:
         
         # Check for social media URLs
         if any(domain in email for domain in cls.SOCIAL_DOMAINS):
-            logger.debug(f"Rejected social media URL: {email}")
+            # Lazy %-formatting: most of these are dropped by the debug sampler
+            logger.debug("Rejected social media URL: %s", email)
             return False
             
         # Validate email format
         if not cls.EMAIL_PATTERN.match(email):
-            logger.debug(f"Invalid email format: {email}")
+            logger.debug("Invalid email format: %s", email)
             return False
             
         return True
         
+    @classmethod
+    def valid_email_mask(cls, emails):
+        """
+        Vectorized ``is_valid_email`` over a pandas Series of strings
+        
+        Args:
+            emails: Series of email addresses (missing values already converted to str)
+            
+        Returns:
+            pd.Series: Boolean mask of valid addresses
+        """
+        emails = emails.str.lower().str.strip()
+        
+        is_social = emails.str.contains(
+            '|'.join(re.escape(domain) for domain in cls.SOCIAL_DOMAINS), regex=True, na=False
+        )
+        return emails.str.match(cls.EMAIL_PATTERN.pattern, na=False) & ~is_social
+        
     @staticmethod
     def normalize_name(name: Optional[str]) -> str:
         """
@@ -63,6 +82,19 @@ class EmailValidator:
         # Capitalize first letter of each word
         return name.title()
         
+    @staticmethod
+    def normalize_names(names):
+        """
+        Vectorized ``normalize_name`` over a pandas Series of strings
+        
+        Args:
+            names: Series of names
+            
+        Returns:
+            pd.Series: Normalized names
+        """
+        return names.str.split().str.join(" ").str.title()
+        
 class DataValidator:
     """Utility class for validating input data"""
     
@@ -77,11 +109,7 @@ class DataValidator:
         Returns:
             bool: True if structure is valid
         """
-        required_columns = {'Role','Name', 'Email'}
-        
-        # Check for required columns
-        if not all(col in df.columns for col in required_columns):
-            logger.error("Missing required columns in Excel file")
+        if not DataValidator.validate_columns(df):
             return False
             
         # Check for empty DataFrame
@@ -91,6 +119,24 @@ class DataValidator:
             
         return True
         
+    @staticmethod
+    def validate_columns(df) -> bool:
+        """
+        Check that a DataFrame (or chunk of one) has the required columns
+        
+        Args:
+            df: Pandas DataFrame to validate
+            
+        Returns:
+            bool: True if all required columns are present
+        """
+        required_columns = {'Role','Name', 'Email'}
+        
+        if not all(col in df.columns for col in required_columns):
+            logger.error("Missing required columns in Excel file")
+            return False
+        return True
+        
     @staticmethod
     def validate_batch_size(size: Union[int, str]) -> int:
         """
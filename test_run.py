@@ -4,6 +4,7 @@ Test run script for email automation
 import os
 from dotenv import load_dotenv
 from src.email_automation import EmailAutomation
+from config.settings import PATH_SETTINGS
 import logging
 
 def setup_test():
@@ -50,7 +51,8 @@ def run_test():
         automation = EmailAutomation(
             excel_path='data/contacts.xlsx',
             sender_email=email,
-            sender_password=password
+            sender_password=password,
+            contact_cache_dir=PATH_SETTINGS['contact_cache_dir']  # The second parse below is a cache read
         )
         
         # Test SMTP connection first
@@ -5,8 +5,7 @@ import os
 from dotenv import load_dotenv
 from src.email_automation import EmailAutomation
 import logging
-from datetime import datetime, timedelta
-import time
+from datetime import datetime
 
 def setup_test():
     load_dotenv()
@@ -57,28 +56,12 @@ def run_small_test():
         print("\nWaiting to send scheduled emails...")
         print("Press Ctrl+C to stop the program")
         
-        # Run the scheduling loop
-        while True:
-            current_time = datetime.now()
-            for email in automation.scheduled_emails[:]:
-                if current_time >= email['send_time']:
-                    try:
-                        automation._send_email(
-                            recipient_email=email['recipient_email'],
-                            recipient_name=email['recipient_name'],
-                            company=email['company'],
-                            is_reminder=email['is_reminder'],
-                            batch_num=email['batch_num']
-                        )
-                        automation.scheduled_emails.remove(email)
-                        print(f"Sent email to {email['recipient_email']}")
-                    except Exception as e:
-                        logging.error(f"Failed to send scheduled email: {e}")
-            
-            time.sleep(30)  # Check every 30 seconds
+        # Send each email as soon as it falls due
+        automation.run_scheduler()
             
     except KeyboardInterrupt:
         print("\nStopping the scheduler...")
+        automation.scheduler.close()
     except Exception as e:
         logging.error(f"Test run failed: {e}")
         raise
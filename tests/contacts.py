@@ -0,0 +1,43 @@
+"""
+Synthetic contact sheets shared by the tests and the benchmarks
+"""
+import random
+
+import pandas as pd
+
+DOMAINS = [
+    'amazon.com', 'a2z.com', 'meta.com', 'fb.com', 'google.com', 'gmail.com',
+    'apple.com', 'icloud.com', 'example.com', 'unknown.org', 'linkedin.com',
+]
+FIRST_NAMES = ['john', 'JANE', '  bob ', 'alice', 'charlie', 'eve', 'mallory  smith', 'trent']
+ROLES = ['Data Science Manager', 'ML Lead', 'AI Manager', 'Research Lead', 'Director']
+
+
+def synthetic_contacts(rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Build a contact sheet resembling ``data/contacts.xlsx``
+
+    Mixes valid company addresses with unknown domains, social links,
+    malformed addresses and missing values.
+
+    Args:
+        rows: Number of rows to generate
+        seed: Random seed for reproducibility
+
+    Returns:
+        pd.DataFrame: Frame with Role, Name and Email columns
+    """
+    rng = random.Random(seed)
+    emails, names, roles = [], [], []
+    for i in range(rows):
+        roll = rng.random()
+        if roll < 0.02:
+            email = None
+        elif roll < 0.05:
+            email = f"not-an-email-{i}"
+        else:
+            email = f"{'  ' if roll < 0.08 else ''}User.{i}@{rng.choice(DOMAINS).upper() if roll < 0.1 else rng.choice(DOMAINS)}"
+        emails.append(email)
+        names.append(rng.choice(FIRST_NAMES) if roll > 0.01 else None)
+        roles.append(rng.choice(ROLES))
+    return pd.DataFrame({'Role': roles, 'Name': names, 'Email': emails})
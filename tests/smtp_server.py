@@ -0,0 +1,191 @@
+"""
+Minimal in-process SMTP server used as a local stand-in for tests
+"""
+import base64
+import socketserver
+import threading
+from collections import defaultdict
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Speaks just enough SMTP for smtplib: EHLO, AUTH, MAIL, RCPT, DATA, RSET, NOOP, QUIT"""
+
+    def reply(self, line: str):
+        try:
+            self.wfile.write((line + "\r\n").encode('ascii'))
+        except OSError:
+            pass
+
+    def readline(self) -> str:
+        return self.rfile.readline().decode('utf-8', 'replace').rstrip("\r\n")
+
+    def handle(self):
+        server = self.server.owner
+        server._register(self)
+        self.reply("220 localhost SMTP stand-in ready")
+        mail_from, rcpts = None, []
+
+        while True:
+            try:
+                raw = self.rfile.readline()
+            except OSError:
+                break
+            if not raw:
+                break
+            line = raw.decode('utf-8', 'replace').rstrip("\r\n")
+            verb = line.split(' ', 1)[0].upper()
+            arg = line[len(verb):].strip()
+            server.commands[verb] += 1
+
+            if verb in ('EHLO', 'HELO'):
+                self.reply("250-localhost")
+                self.reply("250-AUTH PLAIN LOGIN")
+                self.reply("250 OK")
+            elif verb == 'AUTH':
+                self._auth(arg)
+            elif verb == 'MAIL':
+                mail_from, rcpts = arg.split(':', 1)[1].strip().strip('<>'), []
+                self.reply("250 OK")
+            elif verb == 'RCPT':
+                rcpt = arg.split(':', 1)[1].strip().strip('<>')
+                code = server.rcpt_responses.get(rcpt)
+                if code:
+                    self.reply(code)
+                else:
+                    rcpts.append(rcpt)
+                    self.reply("250 OK")
+            elif verb == 'DATA':
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    data_line = self.rfile.readline()
+                    if data_line in (b".\r\n", b".\n", b""):
+                        break
+                    lines.append(data_line)
+                server.messages.append((mail_from, list(rcpts), b"".join(lines)))
+                if server.drop_after_data:
+                    break  # Accepted, but the session is lost before the reply
+                self.reply("250 OK queued")
+            elif verb == 'RSET':
+                mail_from, rcpts = None, []
+                self.reply("250 OK")
+            elif verb == 'NOOP':
+                self.reply("250 OK")
+            elif verb == 'QUIT':
+                self.reply("221 Bye")
+                break
+            else:
+                self.reply("502 Command not implemented")
+        server._unregister(self)
+
+    def _auth(self, arg: str):
+        server = self.server.owner
+        mechanism, _, initial = arg.partition(' ')
+        if mechanism.upper() == 'PLAIN':
+            if not initial:
+                self.reply("334 ")
+                initial = self.readline()
+            parts = base64.b64decode(initial).split(b"\0")
+            user, password = parts[1].decode(), parts[2].decode()
+        elif mechanism.upper() == 'LOGIN':
+            if initial:
+                user = base64.b64decode(initial).decode()
+            else:
+                self.reply("334 VXNlcm5hbWU6")
+                user = base64.b64decode(self.readline()).decode()
+            self.reply("334 UGFzc3dvcmQ6")
+            password = base64.b64decode(self.readline()).decode()
+        else:
+            self.reply("504 Unrecognized authentication type")
+            return
+
+        if server.password is not None and password != server.password:
+            self.reply("535 Authentication credentials invalid")
+            return
+        server.logins.append(user)
+        self.reply("235 Authentication successful")
+
+
+class _ThreadingTCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class LocalSMTPServer:
+    """
+    Threaded SMTP sink bound to localhost on an ephemeral port
+
+    Records accepted messages, logins and per-verb command counts so tests
+    can assert on session reuse. Usable as a context manager.
+    """
+
+    def __init__(self, password=None):
+        self.password = password
+        self.messages = []
+        self.logins = []
+        self.commands = defaultdict(int)
+        self.rcpt_responses = {}
+        self.drop_after_data = False
+        self.connections = 0
+        self._handlers = set()
+        self._lock = threading.Lock()
+        self._server = _ThreadingTCPServer(('127.0.0.1', 0), _SMTPHandler)
+        self._server.owner = self
+        self._thread = None
+
+    @property
+    def host(self) -> str:
+        return self._server.server_address[0]
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def _register(self, handler):
+        with self._lock:
+            self.connections += 1
+            self._handlers.add(handler)
+
+    def _unregister(self, handler):
+        with self._lock:
+            self._handlers.discard(handler)
+
+    def drop_connections(self):
+        """Forcefully close every open client session"""
+        with self._lock:
+            handlers = list(self._handlers)
+        for handler in handlers:
+            try:
+                handler.connection.shutdown(2)
+            except OSError:
+                pass
+            handler.connection.close()
+
+    def start(self) -> 'LocalSMTPServer':
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        kwargs={"poll_interval": 0.05}, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.drop_connections()
+        self._server.shutdown()
+        self._server.server_close()
+
+    def provider(self, **overrides) -> dict:
+        """Build an ``EMAIL_PROVIDERS``-style entry pointing at this server"""
+        settings = {
+            'smtp_server': self.host,
+            'smtp_port': self.port,
+            'daily_limit': 500,
+            'batch_limit': 100,
+            'use_tls': False,
+        }
+        settings.update(overrides)
+        return settings
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
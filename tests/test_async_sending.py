@@ -0,0 +1,111 @@
+"""
+Tests for the asyncio sending engine
+"""
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from src.email_automation import EmailAutomation
+from src.rate_limiter import RateLimiter
+from tests.smtp_server import LocalSMTPServer
+
+
+class TestAsyncSending(unittest.TestCase):
+    def setUp(self):
+        self.server = LocalSMTPServer().start()
+        self.addCleanup(self.server.stop)
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.resume_path = os.path.join(tmp.name, 'resume.pdf')
+        with open(self.resume_path, 'wb') as f:
+            f.write(b"%PDF-1.4 test resume")
+        self.tmp = tmp.name
+        self.make_automation()
+
+    def make_automation(self, **kwargs):
+        self.automation = EmailAutomation(
+            excel_path="tests/test_data/test_contacts.xlsx",
+            sender_email="test@example.com",
+            sender_password="test_password",
+            **kwargs
+        )
+        self.automation.resume_path = self.resume_path
+        self.account = self.automation.dispatcher.accounts[0]
+        self.account.provider = self.server.provider(pool_size=4)
+        self.account.rate_limiter = RateLimiter({})
+        self.addCleanup(self.automation.close)
+
+    def schedule(self, recipients, send_time=None):
+        for i, email in enumerate(recipients):
+            self.automation._enqueue_email({
+                'recipient_email': email,
+                'recipient_name': f"Contact {i}",
+                'company': 'amazon',
+                'is_reminder': False,
+                'batch_num': 1,
+                'send_time': send_time or datetime.now() - timedelta(minutes=1)
+            })
+
+    def test_sends_due_emails_concurrently(self):
+        """All due emails are delivered and removed from the schedule"""
+        self.schedule([f"user{i}@amazon.com" for i in range(12)])
+        self.schedule(["later@amazon.com"], send_time=datetime.now() + timedelta(days=1))
+
+        sent = self.automation.send_scheduled(max_in_flight=4)
+
+        self.assertEqual(sent, 12)
+        self.assertEqual(len(self.server.messages), 12)
+        self.assertLessEqual(self.server.connections, 4)
+        self.assertEqual(len(self.automation.scheduled_emails), 1)
+
+    def test_skips_duplicate_recipients(self):
+        """A recipient is only emailed once even when scheduled twice"""
+        self.schedule(["dup@amazon.com", "dup@amazon.com", "other@amazon.com"])
+
+        sent = self.automation.send_scheduled()
+
+        self.assertEqual(sent, 2)
+        self.assertEqual(len(self.server.messages), 2)
+
+    def test_sent_index_is_written_once_per_batch(self):
+        """Sent messages are recorded in one transaction, and a finished send still blocks its duplicate"""
+        calls = []
+        add_many = self.automation.sent_index.add_many
+        self.automation.sent_index.add_many = lambda entries: calls.append(list(entries)) or add_many(calls[-1])
+        self.schedule(["dup@amazon.com", "user1@amazon.com", "user2@amazon.com", "dup@amazon.com"])
+
+        sent = self.automation.send_scheduled(max_in_flight=1)
+
+        self.assertEqual(sent, 3)
+        self.assertEqual(len(self.server.messages), 3)
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(self.automation.sent_index.contains('dup@amazon.com', self.automation.campaign, 'initial'))
+
+    def test_duplicate_rows_are_settled_in_the_store(self):
+        """Skipped duplicates are not left pending, so the campaign can finish"""
+        self.make_automation(schedule_db=os.path.join(self.tmp, 'schedule.db'))
+        self.schedule(["dup@amazon.com", "dup@amazon.com", "other@amazon.com"])
+
+        self.assertEqual(self.automation.send_scheduled(), 2)
+
+        store = self.automation.schedule_store
+        self.assertEqual((store.count('pending'), store.count('sent'), store.count('skipped')), (0, 2, 1))
+        self.assertEqual(len(self.automation.scheduled_emails), 0)
+        self.assertEqual(self.automation.resume_schedule(), 0)
+
+    def test_honors_daily_limit(self):
+        """No more than the remaining daily allowance is sent"""
+        self.account.rate_limiter = RateLimiter({'day': (3, 86400.0)})
+        self.schedule([f"user{i}@amazon.com" for i in range(10)])
+
+        sent = self.automation.send_scheduled(max_in_flight=8)
+
+        self.assertEqual(sent, 3)
+        self.assertEqual(len(self.server.messages), 3)
+        self.assertEqual(len(self.automation.scheduler), 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+Tests for the attachment cache
+"""
+import os
+import tempfile
+import unittest
+from email.mime.application import MIMEApplication
+from unittest import mock
+
+from src.attachments import AttachmentCache
+
+
+class TestAttachmentCache(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, 'resume.pdf')
+        self.write(b"%PDF-1.4 " + bytes(range(256)) * 20)
+
+    def write(self, data: bytes):
+        with open(self.path, 'wb') as f:
+            f.write(data)
+
+    def test_matches_mime_application_output(self):
+        """The cached part serializes exactly like a freshly built MIMEApplication"""
+        with open(self.path, 'rb') as f:
+            expected = MIMEApplication(f.read(), _subtype='pdf')
+        expected.add_header('Content-Disposition', 'attachment', filename='Resume.pdf')
+
+        part = AttachmentCache().get(self.path, filename='Resume.pdf')
+
+        self.assertEqual(part.as_bytes(), expected.as_bytes())
+
+    def test_encodes_file_once(self):
+        """Repeated lookups reuse the encoding instead of rereading the file"""
+        cache = AttachmentCache()
+        cache.get(self.path, filename='Resume.pdf')
+        with mock.patch('builtins.open', side_effect=AssertionError("file reread")):
+            for _ in range(3):
+                cache.get(self.path, filename='Resume.pdf')
+
+    def test_reencodes_when_file_changes(self):
+        cache = AttachmentCache()
+        before = cache.get(self.path, filename='Resume.pdf').get_payload(decode=True)
+
+        self.write(b"%PDF-1.4 updated resume")
+        after = cache.get(self.path, filename='Resume.pdf').get_payload(decode=True)
+
+        self.assertNotEqual(before, after)
+        self.assertEqual(after, b"%PDF-1.4 updated resume")
+
+    def test_variants_are_cached_separately(self):
+        other = self.path.replace('resume.pdf', 'resume_amazon.pdf')
+        with open(other, 'wb') as f:
+            f.write(b"amazon variant")
+
+        cache = AttachmentCache()
+        default = cache.get(self.path, filename='Resume.pdf')
+        variant = cache.get(other, filename='Resume_Amazon.pdf')
+
+        self.assertEqual(variant.get_payload(decode=True), b"amazon variant")
+        self.assertNotEqual(default.get_payload(decode=True), variant.get_payload(decode=True))
+        self.assertEqual(variant.get_filename(), 'Resume_Amazon.pdf')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,6 +4,7 @@ Test suite for email automation
 import unittest
 import pandas as pd
 import os
+import tempfile
 from datetime import datetime
 from src.email_automation import EmailAutomation
 from src.utils.validators import EmailValidator
@@ -13,18 +14,25 @@ class TestEmailAutomation(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
         """Set up test environment"""
-        # Create test data
-        cls.create_test_excel()
+        # Create test data in a scratch directory so the run leaves the tree untouched
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.excel_path = os.path.join(cls.tmp.name, 'test_contacts.xlsx')
+        cls.create_test_excel(cls.excel_path)
         
         # Initialize automation
         cls.automation = EmailAutomation(
-            excel_path="tests/test_data/test_contacts.xlsx",
+            excel_path=cls.excel_path,
             sender_email="test@example.com",
             sender_password="test_password"
         )
     
     @classmethod
-    def create_test_excel(cls):
+    def tearDownClass(cls):
+        cls.automation.close()
+        cls.tmp.cleanup()
+    
+    @staticmethod
+    def create_test_excel(path: str):
         """Create test Excel file"""
         test_data = {
             'Role': [
@@ -53,8 +61,7 @@ class TestEmailAutomation(unittest.TestCase):
         }
         
         df = pd.DataFrame(test_data)
-        os.makedirs('tests/test_data', exist_ok=True)
-        df.to_excel("tests/test_data/test_contacts.xlsx", index=False)
+        df.to_excel(path, index=False)
     
     def test_excel_processing(self):
         """Test Excel file processing"""
@@ -0,0 +1,72 @@
+"""
+Tests for round-robin batch creation
+"""
+import unittest
+from unittest.mock import patch
+
+from src.email_automation import EmailAutomation
+
+
+def contacts(company, count):
+    return [(f"Name {i}", f"user{i}@{company}.com", "Manager") for i in range(count)]
+
+
+class TestCreateBatches(unittest.TestCase):
+    def setUp(self):
+        self.automation = EmailAutomation(excel_path='', sender_email='test@example.com', sender_password='')
+        self.addCleanup(self.automation.close)
+        self.automation.batch_size = 4
+        self.automation.company_quota = 2
+        self.quotas = {}
+        quota_patch = patch.object(self.automation.company_matcher, 'get_company_quota',
+                                   side_effect=lambda company, default: self.quotas.get(company, default))
+        quota_patch.start()
+        self.addCleanup(quota_patch.stop)
+
+    def test_every_contact_is_assigned_once(self):
+        """Uneven companies do not cut batching short"""
+        company_contacts = {'amazon': contacts('amazon', 7), 'meta': contacts('meta', 1), 'google': contacts('google', 3)}
+
+        batches = list(self.automation.create_batches(company_contacts))
+
+        assigned = [c for batch in batches for group in batch.values() for c in group]
+        expected = [c for group in company_contacts.values() for c in group]
+        self.assertEqual(sorted(assigned), sorted(expected))
+        for batch in batches:
+            self.assertLessEqual(sum(len(group) for group in batch.values()), 4)
+            for company, group in batch.items():
+                self.assertLessEqual(len(group), 2)
+
+    def test_round_robin_mixes_companies(self):
+        """Each batch draws from every company that still has contacts"""
+        company_contacts = {'amazon': contacts('amazon', 4), 'meta': contacts('meta', 4)}
+
+        batches = list(self.automation.create_batches(company_contacts))
+
+        self.assertEqual(len(batches), 2)
+        for batch in batches:
+            self.assertEqual({c: len(g) for c, g in batch.items()}, {'amazon': 2, 'meta': 2})
+        self.assertEqual(batches[0]['amazon'], company_contacts['amazon'][:2])
+        self.assertEqual(batches[1]['amazon'], company_contacts['amazon'][2:])
+
+    def test_per_company_quotas(self):
+        """Company-specific quotas from the matcher cap each company's share"""
+        self.quotas = {'amazon': 3, 'meta': 1}
+        batches = list(self.automation.create_batches(
+            {'amazon': contacts('amazon', 6), 'meta': contacts('meta', 2)}))
+
+        self.assertEqual([{c: len(g) for c, g in b.items()} for b in batches],
+                         [{'amazon': 3, 'meta': 1}, {'amazon': 3, 'meta': 1}])
+
+    def test_batches_are_lazy(self):
+        """Batches are produced on demand"""
+        batches = self.automation.create_batches({'amazon': contacts('amazon', 100)})
+        self.assertEqual(len(next(batches)['amazon']), 2)
+
+    def test_empty_input(self):
+        """No contacts means no batches"""
+        self.assertEqual(list(self.automation.create_batches({'amazon': []})), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
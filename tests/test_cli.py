@@ -0,0 +1,135 @@
+"""
+Tests for the command line interface
+"""
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from tests.contacts import synthetic_contacts
+from config.settings import PATH_SETTINGS
+from src import cli
+from src.schedule_store import ScheduleStore
+from src.scheduler import ScheduledEmail
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestCLI(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+        paths = {
+            'schedule_db': os.path.join(tmp.name, 'schedule.db'),
+            'sent_index': os.path.join(tmp.name, 'sent_index.db'),
+            'rate_limit_dir': os.path.join(tmp.name, 'rate_limits'),
+            'contact_fingerprints': os.path.join(tmp.name, 'fingerprints.db'),
+            'contact_cache_dir': os.path.join(tmp.name, 'cache'),
+            'dry_run_dir': os.path.join(tmp.name, 'dry_run'),
+            'data_dir': tmp.name,
+            'metrics_prom': os.path.join(tmp.name, 'metrics.prom'),
+            'metrics_json': os.path.join(tmp.name, 'metrics.json'),
+        }
+        patcher = mock.patch.dict(PATH_SETTINGS, paths)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_cli(self, *argv) -> str:
+        """Run a subcommand (without reconfiguring logging) and return what it printed"""
+        args = cli.build_parser().parse_args(list(argv))
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            self.assertEqual(args.func(args), 0)
+        return out.getvalue()
+
+    def test_status_without_schedule(self):
+        self.assertIn("No schedule", self.run_cli('status'))
+        self.assertFalse(os.path.exists(PATH_SETTINGS['schedule_db']))
+
+    def test_status_json(self):
+        """Counts and the next send time come straight from the schedule store"""
+        due = datetime.now() + timedelta(hours=1)
+        store = ScheduleStore(PATH_SETTINGS['schedule_db'])
+        records = store.add_many([
+            ScheduledEmail(f"user{i}@amazon.com", "Contact", 'amazon', False, 1, due.timestamp() + i)
+            for i in range(3)
+        ])
+        store.mark_sent([records[0].id])
+        store.close()
+
+        status = json.loads(self.run_cli('status', '--json'))
+        self.assertEqual(status['counts'], {'pending': 2, 'claimed': 0, 'sent': 1, 'failed': 0, 'skipped': 0})
+        self.assertEqual(datetime.fromisoformat(status['next_send_time']).timestamp(), due.timestamp() + 1)
+
+        export_path = os.path.join(self.tmp, 'pending.jsonl')
+        status = json.loads(self.run_cli('status', '--json', '--by', 'company', '--rows', '1', '--offset', '1',
+                                         '--export', export_path))
+        self.assertEqual(status['pending_by_company'], {'amazon': 2})
+        self.assertEqual([row['recipient'] for row in status['rows']], ['user2@amazon.com'])
+        with open(export_path) as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+    def test_export_rejects_unknown_formats_before_writing(self):
+        ScheduleStore(PATH_SETTINGS['schedule_db']).close()
+        export_path = os.path.join(self.tmp, 'pending.txt')
+        with open(export_path, 'w') as f:
+            f.write("keep me")
+
+        args = cli.build_parser().parse_args(['status', '--export', export_path])
+        with contextlib.redirect_stderr(io.StringIO()), contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(args.func(args), 2)
+        with open(export_path) as f:
+            self.assertEqual(f.read(), "keep me")
+
+    def test_ingest_then_schedule(self):
+        """ingest reports contacts without consuming them; schedule then stores them"""
+        contacts_path = os.path.join(self.tmp, 'contacts.csv')
+        synthetic_contacts(60, seed=2).to_csv(contacts_path, index=False)
+
+        ingested = self.run_cli('--contacts', contacts_path, 'ingest')
+        total = int(ingested.split('total: ')[1].split()[0])
+        self.assertGreater(total, 0)
+
+        self.run_cli('--contacts', contacts_path, 'schedule')
+        store = ScheduleStore(PATH_SETTINGS['schedule_db'])
+        self.addCleanup(store.close)
+        initial = [email for email in store.iter_pending() if not email.is_reminder]
+        self.assertEqual(len(initial), total)
+
+    def test_dry_run_keeps_live_state_untouched(self):
+        """--transport memory sends the whole campaign against the dry-run stores only"""
+        contacts_path = os.path.join(self.tmp, 'contacts.csv')
+        synthetic_contacts(30, seed=3).to_csv(contacts_path, index=False)
+        with open(os.path.join(self.tmp, 'resume.pdf'), 'wb') as f:
+            f.write(b"%PDF-1.4 test resume")
+        with mock.patch.dict(os.environ, {'SENDER_EMAIL': 'me@example.com', 'SENDER_PASSWORD': ''}):
+            with self.assertLogs('email_automation', 'INFO') as logs:
+                self.run_cli('--contacts', contacts_path, '--transport', 'memory')
+
+        sent = int(logs.records[-1].getMessage().split('(')[1].split()[0])
+        self.assertGreater(sent, 30)  # Initial emails and their reminders
+        for key in ('schedule_db', 'sent_index', 'contact_fingerprints'):
+            self.assertFalse(os.path.exists(PATH_SETTINGS[key]), key)
+        self.assertTrue(os.path.exists(os.path.join(PATH_SETTINGS['dry_run_dir'], 'sent_index.db')))
+
+        args = cli.build_parser().parse_args(['send', '--all'])
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertEqual(args.func(args), 2)
+
+    def test_light_commands_skip_pandas(self):
+        """status and check start without importing pandas or the MIME builders"""
+        code = ("import sys, src.cli, src.schedule_store, src.dispatcher; "
+                "print('pandas' in sys.modules, 'src.message_builder' in sys.modules)")
+        result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.split(), ['False', 'False'])
+
+
+if __name__ == '__main__':
+    unittest.main()
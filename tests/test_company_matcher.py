@@ -0,0 +1,93 @@
+"""
+Tests for domain-index company matching
+"""
+import json
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from src.utils.company_matcher import CompanyMatcher, DomainIndex
+
+
+class TestCompanyMatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_builtin_companies(self):
+        """Built-in companies match under any TLD, as the original patterns did"""
+        matcher = CompanyMatcher()
+        cases = {
+            'a@amazon.com': 'amazon',
+            'b@A2Z.co.uk': 'amazon',
+            'c@fb.com': 'meta',
+            'd@gmail.com': 'google',
+            'e@icloud.com': 'apple',
+            'f@notamazon.com': 'unknown',
+            'g@unknown.org': 'unknown',
+            'no-at-sign.amazon.com': 'unknown',
+            None: 'unknown',
+        }
+        for email, company in cases.items():
+            with self.subTest(email=email):
+                self.assertEqual(matcher.identify_company(email), company)
+
+    def test_suffix_matches_subdomains(self):
+        """Plain domains match their subdomains and the longest suffix wins"""
+        index = DomainIndex()
+        index.add('example.com', 'parent')
+        index.add('labs.example.com', 'labs')
+
+        self.assertEqual(index.lookup('example.com'), 'parent')
+        self.assertEqual(index.lookup('eu.example.com'), 'parent')
+        self.assertEqual(index.lookup('x.labs.example.com'), 'labs')
+        self.assertIsNone(index.lookup('example.org'))
+
+    def test_loads_thousands_of_domains_from_csv(self):
+        path = os.path.join(self.tmp.name, 'company_domains.csv')
+        with open(path, 'w') as f:
+            f.write("company,domain\n")
+            for i in range(5000):
+                f.write(f"company{i},company{i}.com\n")
+
+        matcher = CompanyMatcher(domains_file=path)
+
+        self.assertEqual(matcher.identify_company('x@company4321.com'), 'company4321')
+        self.assertEqual(matcher.identify_company('x@amazon.com'), 'amazon')
+        self.assertEqual(len(matcher.companies), 5004)
+
+    def test_loads_json_mapping(self):
+        path = os.path.join(self.tmp.name, 'company_domains.json')
+        with open(path, 'w') as f:
+            json.dump({'netflix': ['netflix.com', 'nflx.*']}, f)
+
+        matcher = CompanyMatcher(domains_file=path)
+
+        self.assertEqual(matcher.identify_company('x@nflx.net'), 'netflix')
+
+    def test_instances_do_not_share_state(self):
+        """Loading a mapping into one matcher leaves other matchers untouched"""
+        path = os.path.join(self.tmp.name, 'extra.json')
+        with open(path, 'w') as f:
+            json.dump({'netflix': ['netflix.com']}, f)
+
+        CompanyMatcher(domains_file=path)
+        self.assertEqual(CompanyMatcher().identify_company('x@netflix.com'), 'unknown')
+
+    def test_lookups_are_memoized(self):
+        matcher = CompanyMatcher()
+        for _ in range(3):
+            matcher.identify_company('someone@google.com')
+        self.assertEqual(matcher._lookup.cache_info().hits, 2)
+
+    def test_vectorized_matches_scalar(self):
+        matcher = CompanyMatcher()
+        emails = pd.Series(['a@amazon.com', 'b@meta.io', 'nobody', 'c@x.org', ' D@Apple.com '])
+        expected = [matcher.identify_company(email) for email in emails]
+        self.assertEqual(matcher.identify_companies(emails).tolist(), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Tests for the parsed-contact cache
+"""
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from tests.contacts import synthetic_contacts
+from src.email_automation import EmailAutomation
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+@unittest.skipUnless(HAS_PYARROW, "pyarrow not installed")
+class TestContactCache(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+        self.cache_dir = os.path.join(tmp.name, 'cache')
+        self.contacts_path = os.path.join(tmp.name, 'contacts.xlsx')
+        self.df = synthetic_contacts(120, seed=5)
+        self.df.to_excel(self.contacts_path, index=False)
+
+    def automation(self, **kwargs) -> EmailAutomation:
+        automation = EmailAutomation(
+            excel_path=self.contacts_path,
+            sender_email="test@example.com",
+            sender_password="test_password",
+            contact_cache_dir=self.cache_dir,
+            **kwargs
+        )
+        self.addCleanup(automation.close)
+        return automation
+
+    def count_parses(self):
+        """Patch the contact reader to count how often the source file is parsed"""
+        import src.email_automation as module
+        reader = mock.Mock(side_effect=module.iter_contact_frames)
+        patcher = mock.patch.object(module, 'iter_contact_frames', reader)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return reader
+
+    def test_second_load_reads_the_cache(self):
+        """Later loads, in the same or a new instance, skip parsing the workbook"""
+        parses = self.count_parses()
+        expected = dict(self.automation()._extract_contacts(self.df))
+
+        first = self.automation()
+        self.assertEqual(dict(first.process_excel_file()), expected)
+        self.assertEqual(dict(first.process_excel_file()), expected)
+        self.assertEqual(dict(self.automation().process_excel_file()), expected)
+
+        self.assertEqual(parses.call_count, 1)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+    def test_modified_source_is_reparsed(self):
+        """A change in size or mtime invalidates the cached table"""
+        parses = self.count_parses()
+        automation = self.automation()
+        automation.process_excel_file()
+
+        self.df.iloc[:60].to_excel(self.contacts_path, index=False)
+        os.utime(self.contacts_path, ns=(0, 1))  # Force a different mtime even on coarse clocks
+        contacts = automation.process_excel_file()
+
+        self.assertEqual(parses.call_count, 2)
+        self.assertEqual(dict(contacts), dict(automation._extract_contacts(self.df.iloc[:60])))
+        automation.process_excel_file()
+        self.assertEqual(parses.call_count, 2)
+
+    def test_interrupted_parse_leaves_no_cache(self):
+        """Only a fully parsed file is cached"""
+        automation = self.automation()
+        next(automation.iter_company_contacts(chunksize=10))
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+    def test_cached_rows_feed_fingerprints(self):
+        """Incremental ingestion works the same from the cache"""
+        db = os.path.join(self.tmp, 'fingerprints.db')
+        first = self.automation(fingerprint_db=db)
+        total = sum(len(c) for c in first.process_excel_file().values())
+        first.fingerprints.commit()
+        first.close()
+
+        second = self.automation(fingerprint_db=db)
+        self.assertEqual(dict(second.process_excel_file()), {})
+        self.assertEqual(second.fingerprints.summary(),
+                         {'new': 0, 'changed': 0, 'unchanged': total, 'removed': 0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+"""
+Parity tests for vectorized contact processing
+"""
+import unittest
+
+import pandas as pd
+
+from tests.contacts import synthetic_contacts
+from src.email_automation import EmailAutomation
+
+
+class TestVectorizedProcessing(unittest.TestCase):
+    def setUp(self):
+        self.automation = EmailAutomation(
+            excel_path="tests/test_data/test_contacts.xlsx",
+            sender_email="test@example.com",
+            sender_password="test_password"
+        )
+
+    def tearDown(self):
+        self.automation.close()
+
+    def assert_parity(self, df: pd.DataFrame):
+        expected = self.automation._extract_contacts_rowwise(df)
+        actual = self.automation._extract_contacts(df)
+        self.assertEqual(list(actual.keys()), list(expected.keys()))
+        self.assertEqual(dict(actual), dict(expected))
+
+    def test_parity_on_synthetic_contacts(self):
+        """Vectorized and row-wise paths agree on a messy synthetic sheet"""
+        self.assert_parity(synthetic_contacts(5000, seed=7))
+
+    def test_parity_on_edge_cases(self):
+        """Whitespace, case, social links, numbers and missing values are handled identically"""
+        df = pd.DataFrame({
+            'Role': ['Lead', None, 'Manager', 'Director', 'Lead', 42, 'Lead'],
+            'Name': ['  mary   ann ', 'Bob', None, 'eve', 'x', 'y', 'z'],
+            'Email': [
+                ' Mary@Amazon.COM ',
+                'bob@facebook.com',
+                'nobody@fb.co.uk',
+                'eve@corp.google.com',
+                'linkedin.com/in/x',
+                12345,
+                None,
+            ],
+        })
+        self.assert_parity(df)
+
+    def test_empty_result(self):
+        """A sheet with no matching contacts yields no companies"""
+        df = pd.DataFrame({'Role': ['Lead'], 'Name': ['A'], 'Email': ['a@unknown.org']})
+        self.assertEqual(dict(self.automation._extract_contacts(df)), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Tests for streaming contact ingestion
+"""
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from tests.contacts import synthetic_contacts
+from src.email_automation import EmailAutomation
+from src.utils.contact_reader import iter_contact_frames
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+class TestContactReader(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.df = synthetic_contacts(250, seed=3)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.tmp.name, name)
+
+    def automation(self, path: str) -> EmailAutomation:
+        return EmailAutomation(excel_path=path, sender_email="test@example.com", sender_password="x")
+
+    def assert_matches_full_read(self, path: str):
+        """Chunked processing yields the same contacts as processing the whole sheet"""
+        automation = self.automation(path)
+        expected = automation._extract_contacts(self.df)
+
+        chunks = list(automation.iter_company_contacts(chunksize=40))
+        merged = {}
+        for chunk in chunks:
+            for company, contacts in chunk.items():
+                merged.setdefault(company, []).extend(contacts)
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(merged, dict(expected))
+        self.assertEqual(dict(automation.process_excel_file()), dict(expected))
+
+    def test_excel_chunks(self):
+        path = self.path('contacts.xlsx')
+        self.df.to_excel(path, index=False)
+        self.assertEqual(sum(len(chunk) for chunk in iter_contact_frames(path, 100)), len(self.df.dropna(how='all')))
+        self.assert_matches_full_read(path)
+
+    def test_excel_reads_the_first_sheet(self):
+        """Like pd.read_excel, the first sheet is read even if another one was active when saved"""
+        path = self.path('two_sheets.xlsx')
+        with pd.ExcelWriter(path) as writer:
+            self.df.head(5).to_excel(writer, sheet_name='Contacts', index=False)
+            pd.DataFrame({'Role': ['x'], 'Name': ['y'], 'Email': ['z@amazon.com']}).to_excel(
+                writer, sheet_name='Notes', index=False)
+            writer.book.active = 1
+
+        frame = pd.concat(list(iter_contact_frames(path)))
+        self.assertEqual(frame['Email'].tolist(), pd.read_excel(path)['Email'].tolist())
+
+    def test_csv_chunks(self):
+        path = self.path('contacts.csv')
+        self.df.to_csv(path, index=False)
+        self.assert_matches_full_read(path)
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow not installed")
+    def test_parquet_row_groups(self):
+        path = self.path('contacts.parquet')
+        self.df.to_parquet(path, index=False, row_group_size=50)
+        self.assert_matches_full_read(path)
+
+    def test_missing_columns_rejected(self):
+        path = self.path('bad.csv')
+        pd.DataFrame({'Email': ['a@amazon.com']}).to_csv(path, index=False)
+        with self.assertRaises(ValueError):
+            self.automation(path).process_excel_file()
+
+    def test_empty_sheet_rejected(self):
+        path = self.path('empty.xlsx')
+        pd.DataFrame(columns=['Role', 'Name', 'Email']).to_excel(path, index=False)
+        with self.assertRaises(ValueError):
+            self.automation(path).process_excel_file()
+
+    def test_unsupported_extension(self):
+        with self.assertRaises(ValueError):
+            iter_contact_frames(self.path('contacts.txt'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Tests for multi-account send sharding
+"""
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from src.dispatcher import AccountDispatcher, SenderAccount, load_sender_accounts
+from src.email_automation import EmailAutomation
+from tests.smtp_server import LocalSMTPServer
+
+
+class TestAccountDispatcher(unittest.TestCase):
+    def make_server(self) -> LocalSMTPServer:
+        server = LocalSMTPServer().start()
+        self.addCleanup(server.stop)
+        return server
+
+    def test_picks_account_with_most_capacity(self):
+        small = SenderAccount('small@example.com', 'x', {'daily_limit': 2})
+        large = SenderAccount('large@example.com', 'x', {'daily_limit': 4})
+        dispatcher = AccountDispatcher([small, large])
+
+        picks = [dispatcher.try_acquire() for _ in range(7)]
+
+        self.assertEqual([a.email if a else None for a in picks[:2]], ['large@example.com'] * 2)
+        self.assertEqual(sum(a is small for a in picks), 2)
+        self.assertEqual(sum(a is large for a in picks), 4)
+        self.assertIsNone(picks[-1])
+        self.assertEqual(dispatcher.total_capacity(), 0)
+
+    def test_campaign_spreads_over_accounts(self):
+        """Total throughput is the sum of every account's allowance"""
+        servers = [self.make_server(), self.make_server()]
+        accounts = [
+            SenderAccount('first@example.com', 'x', servers[0].provider(daily_limit=3)),
+            SenderAccount('second@example.com', 'x', servers[1].provider(daily_limit=5)),
+        ]
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        resume_path = os.path.join(tmp.name, 'resume.pdf')
+        with open(resume_path, 'wb') as f:
+            f.write(b"%PDF-1.4")
+
+        automation = EmailAutomation(
+            excel_path="tests/test_data/test_contacts.xlsx",
+            sender_email="first@example.com",
+            sender_password="x",
+            accounts=accounts
+        )
+        automation.resume_path = resume_path
+        self.addCleanup(automation.close)
+        for i in range(10):
+            automation._enqueue_email({
+                'recipient_email': f"user{i}@google.com",
+                'recipient_name': f"User {i}",
+                'company': 'google',
+                'is_reminder': False,
+                'batch_num': 1,
+                'send_time': datetime.now() - timedelta(minutes=1),
+            })
+
+        sent = automation.send_scheduled()
+
+        self.assertEqual(sent, 8)
+        self.assertEqual(len(servers[0].messages), 3)
+        self.assertEqual(len(servers[1].messages), 5)
+        self.assertTrue(all(sender == 'second@example.com' for sender, _, _ in servers[1].messages))
+        self.assertIn(b"From: second@example.com", servers[1].messages[0][2])
+
+    def test_load_sender_accounts_from_environment(self):
+        providers = {'gmail': {'daily_limit': 500}, 'outlook': {'daily_limit': 300}}
+        settings = [
+            {'provider': 'gmail', 'email_env': 'A_EMAIL', 'password_env': 'A_PASSWORD', 'daily_limit': 100},
+            {'provider': 'outlook', 'email_env': 'B_EMAIL', 'password_env': 'B_PASSWORD'},
+        ]
+        with mock.patch.dict(os.environ, {'A_EMAIL': 'a@example.com', 'A_PASSWORD': 'secret'}):
+            accounts = load_sender_accounts(settings, providers)
+
+        self.assertEqual([a.email for a in accounts], ['a@example.com'])
+        self.assertEqual(accounts[0].provider['daily_limit'], 100)
+        self.assertEqual(providers['gmail']['daily_limit'], 500)
+
+
+if __name__ == '__main__':
+    unittest.main()
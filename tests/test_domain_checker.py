@@ -0,0 +1,137 @@
+"""
+Tests for cached, concurrent recipient domain checks
+"""
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from src.email_automation import EmailAutomation
+from src.utils.domain_checker import DNSResolver, DomainChecker
+
+
+class FakeResolver:
+    """Answers from a fixed table and records every lookup"""
+
+    def __init__(self, answers, barrier=None):
+        self.answers = answers
+        self.barrier = barrier
+        self.calls = []
+        self.threads = set()
+        self._lock = threading.Lock()
+
+    def __call__(self, domain):
+        with self._lock:
+            self.calls.append(domain)
+            self.threads.add(threading.current_thread().name)
+        if self.barrier is not None:
+            self.barrier.wait(timeout=5)
+        if self.answers.get(domain) == 'error':
+            raise OSError("resolver down")
+        return self.answers.get(domain)
+
+
+class TestDomainChecker(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache_path = os.path.join(tmp.name, 'domains.db')
+        self.now = [1000.0]
+
+    def checker(self, resolver, **kwargs) -> DomainChecker:
+        checker = DomainChecker(resolver, self.cache_path, ttl=100, dead_ttl=10, clock=lambda: self.now[0], **kwargs)
+        self.addCleanup(checker.close)
+        return checker
+
+    def test_each_domain_is_resolved_once_and_concurrently(self):
+        resolver = FakeResolver({'amazon.com': True, 'meta.com': True, 'gone.example': False},
+                                barrier=threading.Barrier(3))
+        checker = self.checker(resolver, max_workers=3)
+
+        emails = pd.Series(["a@amazon.com", "b@Amazon.com", "c@meta.com", "d@gone.example", "e@gone.example"])
+        mask = checker.deliverable_mask(emails)
+
+        self.assertEqual(mask.tolist(), [True, True, True, False, False])
+        self.assertEqual(sorted(resolver.calls), ['amazon.com', 'gone.example', 'meta.com'])
+        self.assertEqual(len(resolver.threads), 3)  # The barrier only opens with three lookups in flight
+        checker.deliverable_mask(emails)
+        self.assertEqual(len(resolver.calls), 3)
+        self.assertEqual(checker.summary()['dropped'], 4)
+
+    def test_answers_persist_until_their_ttl(self):
+        first = self.checker(FakeResolver({'amazon.com': True, 'gone.example': False}))
+        first.check_many(['amazon.com', 'gone.example'])
+        first.close()
+
+        resolver = FakeResolver({'amazon.com': True, 'gone.example': True})
+        checker = self.checker(resolver)
+        self.assertEqual(checker.check_many(['amazon.com', 'gone.example']),
+                         {'amazon.com': True, 'gone.example': False})
+        self.assertEqual(resolver.calls, [])
+
+        self.now[0] += 50  # Past dead_ttl, within ttl
+        self.assertTrue(checker.check('gone.example'))
+        self.assertTrue(checker.check('amazon.com'))
+        self.assertEqual(resolver.calls, ['gone.example'])
+
+    def test_unknown_answers_keep_contacts_and_are_not_cached(self):
+        resolver = FakeResolver({'flaky.example': None, 'broken.example': 'error'})
+        checker = self.checker(resolver)
+        with self.assertLogs('src.utils.domain_checker', 'WARNING'):
+            mask = checker.deliverable_mask(pd.Series(["a@flaky.example", "b@broken.example"]))
+        self.assertTrue(mask.all())
+        checker.check_many(['flaky.example'])
+        self.assertEqual(resolver.calls.count('flaky.example'), 2)
+
+    def test_hung_lookups_count_as_unknown(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def resolver(domain):
+            if domain == 'hung.example':
+                release.wait(10)
+            return True
+
+        checker = self.checker(resolver, max_workers=2, timeout=0.2)
+        start = time.monotonic()
+        with self.assertLogs('src.utils.domain_checker', 'WARNING'):
+            results = checker.check_many(['hung.example', 'amazon.com'])
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertEqual(results, {'hung.example': None, 'amazon.com': True})
+
+    def test_address_fallback_times_out(self):
+        resolver = DNSResolver(timeout=0.1)
+        resolver._dns = None  # As if dnspython were not installed
+        with mock.patch('socket.getaddrinfo', side_effect=lambda *args: time.sleep(1)):
+            start = time.monotonic()
+            self.assertIsNone(resolver('slow.example'))
+        self.assertLess(time.monotonic() - start, 0.5)
+
+
+class TestIngestDropsDeadDomains(unittest.TestCase):
+    def test_contacts_on_dead_domains_are_not_scheduled(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'contacts.csv')
+            pd.DataFrame({
+                'Role': ["Engineer"] * 3,
+                'Name': ["Ann", "Bob", "Cy"],
+                'Email': ["ann@amazon.com", "bob@a2z.com", "cy@meta.com"],
+            }).to_csv(path, index=False)
+            resolver = FakeResolver({'amazon.com': True, 'a2z.com': False, 'meta.com': True})
+            automation = EmailAutomation(excel_path=path, sender_email="test@example.com", sender_password="",
+                                         domain_checker=DomainChecker(resolver))
+            try:
+                contacts = automation.process_excel_file()
+            finally:
+                automation.close()
+
+        emails = sorted(email for company in contacts.values() for _, email, _ in company)
+        self.assertEqual(emails, ["ann@amazon.com", "cy@meta.com"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+Tests for incremental contact ingestion with row fingerprints
+"""
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from src.email_automation import EmailAutomation
+from src.utils.fingerprints import ContactFingerprints
+
+
+def frame(rows):
+    return pd.DataFrame(rows, columns=['Role', 'Name', 'Email'])
+
+
+def contact_rows(start, stop, company='amazon'):
+    return [('Manager', f"Contact {i}", f"user{i}@{company}.com") for i in range(start, stop)]
+
+
+class TestContactFingerprints(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.db_path = os.path.join(tmp.name, 'fingerprints.db')
+
+    def open_index(self) -> ContactFingerprints:
+        index = ContactFingerprints(self.db_path)
+        self.addCleanup(index.close)
+        return index
+
+    def diff(self, index, df):
+        keys, hashes = ContactFingerprints.fingerprint(df['Email'], df['Name'], df['Role'])
+        new, _ = index.diff(keys, hashes)
+        return new
+
+    def test_detects_added_changed_and_removed_rows(self):
+        """Only new contacts are reported as new after a committed pass"""
+        index = self.open_index()
+        self.assertTrue(self.diff(index, frame(contact_rows(0, 4))).all())
+        index.commit()
+
+        rows = contact_rows(1, 6)
+        rows[0] = ('Director', 'Contact 1', ' USER1@amazon.com ')  # Same contact, new role
+        new = self.diff(index, frame(rows))
+
+        self.assertEqual(new.tolist(), [False, False, False, True, True])
+        self.assertEqual(index.summary(), {'new': 2, 'changed': 1, 'unchanged': 2, 'removed': 1})
+
+    def test_fingerprints_persist(self):
+        """A committed pass is the baseline for a later process"""
+        index = self.open_index()
+        self.diff(index, frame(contact_rows(0, 3)))
+        index.commit()
+        index.close()
+
+        reopened = self.open_index()
+        self.assertEqual(len(reopened), 3)
+        self.assertEqual(self.diff(reopened, frame(contact_rows(0, 4))).tolist(), [False, False, False, True])
+
+    def test_uncommitted_pass_is_discarded(self):
+        """Rows seen in a pass that was never committed stay new"""
+        index = self.open_index()
+        self.diff(index, frame(contact_rows(0, 3)))
+        index.reset_pass()
+        self.assertTrue(self.diff(index, frame(contact_rows(0, 3))).all())
+
+
+class TestIncrementalScheduling(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+        self.contacts_path = os.path.join(tmp.name, 'contacts.csv')
+
+    def run_schedule(self, rows) -> EmailAutomation:
+        frame(rows).to_csv(self.contacts_path, index=False)
+        automation = EmailAutomation(
+            excel_path=self.contacts_path,
+            sender_email="test@example.com",
+            sender_password="test_password",
+            schedule_db=os.path.join(self.tmp, 'schedule.db'),
+            fingerprint_db=os.path.join(self.tmp, 'fingerprints.db')
+        )
+        self.addCleanup(automation.close)
+        automation.schedule_emails()
+        return automation
+
+    def test_appended_contacts_are_the_only_ones_scheduled(self):
+        """A second run schedules just the rows added to the sheet"""
+        first = self.run_schedule(contact_rows(0, 6) + contact_rows(0, 6, 'google'))
+        initial = [e for e in first.scheduled_emails if not e.is_reminder]
+        self.assertEqual(len(initial), 12)
+        first.close()
+
+        second = self.run_schedule(contact_rows(0, 6) + contact_rows(0, 6, 'google') + contact_rows(6, 8, 'meta'))
+
+        added = [e for e in second.scheduled_emails if e.batch_num > max(x.batch_num for x in initial)]
+        self.assertEqual(sorted(e.recipient_email for e in added if not e.is_reminder),
+                         ['user6@meta.com', 'user7@meta.com'])
+        self.assertEqual(second.fingerprints.summary()['new'], 0)  # Committed after scheduling
+
+    def test_removed_and_edited_contacts_update_pending_emails(self):
+        """Removed contacts are not sent and edited ones are sent with the new details"""
+        rows = contact_rows(0, 6) + contact_rows(0, 6, 'google')
+        self.run_schedule(rows).close()
+
+        rows = [row for row in rows if row[2] != 'user0@google.com']
+        rows[0] = ('Manager', 'Renamed Contact', 'user0@amazon.com')
+        second = self.run_schedule(rows)
+
+        pending = list(second.scheduled_emails)
+        self.assertNotIn('user0@google.com', {e.recipient_email for e in pending})
+        self.assertEqual({e.recipient_name for e in pending if e.recipient_email == 'user0@amazon.com'},
+                         {'Renamed Contact'})
+        self.assertEqual(len(second.fingerprints), 11)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,177 @@
+"""
+Tests for queued logging, summary lines and debug sampling
+"""
+import copy
+import logging
+import logging.handlers
+import os
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta
+
+from config.settings import LOGGING
+from src.email_automation import EmailAutomation
+from src.logging_setup import DebugSampler, LogSummary, configure_logging, stop_logging
+from src.rate_limiter import RateLimiter
+from src.utils.company_matcher import CompanyMatcher
+from tests.contacts import synthetic_contacts
+from tests.smtp_server import LocalSMTPServer
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self.threads = set()
+
+    def emit(self, record):
+        self.records.append(record)
+        self.threads.add(threading.current_thread().name)
+
+
+class TestQueuedLogging(unittest.TestCase):
+    def setUp(self):
+        root = logging.getLogger()
+        saved = (list(root.handlers), root.level)
+
+        def restore():
+            stop_logging()
+            root.handlers[:] = saved[0]
+            root.setLevel(saved[1])
+        self.addCleanup(restore)
+
+    def test_records_are_written_by_the_listener(self):
+        """Log calls only enqueue; the listener thread hands records to the real handlers"""
+        configure_logging({
+            'version': 1,
+            'disable_existing_loggers': False,
+            'handlers': {'list': {'()': ListHandler, 'level': 'INFO'}},
+            'root': {'handlers': ['list'], 'level': 'DEBUG'},
+        })
+        root = logging.getLogger()
+        self.assertEqual([type(h) for h in root.handlers], [logging.handlers.QueueHandler])
+
+        logger = logging.getLogger('tests.queued')
+        logger.debug("below the handler level")
+        logger.info("hello")
+        stop_logging()
+
+        handler = root.handlers[0]
+        self.assertIsInstance(handler, ListHandler)
+        self.assertEqual([r.getMessage() for r in handler.records], ["hello"])
+        self.assertNotIn(threading.current_thread().name, handler.threads)
+
+
+class TestDebugSampler(unittest.TestCase):
+    def record(self, level):
+        return logging.LogRecord('x', level, __file__, 1, "msg", None, None)
+
+    def test_keeps_one_in_n_debug_records(self):
+        sampler = DebugSampler(rate=10)
+        kept = sum(sampler.filter(self.record(logging.DEBUG)) for _ in range(100))
+        self.assertEqual(kept, 10)
+        self.assertTrue(all(sampler.filter(self.record(logging.INFO)) for _ in range(5)))
+
+    def test_configured_sampler_applies_to_every_handler(self):
+        """The LOGGING sampler sits on the chatty loggers, so the DEBUG file handler is sampled too"""
+        root = logging.getLogger()
+        saved = (list(root.handlers), root.level)
+        sampled = [logging.getLogger(name) for name in ('src.utils.company_matcher', 'src.utils.validators')]
+        saved_filters = [list(logger.filters) for logger in sampled]
+
+        def restore():
+            stop_logging()
+            root.handlers[:] = saved[0]
+            root.setLevel(saved[1])
+            for logger, filters in zip(sampled, saved_filters):
+                logger.filters[:] = filters
+        self.addCleanup(restore)
+
+        config = copy.deepcopy(LOGGING)
+        config['handlers'] = {'file': {'()': ListHandler, 'level': 'DEBUG'},
+                              'console': {'()': ListHandler, 'level': 'DEBUG'}}
+        config['filters']['debug_sample']['rate'] = 10
+        configure_logging(config, use_queue=False)
+
+        matcher = CompanyMatcher()
+        for i in range(100):
+            matcher.identify_company(f"user{i}@google.com")
+        for handler in root.handlers:
+            identified = [r for r in handler.records if r.name == 'src.utils.company_matcher']
+            self.assertEqual(len(identified), 10)
+
+
+class TestLogSummary(unittest.TestCase):
+    def test_rolls_events_into_periodic_lines(self):
+        """At most one line per interval, with the remainder logged on flush"""
+        now = [0.0]
+        logger = logging.getLogger('tests.summary')
+        summary = LogSummary(logger, "Send progress", interval=10, clock=lambda: now[0])
+
+        with self.assertLogs(logger, logging.INFO) as logs:
+            for _ in range(5):
+                summary.add('initial sent')
+                now[0] += 3
+            summary.add('skipped as duplicate')
+            summary.flush()
+            summary.flush()  # Nothing new: no line
+
+        self.assertEqual([r.getMessage() for r in logs.records], [
+            "Send progress: initial sent 5",  # The fifth add comes 12s after the start
+            "Send progress: skipped as duplicate 1",
+        ])
+
+
+class TestSendLogging(unittest.TestCase):
+    def test_sends_log_a_summary_instead_of_a_line_per_recipient(self):
+        server = LocalSMTPServer().start()
+        self.addCleanup(server.stop)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        resume_path = os.path.join(tmp.name, 'resume.pdf')
+        with open(resume_path, 'wb') as f:
+            f.write(b"%PDF-1.4 test resume")
+
+        automation = EmailAutomation(excel_path="tests/test_data/test_contacts.xlsx",
+                                     sender_email="test@example.com", sender_password="test_password")
+        self.addCleanup(automation.close)
+        automation.resume_path = resume_path
+        account = automation.dispatcher.accounts[0]
+        account.provider = server.provider(pool_size=2)
+        account.rate_limiter = RateLimiter({})
+        for i in range(6):
+            automation._enqueue_email({
+                'recipient_email': f"user{i}@amazon.com", 'recipient_name': f"Contact {i}", 'company': 'amazon',
+                'is_reminder': False, 'batch_num': 1, 'send_time': datetime.now() - timedelta(minutes=1)
+            })
+
+        with self.assertLogs('src.email_automation', logging.INFO) as logs:
+            self.assertEqual(automation.send_scheduled(), 6)
+
+        messages = [r.getMessage() for r in logs.records]
+        self.assertIn("Send progress: initial sent 6", messages)
+        self.assertFalse([m for m in messages if 'user0@amazon.com' in m])
+
+    def test_scheduling_logs_a_summary_instead_of_a_line_per_recipient(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, 'contacts.csv')
+        synthetic_contacts(12).to_csv(path, index=False)
+        automation = EmailAutomation(excel_path=path,
+                                     sender_email="test@example.com", sender_password="test_password")
+        self.addCleanup(automation.close)
+
+        with self.assertLogs('src.email_automation', logging.DEBUG) as logs:
+            automation.schedule_emails()
+
+        messages = [r.getMessage() for r in logs.records]
+        summaries = [m for m in messages if m.startswith("Schedule progress: ")]
+        self.assertTrue(summaries)
+        self.assertFalse([m for m in messages if m.startswith("Scheduled email to")])
+        emails = set(email.recipient_email for email in automation.scheduled_emails)
+        self.assertFalse([m for m in messages if any(email in m for email in emails)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+Tests for message building and the process-pool build stage
+"""
+import asyncio
+import email
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from config.settings import ATTACHMENT_SETTINGS
+from src.email_automation import EmailAutomation
+from src.message_builder import MessageBuilder
+from src.rate_limiter import RateLimiter
+from tests.smtp_server import LocalSMTPServer
+
+
+class TestMessageBuilder(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.resume_path = os.path.join(tmp.name, 'resume.pdf')
+        with open(self.resume_path, 'wb') as f:
+            f.write(b"%PDF-1.4 test resume")
+        self.builder = MessageBuilder(self.resume_path, ATTACHMENT_SETTINGS)
+
+    def test_build_bytes_round_trips(self):
+        """Serialized messages parse back to the same headers and parts"""
+        data = self.builder.build_bytes("me@example.com", "jane@amazon.com", "Jane", "amazon", False)
+        self.assertIn(b"\r\n", data)
+
+        parsed = email.message_from_bytes(data)
+        built = self.builder.build("me@example.com", "jane@amazon.com", "Jane", "amazon", False)
+        self.assertEqual(parsed['Subject'], built['Subject'])
+        self.assertEqual(parsed['To'], "jane@amazon.com")
+        attachment = parsed.get_payload()[1]
+        self.assertEqual(attachment.get_payload(decode=True), b"%PDF-1.4 test resume")
+
+
+class TestBuildPipeline(unittest.TestCase):
+    def setUp(self):
+        self.server = LocalSMTPServer().start()
+        self.addCleanup(self.server.stop)
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        resume_path = os.path.join(tmp.name, 'resume.pdf')
+        with open(resume_path, 'wb') as f:
+            f.write(b"%PDF-1.4 test resume")
+
+        self.automation = EmailAutomation(
+            excel_path="tests/test_data/test_contacts.xlsx",
+            sender_email="test@example.com",
+            sender_password="test_password"
+        )
+        self.automation.resume_path = resume_path
+        account = self.automation.dispatcher.accounts[0]
+        account.provider = self.server.provider(pool_size=2)
+        account.rate_limiter = RateLimiter({})
+        self.addCleanup(self.automation.close)
+
+    def test_process_pool_build_stage(self):
+        """Messages built in worker processes are delivered intact"""
+        for i in range(6):
+            self.automation._enqueue_email({
+                'recipient_email': f"user{i}@amazon.com",
+                'recipient_name': f"Contact {i}",
+                'company': 'amazon',
+                'is_reminder': False,
+                'batch_num': 1,
+                'send_time': datetime.now() - timedelta(minutes=1)
+            })
+
+        sent = asyncio.run(self.automation.send_scheduled_async(max_in_flight=2, build_workers=2))
+
+        self.assertEqual(sent, 6)
+        self.assertEqual(len(self.server.messages), 6)
+        recipients = sorted(rcpts[0] for _, rcpts, _ in self.server.messages)
+        self.assertEqual(recipients, sorted(f"user{i}@amazon.com" for i in range(6)))
+        parsed = email.message_from_bytes(self.server.messages[0][2])
+        self.assertEqual(parsed['From'], "test@example.com")
+        self.assertEqual(len(parsed.get_payload()), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+"""
+Tests for send-path metrics and their export formats
+"""
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from src.email_automation import EmailAutomation
+from src.metrics import MetricsRegistry
+from src.rate_limiter import RateLimiter
+from src.scheduler import ScheduledEmail
+from tests.smtp_server import LocalSMTPServer
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def setUp(self):
+        self.metrics = MetricsRegistry(prefix='test_')
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Each bucket counts every observation at or below its bound"""
+        histogram = self.metrics.histogram('latency_seconds', buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.cumulative(), {'0.1': 2, '1.0': 3, '+Inf': 4})
+        self.assertEqual(histogram.count, 4)
+        self.assertAlmostEqual(histogram.sum, 2.65)
+
+    def test_metrics_are_created_once(self):
+        """Asking for the same name returns the same metric"""
+        self.metrics.counter('sent_total').inc()
+        self.metrics.counter('sent_total').inc(2)
+        self.assertEqual(self.metrics.counter('sent_total').value, 3)
+        with self.assertRaises(ValueError):
+            self.metrics.gauge('sent_total')
+
+    def test_prometheus_text_format(self):
+        """Export follows the Prometheus exposition format"""
+        self.metrics.counter('sent_total', 'Sent emails').inc(5)
+        self.metrics.gauge('queued').set_function(lambda: 7)
+        self.metrics.histogram('data_seconds', buckets=(1.0,)).observe(0.5)
+
+        text = self.metrics.to_prometheus()
+
+        self.assertIn("# HELP test_sent_total Sent emails\n# TYPE test_sent_total counter\ntest_sent_total 5\n", text)
+        self.assertIn("test_queued 7\n", text)
+        self.assertIn('test_data_seconds_bucket{le="1.0"} 1\n', text)
+        self.assertIn('test_data_seconds_bucket{le="+Inf"} 1\n', text)
+        self.assertIn("test_data_seconds_count 1\n", text)
+
+    def test_json_snapshot_written(self):
+        """JSON snapshots round-trip through the file written"""
+        self.metrics.counter('sent_total').inc()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'metrics.json')
+            self.metrics.write_json(path)
+            with open(path) as f:
+                snapshot = json.load(f)
+        self.assertEqual(snapshot['counters'], {'test_sent_total': 1})
+
+
+class TestSendPathMetrics(unittest.TestCase):
+    def setUp(self):
+        self.server = LocalSMTPServer().start()
+        self.addCleanup(self.server.stop)
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        resume_path = os.path.join(tmp.name, 'resume.pdf')
+        with open(resume_path, 'wb') as f:
+            f.write(b"%PDF-1.4 test resume")
+
+        self.metrics = MetricsRegistry()
+        self.automation = EmailAutomation(
+            excel_path="tests/test_data/test_contacts.xlsx",
+            sender_email="test@example.com",
+            sender_password="test_password",
+            metrics=self.metrics
+        )
+        self.automation.resume_path = resume_path
+        account = self.automation.dispatcher.accounts[0]
+        account.provider = self.server.provider(pool_size=2)
+        account.rate_limiter = RateLimiter({})
+        self.addCleanup(self.automation.close)
+
+    def test_send_path_is_instrumented(self):
+        """Sends, duplicates, latencies and queue depth are all recorded"""
+        due = datetime.now() - timedelta(minutes=1)
+        for email in ("a@amazon.com", "b@amazon.com", "a@amazon.com"):
+            self.automation._enqueue_email({
+                'recipient_email': email, 'recipient_name': "Contact", 'company': 'amazon',
+                'is_reminder': False, 'batch_num': 1, 'send_time': due
+            })
+        self.automation._enqueue_email({
+            'recipient_email': "later@amazon.com", 'recipient_name': "Contact", 'company': 'amazon',
+            'is_reminder': False, 'batch_num': 2, 'send_time': due + timedelta(days=1)
+        })
+
+        self.automation.send_scheduled(max_in_flight=2)
+        snapshot = self.metrics.snapshot()
+
+        counters = snapshot['counters']
+        self.assertEqual(counters['massemailer_emails_sent_total'], 2)
+        self.assertEqual(counters['massemailer_emails_skipped_duplicate_total'], 1)
+        self.assertEqual(counters['massemailer_emails_failed_total'], 0)
+
+        histograms = snapshot['histograms']
+        self.assertEqual(histograms['massemailer_smtp_data_seconds']['count'], 2)
+        self.assertEqual(histograms['massemailer_message_build_seconds']['count'], 2)
+        self.assertGreaterEqual(histograms['massemailer_smtp_connect_seconds']['count'], 1)
+        self.assertGreaterEqual(histograms['massemailer_smtp_login_seconds']['count'], 1)
+
+        self.assertEqual(snapshot['gauges']['massemailer_schedule_queued'], 1)
+        self.assertEqual(snapshot['gauges']['massemailer_emails_in_flight'], 0)
+
+    def test_close_releases_schedule_gauges(self):
+        """A closed automation stops reporting, without clearing a newer one's gauges"""
+        newer = EmailAutomation(
+            excel_path="contacts.xlsx",
+            sender_email="newer@example.com",
+            sender_password="test_password",
+            metrics=self.metrics
+        )
+        self.addCleanup(newer.close)
+        newer.scheduler.add(ScheduledEmail("a@amazon.com", "Contact", 'amazon', False, 1, 0.0))
+
+        self.automation.close()
+        self.assertEqual(self.metrics.gauge('schedule_queued').value, 1)
+
+        newer.close()
+        self.assertEqual(self.metrics.gauge('schedule_queued').value, 0)
+        self.assertEqual(self.metrics.gauge('schedule_next_due_seconds').value, 0)
+
+if __name__ == '__main__':
+    unittest.main()
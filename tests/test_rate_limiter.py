@@ -0,0 +1,111 @@
+"""
+Tests for the multi-window rate limiter
+"""
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from src.rate_limiter import _WRITER, RateLimiter
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_tightest_window_wins(self):
+        limiter = RateLimiter({'second': (5, 1.0), 'batch': (3, 3600.0)})
+
+        results = [limiter.try_acquire() for _ in range(5)]
+
+        self.assertEqual(results, [True, True, True, False, False])
+        self.assertEqual(limiter.remaining(), 0)
+
+    def test_acquire_blocks_until_refill(self):
+        limiter = RateLimiter({'second': (2, 0.2)})
+        started = time.monotonic()
+        for _ in range(4):
+            self.assertTrue(limiter.acquire(timeout=1))
+        self.assertGreaterEqual(time.monotonic() - started, 0.15)
+
+    def test_acquire_gives_up_on_long_wait(self):
+        limiter = RateLimiter({'day': (1, 86400.0)})
+        self.assertTrue(limiter.acquire(timeout=0.1))
+        self.assertFalse(limiter.acquire(timeout=0.1))
+
+    def test_acquire_async(self):
+        limiter = RateLimiter({'second': (1, 0.1)})
+
+        async def take(n):
+            return [await limiter.acquire_async(timeout=1) for _ in range(n)]
+
+        self.assertEqual(asyncio.run(take(3)), [True, True, True])
+
+    def test_state_survives_restart(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, 'rate_limits.json')
+
+        limiter = RateLimiter({'day': (3, 86400.0)}, state_path=path)
+        for _ in range(3):
+            limiter.try_acquire()
+        limiter.close()
+
+        restarted = RateLimiter({'day': (3, 86400.0)}, state_path=path)
+        self.assertFalse(restarted.try_acquire())
+
+        # A changed window configuration starts from a full bucket
+        reconfigured = RateLimiter({'day': (10, 86400.0)}, state_path=path)
+        self.assertTrue(reconfigured.try_acquire())
+
+    def test_state_writes_are_batched(self):
+        """Taking a token does not write the state file every time"""
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = os.path.join(tmp.name, 'rate_limits.json')
+
+        limiter = RateLimiter({'day': (100, 86400.0)}, state_path=path, save_every=5, save_interval=3600)
+        for _ in range(4):
+            limiter.try_acquire()
+        self.assertFalse(os.path.exists(path))
+        limiter.try_acquire()
+        _WRITER.submit(lambda: None).result()  # The batched write happens in the background
+        with open(path) as f:
+            self.assertAlmostEqual(json.load(f)['day']['tokens'], 95, places=2)
+
+        limiter.try_acquire()
+        limiter.close()
+        with open(path) as f:
+            self.assertAlmostEqual(json.load(f)['day']['tokens'], 94, places=2)
+
+    def test_batched_writes_leave_the_calling_thread(self):
+        """try_acquire never writes the state file itself, so the event loop is not blocked on disk"""
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        limiter = RateLimiter({'day': (100, 86400.0)}, state_path=os.path.join(tmp.name, 'rate_limits.json'),
+                              save_every=2, save_interval=3600)
+        writers = []
+        save = limiter._save
+        limiter._save = lambda snapshot: (writers.append(threading.current_thread()), save(snapshot))
+
+        for _ in range(3):
+            limiter.try_acquire()
+        _WRITER.submit(lambda: None).result()
+        limiter.close()
+
+        self.assertEqual(len(writers), 2)
+        self.assertIsNot(writers[0], threading.current_thread())
+        self.assertIs(writers[1], threading.current_thread())  # close() writes synchronously
+
+    def test_from_provider_windows(self):
+        provider = {'daily_limit': 500, 'batch_limit': 100, 'per_second_limit': 2, 'hourly_limit': 60}
+        limiter = RateLimiter.from_provider(provider, cooling_period=0.5)
+
+        windows = {name: (b.capacity, b.period) for name, b in limiter.buckets.items()}
+        self.assertEqual(windows, {
+            'second': (2, 1.0), 'hour': (60, 3600.0), 'day': (500, 86400.0), 'batch': (100, 1800.0)
+        })
+
+
+if __name__ == '__main__':
+    unittest.main()
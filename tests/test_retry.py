@@ -0,0 +1,181 @@
+"""
+Tests for SMTP failure classification and the retry queue
+"""
+import asyncio
+import os
+import smtplib
+import socket
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta
+
+from src.email_automation import EmailAutomation
+from src.rate_limiter import RateLimiter
+from src.retry import ACCOUNT, LOCAL, PERMANENT, TRANSIENT, RetryPolicy, classify_smtp_error
+from tests.smtp_server import LocalSMTPServer
+
+
+class TestClassification(unittest.TestCase):
+    def test_classifies_smtp_errors(self):
+        """4xx and connection problems are transient, 5xx replies permanent, logins and local files not the recipient's"""
+        cases = [
+            (smtplib.SMTPRecipientsRefused({'a@x.com': (450, b'Mailbox busy')}), TRANSIENT),
+            (smtplib.SMTPRecipientsRefused({'a@x.com': (550, b'No such user')}), PERMANENT),
+            (smtplib.SMTPDataError(451, b'Try again later'), TRANSIENT),
+            (smtplib.SMTPDataError(554, b'Rejected as spam'), PERMANENT),
+            (smtplib.SMTPSenderRefused(553, b'Bad sender', 'me@x.com'), PERMANENT),
+            (smtplib.SMTPAuthenticationError(535, b'Bad credentials'), ACCOUNT),
+            (smtplib.SMTPServerDisconnected('Connection unexpectedly closed'), TRANSIENT),
+            (ConnectionResetError(), TRANSIENT),
+            (socket.timeout(), TRANSIENT),
+            (FileNotFoundError(2, 'No such file', 'resume.pdf'), LOCAL),
+            (KeyError('name'), TRANSIENT),
+        ]
+        for error, expected in cases:
+            with self.subTest(error=repr(error)):
+                self.assertEqual(classify_smtp_error(error), expected)
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_exponential_backoff_is_capped(self):
+        """Delays double per attempt up to max_delay"""
+        policy = RetryPolicy(max_attempts=5, base_delay=10, max_delay=35, jitter=0)
+        self.assertEqual([policy.delay(n) for n in (1, 2, 3, 4)], [10, 20, 35, 35])
+
+    def test_jitter_spreads_delays(self):
+        """Jittered delays stay within the configured band"""
+        policy = RetryPolicy(base_delay=100, jitter=0.2)
+        delays = {policy.delay(1) for _ in range(50)}
+        self.assertGreater(len(delays), 1)
+        self.assertTrue(all(80 <= d <= 120 for d in delays))
+
+    def test_attempt_limit(self):
+        """Only transient failures within the attempt limit are retried"""
+        policy = RetryPolicy(max_attempts=3)
+        self.assertTrue(policy.should_retry(2, TRANSIENT))
+        self.assertFalse(policy.should_retry(3, TRANSIENT))
+        self.assertFalse(policy.should_retry(1, PERMANENT))
+
+
+class TestRetryQueue(unittest.TestCase):
+    def setUp(self):
+        self.server = LocalSMTPServer().start()
+        self.addCleanup(self.server.stop)
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        resume_path = os.path.join(tmp.name, 'resume.pdf')
+        with open(resume_path, 'wb') as f:
+            f.write(b"%PDF-1.4 test resume")
+        self.resume_path = resume_path
+
+        self.automation = EmailAutomation(
+            excel_path="tests/test_data/test_contacts.xlsx",
+            sender_email="test@example.com",
+            sender_password="test_password",
+            schedule_db=os.path.join(tmp.name, 'schedule.db')
+        )
+        self.automation.resume_path = resume_path
+        self.automation.retry_policy = RetryPolicy(max_attempts=2, base_delay=60, jitter=0)
+        account = self.automation.dispatcher.accounts[0]
+        self.account = account
+        account.provider = self.server.provider(pool_size=2)
+        account.rate_limiter = RateLimiter({})
+        self.addCleanup(self.automation.close)
+
+        due = datetime.now() - timedelta(minutes=1)
+        for email in ("ok@amazon.com", "busy@amazon.com", "gone@amazon.com"):
+            self.automation._enqueue_email({
+                'recipient_email': email, 'recipient_name': "Contact", 'company': 'amazon',
+                'is_reminder': False, 'batch_num': 1, 'send_time': due
+            })
+        self.server.rcpt_responses['busy@amazon.com'] = "450 Mailbox busy"
+        self.server.rcpt_responses['gone@amazon.com'] = "550 No such user"
+
+    def send_retries(self) -> int:
+        """Send whatever is due once the first retry delay has passed"""
+        later = datetime.now() + timedelta(minutes=2)
+        return asyncio.run(self.automation.send_scheduled_async(now=later))
+
+    def test_transient_failures_are_delayed_and_permanent_ones_dropped(self):
+        """A 4xx goes back into the queue with backoff; a 5xx is never retried"""
+        started = time.time()
+        sent = self.automation.send_scheduled()
+
+        self.assertEqual(sent, 1)
+        store = self.automation.schedule_store
+        self.assertEqual(store.count('sent'), 1)
+        self.assertEqual(store.count('failed'), 1)
+        self.assertEqual(store.count('pending'), 1)
+
+        # Only the transient failure is waiting, 60s out
+        self.assertEqual(len(self.automation.scheduled_emails), 1)
+        retry = self.automation.scheduled_emails[0]
+        self.assertEqual(retry.recipient_email, 'busy@amazon.com')
+        self.assertEqual(retry.attempts, 1)
+        self.assertGreaterEqual(retry.send_at, started + 60)
+        self.assertTrue(self.automation.failed_emails['gone@amazon.com'][0]['permanent'])
+
+        # The retry succeeds once the mailbox recovers
+        del self.server.rcpt_responses['busy@amazon.com']
+        self.assertEqual(self.send_retries(), 1)
+        self.assertEqual(store.count('sent'), 2)
+        self.assertEqual(list(self.automation.scheduled_emails), [])
+
+    def test_gives_up_after_max_attempts(self):
+        """Transient failures stop being retried once attempts run out"""
+        self.server.rcpt_responses.pop('gone@amazon.com')
+        self.automation.send_scheduled()
+        self.send_retries()
+
+        self.assertEqual(len(self.automation.scheduled_emails), 0)
+        self.assertEqual(self.automation.schedule_store.count('failed'), 1)
+        self.assertEqual([f['attempt'] for f in self.automation.failed_emails['busy@amazon.com']], [1, 2])
+
+    def test_sync_sends_count_attempts_on_the_scheduled_row(self):
+        """Repeated failures through _send_email update the same row until it is marked failed"""
+        store = self.automation.schedule_store
+        for _ in range(self.automation.retry_policy.max_attempts):
+            due = store.claim_due(datetime.now() + timedelta(days=1))
+            busy = [email for email in due if email.recipient_email == 'busy@amazon.com']
+            self.assertEqual(len(busy), 1)
+            for email in due:
+                self.automation._send_email(email.recipient_email, email.recipient_name, email.company,
+                                            email.is_reminder, email.batch_num, scheduled=email)
+
+        self.assertEqual(store.count(), 3)  # No new rows for the retries
+        self.assertEqual((store.count('sent'), store.count('failed'), store.count('pending')), (1, 2, 0))
+        self.assertEqual(busy[0].attempts, 2)
+        self.assertEqual([f['attempt'] for f in self.automation.failed_emails['busy@amazon.com']], [1, 2])
+        self.assertEqual(list(self.automation.scheduled_emails), [])
+
+    def assert_nothing_charged(self):
+        store = self.automation.schedule_store
+        self.assertEqual(store.count('pending'), 3)
+        self.assertEqual([email.attempts for email in store.iter_pending()], [0, 0, 0])
+        self.assertEqual(store.count('claimed'), 0)
+        self.assertEqual(dict(self.automation.failed_emails), {})
+
+    def test_rejected_login_disables_the_account_without_charging_recipients(self):
+        """Bad credentials stop the account; every email stays pending with its attempts intact"""
+        self.server.password = "another_password"
+        with self.assertLogs('src.dispatcher', 'ERROR'):
+            self.assertEqual(self.automation.send_scheduled(), 0)
+
+        self.assertIsNotNone(self.account.disabled)
+        self.assert_nothing_charged()
+        connections = self.server.connections
+        self.assertEqual(self.send_retries(), 0)
+        self.assertEqual(self.server.connections, connections)
+
+    def test_local_errors_stop_the_run_without_charging_recipients(self):
+        """A missing resume halts sending instead of failing every recipient"""
+        os.remove(self.resume_path)
+        with self.assertLogs('src.email_automation', 'ERROR'):
+            self.assertEqual(self.automation.send_scheduled(), 0)
+        self.assert_nothing_charged()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,198 @@
+"""
+Tests for the SQLite schedule store
+"""
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from config.settings import EMAIL_SETTINGS
+from src.email_automation import EmailAutomation
+from src.schedule_store import ScheduleStore
+from src.scheduler import DIMENSIONS, ScheduleIndex
+
+
+def entry(recipient: str, send_time: datetime, batch_num: int = 1) -> dict:
+    return {
+        'recipient_email': recipient,
+        'recipient_name': 'Test Contact',
+        'company': 'google',
+        'is_reminder': False,
+        'batch_num': batch_num,
+        'send_time': send_time,
+    }
+
+
+class TestScheduleStore(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.db_path = os.path.join(tmp.name, 'schedule.db')
+
+    def open_store(self, **kwargs) -> ScheduleStore:
+        store = ScheduleStore(self.db_path, **kwargs)
+        self.addCleanup(store.close)
+        return store
+
+    def test_uses_wal_and_indexes(self):
+        """The store runs in WAL mode with send_time, recipient and status indexes"""
+        store = self.open_store()
+        mode = store._conn.execute("PRAGMA journal_mode").fetchone()[0]
+        indexes = {row[1] for row in store._conn.execute("PRAGMA index_list(scheduled_emails)")}
+
+        self.assertEqual(mode, 'wal')
+        self.assertIn('idx_scheduled_send_time', indexes)
+        self.assertIn('idx_scheduled_recipient', indexes)
+        self.assertIn('idx_scheduled_status_send_time', indexes)
+
+    def test_claim_due_only_returns_due_rows_once(self):
+        """Due rows are claimed in send-time order and cannot be claimed twice"""
+        now = datetime.now()
+        store = self.open_store()
+        store.add_many([
+            entry('b@google.com', now - timedelta(minutes=1)),
+            entry('a@google.com', now - timedelta(minutes=2)),
+            entry('later@google.com', now + timedelta(days=1)),
+        ])
+
+        claimed = store.claim_due(now)
+
+        self.assertEqual([e.recipient_email for e in claimed], ['a@google.com', 'b@google.com'])
+        self.assertEqual(store.claim_due(now), [])
+        self.assertEqual(store.count('claimed'), 2)
+        self.assertEqual(store.count('pending'), 1)
+
+    def test_live_claims_are_not_taken_over(self):
+        """Another run neither recovers nor releases claims whose lease is still running"""
+        now = datetime.now()
+        sender = self.open_store(owner='sender')
+        sender.add_many([entry(f"user{i}@google.com", now - timedelta(minutes=i)) for i in range(3)])
+        claimed = sender.claim_due(now, limit=2)
+
+        other = self.open_store(owner='status')
+        self.assertEqual(other.recover_claims(), 0)
+        other.release(e.id for e in claimed)
+        self.assertEqual(other.count('claimed'), 2)
+        self.assertEqual([e.recipient_email for e in other.claim_due(now)], ["user0@google.com"])
+
+        sender.release([claimed[0].id])
+        self.assertEqual(sender.count('claimed'), 2)  # Our remaining claim and the other run's
+        self.assertEqual(sender.renew_claims(), 1)
+
+    def test_expired_claims_are_recovered(self):
+        """A claim whose lease ran out (a crashed run) goes back to pending"""
+        now = datetime.now()
+        crashed = self.open_store(owner='crashed', lease=0)
+        crashed.add_many([entry("user0@google.com", now - timedelta(minutes=1))])
+        self.assertEqual(len(crashed.claim_due(now)), 1)
+
+        store = self.open_store(owner='next')
+        self.assertEqual(store.recover_claims(), 1)
+        self.assertEqual((store.count('pending'), store.count('claimed')), (1, 0))
+
+    def test_opens_databases_created_before_leases(self):
+        """Older schedule files gain the lease columns, and their claims count as expired"""
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript(
+            "CREATE TABLE scheduled_emails (id INTEGER PRIMARY KEY, recipient_email TEXT NOT NULL, "
+            "recipient_name TEXT NOT NULL, company TEXT NOT NULL, is_reminder INTEGER NOT NULL, "
+            "batch_num INTEGER NOT NULL, send_time REAL NOT NULL, status TEXT NOT NULL DEFAULT 'pending', "
+            "attempts INTEGER NOT NULL DEFAULT 0, claimed_at REAL, last_error TEXT);"
+            "INSERT INTO scheduled_emails (recipient_email, recipient_name, company, is_reminder, batch_num, "
+            "send_time, status) VALUES ('a@google.com', 'A', 'google', 0, 1, 0, 'claimed');"
+        )
+        conn.commit()
+        conn.close()
+
+        store = self.open_store()
+        self.assertEqual(store.recover_claims(), 1)
+        self.assertEqual(len(store.claim_due()), 1)
+
+    def test_failed_status_update_is_rolled_back(self):
+        """An error part-way through a batch update leaves no open transaction behind"""
+        now = datetime.now()
+        store = self.open_store()
+        records = store.add_many([entry(f"user{i}@google.com", now) for i in range(2)])
+
+        with self.assertRaises(sqlite3.Error):
+            store.mark_sent([records[0].id, object()])  # The second id cannot be bound
+
+        self.assertFalse(store._conn.in_transaction)
+        self.assertEqual(store.count('sent'), 0)
+        store.mark_sent([records[1].id])
+        self.assertEqual(store.count('sent'), 1)
+
+    def test_pending_counts_and_rows_match_the_index(self):
+        """SQL breakdowns and pages agree with ScheduleIndex over the same pending rows"""
+        now = datetime(2026, 3, 1, 23, 59, 30)
+        store = self.open_store()
+        records = store.add_many([
+            dict(entry(f"user{i}@google.com", now + timedelta(hours=i // 3), batch_num=i // 4),
+                 company=('google', 'meta')[i % 2], is_reminder=i % 3 == 0)
+            for i in range(10)
+        ])
+        store.mark_sent([records[0].id])
+        index = ScheduleIndex(records[1:])
+
+        for dimension in DIMENSIONS:
+            with self.subTest(by=dimension):
+                self.assertEqual(store.pending_counts(dimension), index.counts(dimension))
+        self.assertEqual(list(store.iter_pending_rows(page_size=2)), index.rows(limit=None))
+        self.assertEqual(list(store.iter_pending_rows(offset=3, limit=5, page_size=2)),
+                         index.rows(offset=3, limit=5))
+
+    def test_schedule_survives_restart(self):
+        """Pending and interrupted rows are picked up by a new process without loading them"""
+        now = datetime.now()
+        store = self.open_store(lease=0)  # The interrupted run's lease has run out
+        store.add_many([entry(f"user{i}@google.com", now + timedelta(days=i)) for i in range(4)])
+        sent = store.claim_due(now)
+        store.mark_sent(e.id for e in sent)
+        store.claim_due(now + timedelta(days=1, hours=1))  # Interrupted before it was sent
+        store.close()
+
+        automation = EmailAutomation(
+            excel_path="tests/test_data/test_contacts.xlsx",
+            sender_email="test@example.com",
+            sender_password="test_password",
+            schedule_db=self.db_path
+        )
+        self.addCleanup(automation.close)
+
+        self.assertEqual(automation.resume_schedule(), 3)
+        self.assertEqual(len(automation.scheduler), 0)
+        self.assertEqual(len(automation.scheduled_emails), 3)
+        self.assertEqual(automation.scheduled_emails[0].send_time.date(), (now + timedelta(days=1)).date())
+        self.assertEqual(automation.scheduled_emails.count(template_type='initial'), 3)
+
+    def test_sends_claim_due_rows_a_page_at_a_time(self):
+        """Every due row is sent through claim_due pages; later rows stay pending in the store"""
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        resume_path = os.path.join(tmp.name, 'resume.pdf')
+        with open(resume_path, 'wb') as f:
+            f.write(b"%PDF-1.4 test resume")
+        automation = EmailAutomation(excel_path="tests/test_data/test_contacts.xlsx",
+                                     sender_email="test@example.com", sender_password="",
+                                     schedule_db=self.db_path, transport_settings={'type': 'memory'})
+        self.addCleanup(automation.close)
+        automation.resume_path = resume_path
+        now = datetime.now()
+        automation._enqueue_emails([entry(f"user{i}@google.com", now - timedelta(minutes=i)) for i in range(7)]
+                                   + [entry("later@google.com", now + timedelta(days=1))])
+
+        store = automation.schedule_store
+        with mock.patch.dict(EMAIL_SETTINGS, {'claim_page_size': 3}), \
+                mock.patch.object(store, 'claim_due', wraps=store.claim_due) as claim_due:
+            self.assertEqual(automation.send_scheduled(), 7)
+
+        self.assertEqual([call.kwargs['limit'] for call in claim_due.call_args_list], [3, 3, 3])
+        self.assertEqual((store.count('sent'), store.count('pending'), store.count('claimed')), (7, 1, 0))
+        self.assertEqual(len(automation.scheduler), 0)
+        self.assertEqual([row['recipient'] for row in automation.scheduled_emails.rows()], ["later@google.com"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,194 @@
+"""
+Tests for the due-time email scheduler
+"""
+import csv
+import io
+import json
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+
+from src.scheduler import EmailScheduler, ScheduledEmail, ScheduleIndex
+
+
+def entry(recipient: str, send_time: datetime) -> ScheduledEmail:
+    return ScheduledEmail(recipient, 'Test Contact', 'google', False, 1, send_time.timestamp())
+
+
+class TestEmailScheduler(unittest.TestCase):
+    def test_pops_due_emails_in_send_time_order(self):
+        """Only due emails are returned, earliest first"""
+        now = datetime.now()
+        scheduler = EmailScheduler()
+        scheduler.add(entry('c@x.com', now - timedelta(minutes=1)))
+        scheduler.add(entry('future@x.com', now + timedelta(hours=1)))
+        scheduler.add(entry('a@x.com', now - timedelta(minutes=3)))
+        scheduler.add(entry('b@x.com', now - timedelta(minutes=2)))
+
+        due = scheduler.pop_due(now)
+
+        self.assertEqual([e.recipient_email for e in due], ['a@x.com', 'b@x.com', 'c@x.com'])
+        self.assertEqual(len(scheduler), 1)
+        self.assertEqual(scheduler.next_due_time(), now + timedelta(hours=1))
+
+    def test_equal_send_times_pop_in_insertion_order(self):
+        """Emails sharing a send time (a batch) come out in the order they were queued"""
+        now = datetime.now()
+        scheduler = EmailScheduler()
+        batch = [entry(f"u{i}@x.com", now - timedelta(minutes=1)) for i in range(5)]
+        scheduler.add_many(batch[:3])
+        scheduler.add(entry('early@x.com', now - timedelta(minutes=2)))
+        scheduler.add_many(batch[3:])
+
+        due = scheduler.pop_due(now)
+
+        self.assertEqual([e.recipient_email for e in due], ['early@x.com'] + [e.recipient_email for e in batch])
+        self.assertEqual(len(scheduler), 0)
+        self.assertIsNone(scheduler.next_due_time())
+
+    def test_wait_sleeps_until_next_due(self):
+        """wait_for_due returns once the earliest email falls due"""
+        scheduler = EmailScheduler()
+        scheduler.add(entry('soon@x.com', datetime.now() + timedelta(seconds=0.2)))
+
+        started = time.monotonic()
+        due = scheduler.wait_for_due(timeout=5)
+
+        self.assertEqual([e.recipient_email for e in due], ['soon@x.com'])
+        self.assertLess(time.monotonic() - started, 2)
+
+    def test_new_entry_wakes_waiter_early(self):
+        """Adding an earlier email wakes a sleeping waiter"""
+        scheduler = EmailScheduler()
+        scheduler.add(entry('later@x.com', datetime.now() + timedelta(hours=1)))
+
+        timer = threading.Timer(0.1, scheduler.add, args=(entry('now@x.com', datetime.now()),))
+        timer.start()
+        self.addCleanup(timer.cancel)
+
+        due = scheduler.wait_for_due(timeout=5)
+        self.assertEqual([e.recipient_email for e in due], ['now@x.com'])
+
+    def test_close_releases_waiters(self):
+        """Closing the scheduler makes waiters return empty-handed"""
+        scheduler = EmailScheduler()
+        threading.Timer(0.1, scheduler.close).start()
+
+        self.assertEqual(scheduler.wait_for_due(timeout=5), [])
+        self.assertTrue(scheduler.closed)
+
+
+class TestScheduledEmail(unittest.TestCase):
+    def test_compact_record(self):
+        """Records have no per-instance dict and intern the company name"""
+        company = ''.join(['goo', 'gle'])
+        email = ScheduledEmail('a@google.com', 'Jane', company, False, 3, 1700000000.0)
+
+        self.assertFalse(hasattr(email, '__dict__'))
+        self.assertIs(email.company, 'google')
+        self.assertEqual(email.template_type, 'initial')
+
+    def test_dict_round_trip(self):
+        """Dictionary-layout entries convert to records and back"""
+        send_time = datetime(2024, 5, 1, 9, 30)
+        entry = {'recipient_email': 'a@google.com', 'recipient_name': 'Jane', 'company': 'google',
+                 'is_reminder': True, 'batch_num': 2, 'send_time': send_time}
+
+        email = ScheduledEmail.coerce(entry)
+
+        self.assertEqual(email.send_at, send_time.timestamp())
+        self.assertIs(ScheduledEmail.coerce(email), email)
+        self.assertEqual(email.to_dict(), dict(entry, id=None, attempts=0))
+
+
+class TestScheduleIndex(unittest.TestCase):
+    def setUp(self):
+        self.day1 = datetime(2030, 1, 7, 9, 0)
+        self.day2 = self.day1 + timedelta(days=1)
+        self.emails = [
+            ScheduledEmail(f"user{i}@{company}.com", f"Contact {i}", company, is_reminder, batch, when.timestamp())
+            for i, (company, is_reminder, batch, when) in enumerate([
+                ('amazon', False, 1, self.day1),
+                ('google', False, 1, self.day1 + timedelta(minutes=30)),
+                ('amazon', False, 2, self.day2),
+                ('amazon', True, 1, self.day2 + timedelta(hours=1)),
+            ])
+        ]
+        self.index = ScheduleIndex(self.emails)
+
+    def test_counts_follow_adds_and_removals(self):
+        index = self.index
+        self.assertEqual(len(index), 4)
+        self.assertEqual(index.counts('date'), {'2030-01-07': 2, '2030-01-08': 2})
+        self.assertEqual(index.counts('company'), {'amazon': 3, 'google': 1})
+        self.assertEqual(index.count(batch=1), 3)
+        self.assertEqual(index.count(company='amazon', template_type='initial'), 2)
+
+        index.discard(self.emails[1])
+        index.discard(self.emails[1])  # Already gone: no effect
+        self.assertEqual(index.counts('company'), {'amazon': 3})
+        self.assertEqual(index.count(date='2030-01-07'), 1)
+
+        # A retry moves an email to another day
+        self.emails[0].send_at = (self.day2 + timedelta(hours=2)).timestamp()
+        index.refresh(self.emails[0])
+        self.assertEqual(index.counts('date'), {'2030-01-08': 3})
+        self.assertEqual(index[-1], self.emails[0])
+
+    def test_rows_are_paged_in_send_time_order(self):
+        index = ScheduleIndex(reversed(self.emails))
+        recipients = [row['recipient'] for row in index.iter_rows()]
+        self.assertEqual(recipients, [e.recipient_email for e in self.emails])
+
+        page = index.rows(offset=1, limit=2)
+        self.assertEqual([row['recipient'] for row in page], recipients[1:3])
+        self.assertEqual(page[0], {'date': '2030-01-07', 'time': '09:30:00', 'batch': 1, 'type': 'initial',
+                                   'company': 'google', 'recipient': 'user1@google.com', 'name': 'Contact 1'})
+        self.assertEqual([row['recipient'] for row in index.rows(company='amazon', template_type='initial')],
+                         ['user0@amazon.com', 'user2@amazon.com'])
+
+    def test_order_follows_changes(self):
+        """Single and bulk changes keep send-time order, ties in insertion order, records by identity"""
+        index = ScheduleIndex()
+        base = self.day1.timestamp()
+        emails = [ScheduledEmail(f"u{i}@amazon.com", "C", 'amazon', False, 1, base + (i * 7919) % 500)
+                  for i in range(300)]
+        index.add_many(emails[:200])  # Bulk merge
+        for email in emails[200:]:
+            index.add(email)
+        twin = ScheduledEmail("u0@amazon.com", "C", 'amazon', False, 1, emails[0].send_at)
+        self.assertNotIn(twin, index)
+        index.discard(twin)  # An equal-looking record is a different email
+        self.assertEqual(len(index), 300)
+
+        for email in emails[:100:3]:
+            email.send_at += 250
+            index.refresh(email)
+        index.discard_many(emails[250:])
+        for email in emails[100:110]:
+            index.discard(email)
+
+        expected = sorted((e for e in emails[:100] + emails[110:250]), key=lambda e: e.send_at)
+        self.assertEqual([index[i] for i in range(len(index))], expected)
+
+    def test_summary_and_exports(self):
+        summary = self.index.summary()
+        self.assertEqual(summary['total'], 4)
+        self.assertEqual(summary['by_type'], {'initial': 3, 'reminder': 1})
+        self.assertEqual(summary['next_send_time'], self.day1.isoformat())
+        json.dumps(summary)
+
+        out = io.StringIO()
+        self.assertEqual(self.index.write_rows(out, 'jsonl', batch=1), 3)
+        self.assertEqual([json.loads(line)['batch'] for line in out.getvalue().splitlines()], [1, 1, 1])
+
+        out = io.StringIO()
+        self.index.write_rows(out, 'csv')
+        rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[3]['type'], 'reminder')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+Tests for the persistent sent-email index
+"""
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from src.email_automation import EmailAutomation
+from src.sent_index import BloomFilter, SentIndex
+
+
+class TestSentIndex(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.db_path = os.path.join(tmp.name, 'sent_index.db')
+
+    def test_survives_reopen(self):
+        index = SentIndex(self.db_path)
+        index.add('Jane@Amazon.com', 'spring', 'initial')
+        index.close()
+
+        reopened = SentIndex(self.db_path, bloom_capacity=1000)
+        self.addCleanup(reopened.close)
+
+        self.assertTrue(reopened.contains('jane@amazon.com', 'spring', 'initial'))
+        self.assertEqual(len(reopened), 1)
+
+    def test_keyed_by_campaign_and_template_type(self):
+        index = SentIndex(bloom_capacity=1000)
+        self.addCleanup(index.close)
+        index.add('jane@amazon.com', 'spring', 'initial')
+
+        self.assertFalse(index.contains('jane@amazon.com', 'spring', 'reminder'))
+        self.assertFalse(index.contains('jane@amazon.com', 'autumn', 'initial'))
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = BloomFilter(capacity=10_000, error_rate=0.01)
+        keys = [SentIndex.make_key(f"user{i}@x.com", 'c', 'initial') for i in range(10_000)]
+        for key in keys:
+            bloom.add(key)
+
+        self.assertTrue(all(key in bloom for key in keys))
+        others = [SentIndex.make_key(f"other{i}@x.com", 'c', 'initial') for i in range(10_000)]
+        false_positives = sum(key in bloom for key in others)
+        self.assertLess(false_positives, 300)
+
+    def test_send_skipped_after_restart(self):
+        """A message sent by a previous run is not rebuilt or resent"""
+        def make_automation():
+            automation = EmailAutomation(
+                excel_path="tests/test_data/test_contacts.xlsx",
+                sender_email="test@example.com",
+                sender_password="test_password",
+                sent_index_db=self.db_path
+            )
+            self.addCleanup(automation.close)
+            return automation
+
+        first = make_automation()
+        with mock.patch.object(first, '_deliver') as deliver:
+            first._send_email('jane@amazon.com', 'Jane', 'amazon', False, 1)
+            self.assertEqual(deliver.call_count, 1)
+        first.close()
+
+        second = make_automation()
+        with mock.patch.object(second, '_deliver') as deliver, \
+                mock.patch.object(second, '_build_message') as build:
+            second._send_email('jane@amazon.com', 'Jane', 'amazon', False, 1)
+            second._send_email('jane@amazon.com', 'Jane', 'amazon', True, 1)
+            self.assertEqual(deliver.call_count, 1)  # Only the reminder goes out
+            build.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
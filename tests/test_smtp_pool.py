@@ -0,0 +1,93 @@
+"""
+Tests for pooled SMTP sessions
+"""
+import smtplib
+import time
+import unittest
+from email.mime.text import MIMEText
+
+from src.smtp_pool import SMTPConnectionPool
+from tests.smtp_server import LocalSMTPServer
+
+
+def make_message(recipient: str) -> MIMEText:
+    msg = MIMEText("Hello")
+    msg['From'] = 'sender@example.com'
+    msg['To'] = recipient
+    msg['Subject'] = 'Test'
+    return msg
+
+
+class TestSMTPConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.server = LocalSMTPServer(password='secret').start()
+        self.addCleanup(self.server.stop)
+
+    def make_pool(self, **overrides) -> SMTPConnectionPool:
+        pool = SMTPConnectionPool.from_provider(
+            self.server.provider(**overrides), 'sender@example.com', 'secret'
+        )
+        self.addCleanup(pool.close)
+        return pool
+
+    def test_logs_in_once_and_reuses_session(self):
+        """Several messages share one authenticated session"""
+        pool = self.make_pool(pool_size=1)
+        for i in range(5):
+            pool.send_message(make_message(f"user{i}@amazon.com"))
+
+        self.assertEqual(len(self.server.messages), 5)
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(self.server.logins, ['sender@example.com'])
+        self.assertGreaterEqual(self.server.commands['RSET'], 4)
+
+    def test_recycles_after_max_messages(self):
+        """Sessions are replaced after max_messages_per_connection sends"""
+        pool = self.make_pool(max_messages_per_connection=2)
+        for i in range(5):
+            pool.send_message(make_message(f"user{i}@meta.com"))
+
+        self.assertEqual(len(self.server.messages), 5)
+        self.assertEqual(self.server.connections, 3)
+
+    def test_recycles_after_idle_timeout(self):
+        """Sessions idle longer than idle_timeout are replaced"""
+        pool = self.make_pool(idle_timeout=0.05)
+        pool.send_message(make_message("a@google.com"))
+        time.sleep(0.1)
+        pool.send_message(make_message("b@google.com"))
+
+        self.assertEqual(self.server.connections, 2)
+
+    def test_reconnects_after_server_drop(self):
+        """A session dropped by the server is transparently reopened"""
+        pool = self.make_pool()
+        pool.send_message(make_message("a@apple.com"))
+        self.server.drop_connections()
+        pool.send_message(make_message("b@apple.com"))
+
+        self.assertEqual(len(self.server.messages), 2)
+        self.assertEqual(self.server.connections, 2)
+
+    def test_session_lost_after_data_is_not_resent(self):
+        """A drop after the message was transmitted is raised, not retried"""
+        pool = self.make_pool()
+        self.server.drop_after_data = True
+        with self.assertRaises(smtplib.SMTPServerDisconnected):
+            pool.send_message(make_message("a@apple.com"))
+
+        self.assertEqual(len(self.server.messages), 1)
+        self.server.drop_after_data = False
+        pool.send_message(make_message("b@apple.com"))  # The lost session was discarded
+        self.assertEqual(len(self.server.messages), 2)
+
+    def test_closed_pool_refuses_checkout(self):
+        """A closed pool cannot hand out sessions"""
+        pool = self.make_pool()
+        pool.close()
+        with self.assertRaises(RuntimeError):
+            pool.acquire()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+"""
+Tests for compiled template rendering
+"""
+import unittest
+
+from src.templates import CompiledTemplate, EmailTemplateManager
+
+
+class TestCompiledTemplates(unittest.TestCase):
+    def setUp(self):
+        self.manager = EmailTemplateManager()
+
+    def test_render_matches_format_template(self):
+        """Compiled rendering produces the same subject and body as str.format"""
+        for company in ['amazon', 'meta', 'google', 'apple']:
+            for template_type, prefix in (('initial', ''), ('reminder', 'Following up: ')):
+                with self.subTest(company=company, template_type=template_type):
+                    expected_body = self.manager.format_template(
+                        self.manager.get_template(company, template_type), name='Jane Doe'
+                    )
+                    expected_subject = f"{prefix}Data Science Opportunities at {company.title()}"
+
+                    subject, body = self.manager.render(company, template_type, name='Jane Doe')
+
+                    self.assertEqual(subject, expected_subject)
+                    self.assertEqual(body, expected_body)
+
+    def test_render_many_preserves_order(self):
+        contacts = [('google', 'A'), ('apple', 'B'), ('google', 'C')]
+        rendered = self.manager.render_many(contacts, template_type='reminder')
+
+        self.assertEqual(rendered, [self.manager.render(c, 'reminder', name=n) for c, n in contacts])
+
+    def test_missing_value_raises(self):
+        with self.assertRaises(ValueError):
+            self.manager.render('amazon', 'initial')
+
+    def test_unknown_company_or_type_raises(self):
+        with self.assertRaises(ValueError):
+            self.manager.render('unknown', 'initial', name='X')
+        with self.assertRaises(ValueError):
+            self.manager.render('amazon', 'followup', name='X')
+
+    def test_escaped_braces_are_literal(self):
+        template = CompiledTemplate("{{literal}} {name}!")
+        self.assertEqual(template.render({'name': 'Bob'}), "{literal} Bob!")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+"""
+Tests for the spool and in-memory transports
+"""
+import mailbox
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from config.settings import EMAIL_PROVIDERS
+from src.dispatcher import SenderAccount
+from src.email_automation import EmailAutomation
+from src.smtp_pool import SMTPConnectionPool
+from src.transports import MemoryTransport, SpoolTransport, create_transport
+
+
+def _message(recipient: str = "user@amazon.com") -> MIMEMultipart:
+    msg = MIMEMultipart()
+    msg['From'] = "sender@example.com"
+    msg['To'] = recipient
+    msg['Subject'] = "Hello"
+    msg.attach(MIMEText("Body line\nSecond line", 'plain'))
+    return msg
+
+
+class TestMemoryTransport(unittest.TestCase):
+    def test_keeps_envelope_and_wire_format(self):
+        transport = MemoryTransport(max_messages=2)
+        for i in range(3):
+            transport.send_message(_message(f"user{i}@amazon.com"))
+
+        self.assertEqual(transport.sent_count, 3)
+        self.assertEqual(len(transport.messages), 2)  # Only the most recent are kept
+        from_addr, to_addrs, data = transport.messages[-1]
+        self.assertEqual((from_addr, to_addrs), ("sender@example.com", ["user2@amazon.com"]))
+        self.assertIn(b"Body line\r\nSecond line", data)
+        self.assertGreater(transport.bytes_sent, sum(len(m[2]) for m in transport.messages))
+
+
+class TestSpoolTransport(unittest.TestCase):
+    def test_messages_are_readable_as_a_maildir(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            spool = SpoolTransport(os.path.join(tmp, 'spool'))
+            spool.check()
+            spool.send_message(_message("a@amazon.com"))
+            spool.send_raw("sender@example.com", ["b@meta.com", "c@meta.com"], b"Subject: raw\r\n\r\nhi\r\n")
+
+            self.assertEqual(os.listdir(os.path.join(tmp, 'spool', 'tmp')), [])
+            box = mailbox.Maildir(os.path.join(tmp, 'spool'), create=False)
+            messages = sorted(box, key=lambda m: m['X-Envelope-To'])
+            self.assertEqual([m['X-Envelope-To'] for m in messages], ["a@amazon.com", "b@meta.com, c@meta.com"])
+            self.assertEqual(messages[0]['Subject'], "Hello")
+            self.assertEqual(messages[1]['X-Envelope-From'], "sender@example.com")
+
+
+class TestCreateTransport(unittest.TestCase):
+    def test_selects_by_type(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            provider = EMAIL_PROVIDERS['gmail']
+            spool = create_transport({'type': 'spool', 'spool_dir': tmp}, provider, "me@example.com", "pw")
+            self.assertEqual(spool.directory, os.path.join(tmp, "me@example.com"))
+            self.assertIsInstance(create_transport({'type': 'memory'}, provider, "me", "pw"), MemoryTransport)
+            self.assertIsInstance(create_transport({'type': 'smtp'}, provider, "me", "pw"), SMTPConnectionPool)
+            with self.assertRaises(ValueError):
+                create_transport({'type': 'carrier-pigeon'}, provider, "me", "pw")
+
+    def test_dry_run_accounts_skip_rate_limits(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            state_path = os.path.join(tmp, 'limits.json')
+            account = SenderAccount("me@example.com", "pw", EMAIL_PROVIDERS['gmail'], state_path=state_path,
+                                    transport_settings={'type': 'memory'})
+            self.assertEqual(account.rate_limiter.buckets, {})
+            limited = SenderAccount("me@example.com", "pw", EMAIL_PROVIDERS['gmail'],
+                                    transport_settings={'type': 'memory', 'rate_limited': True})
+            self.assertTrue(limited.rate_limiter.buckets)
+
+
+class TestSendThroughMemoryTransport(unittest.TestCase):
+    def test_automation_sends_every_due_email(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        resume_path = os.path.join(tmp.name, 'resume.pdf')
+        with open(resume_path, 'wb') as f:
+            f.write(b"%PDF-1.4 test resume")
+
+        automation = EmailAutomation(excel_path="tests/test_data/test_contacts.xlsx",
+                                     sender_email="test@example.com", sender_password="",
+                                     transport_settings={'type': 'memory', 'memory_max_messages': None})
+        self.addCleanup(automation.close)
+        automation.resume_path = resume_path
+        for i in range(20):
+            automation._enqueue_email({
+                'recipient_email': f"user{i}@amazon.com", 'recipient_name': f"Contact {i}", 'company': 'amazon',
+                'is_reminder': False, 'batch_num': 1, 'send_time': datetime.now() - timedelta(minutes=1)
+            })
+
+        self.assertEqual(automation.send_scheduled(), 20)
+        sink = automation.dispatcher.accounts[0].transport
+        self.assertIsInstance(sink, MemoryTransport)
+        self.assertEqual(sorted(to[0] for _, to, _ in sink.messages), sorted(f"user{i}@amazon.com" for i in range(20)))
+        self.assertEqual(len(automation.scheduled_emails), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()